@@ -0,0 +1,119 @@
+import csv
+import json
+import random
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterator, Union
+
+STATES = (("EXECUTED", 70), ("CANCELED", 20), ("PENDING", 10))
+DESCRIPTIONS = (
+    ("Перевод организации", 40),
+    ("Перевод с карты на карту", 19),
+    ("Перевод с карты на счет", 16),
+    ("Перевод со счета на счет", 15),
+    ("Открытие вклада", 10),
+)
+JSON_CURRENCIES = ((("руб.", "RUB"), 60), (("USD", "USD"), 20), (("EUR", "EUR"), 20))
+CSV_CURRENCIES = (
+    (("Ruble", "RUB"), 40),
+    (("Dollar", "USD"), 15),
+    (("Euro", "EUR"), 15),
+    (("Sol", "PEN"), 10),
+    (("Shilling", "TZS"), 10),
+    (("Rupiah", "IDR"), 10),
+)
+CARDS = ("Maestro", "MasterCard", "Visa Classic", "Visa Platinum", "Visa Gold", "Discover")
+START_DATE = datetime(2018, 1, 1)
+DATE_RANGE_SECONDS = 6 * 365 * 24 * 3600
+CSV_COLUMNS = ("id", "state", "date", "amount", "currency_name", "currency_code", "from", "to", "description")
+
+
+class _Choices:
+    """Взвешенный выбор из фиксированного набора значений по общему генератору random.Random."""
+
+    def __init__(self, rng: random.Random, weighted: tuple) -> None:
+        self.rng = rng
+        self.values = [value for value, _ in weighted]
+        self.cum_weights = []
+        total = 0
+        for _, weight in weighted:
+            total += weight
+            self.cum_weights.append(total)
+
+    def __call__(self) -> Any:
+        return self.rng.choices(self.values, cum_weights=self.cum_weights)[0]
+
+
+def _account(rng: random.Random) -> str:
+    if rng.random() < 0.5:
+        return f"Счет {rng.randrange(10**19, 10**20)}"
+    return f"{rng.choice(CARDS)} {rng.randrange(10**15, 10**16)}"
+
+
+def iter_records(n: int, seed: int = 0, shape: str = "json") -> Iterator[Dict[str, Any]]:
+    """
+    Детерминированно генерирует n синтетических транзакций.
+
+    shape="json" - вложенный формат data/operations.json, shape="csv" - плоский формат
+    data/transactions.csv. Одинаковые n, seed и shape всегда дают одинаковые записи;
+    примерно у 1% записей нет описания, у вкладов нет поля "from".
+    """
+    rng = random.Random(seed)
+    state = _Choices(rng, STATES)
+    description = _Choices(rng, DESCRIPTIONS)
+    currency = _Choices(rng, JSON_CURRENCIES if shape == "json" else CSV_CURRENCIES)
+    for i in range(n):
+        date = START_DATE + timedelta(seconds=rng.randrange(DATE_RANGE_SECONDS), microseconds=rng.randrange(10**6))
+        amount = round(rng.uniform(1, 100_000), 2)
+        name, code = currency()
+        text = description() if rng.random() >= 0.01 else None
+        source = _account(rng) if text != "Открытие вклада" else None
+        record: Dict[str, Any] = {"id": 100_000 + i * 10 + rng.randrange(10), "state": state()}
+        if shape == "json":
+            record["date"] = date.isoformat()
+            record["operationAmount"] = {"amount": f"{amount:.2f}", "currency": {"name": name, "code": code}}
+        else:
+            record["date"] = date.strftime("%Y-%m-%dT%H:%M:%SZ")
+            record.update(amount=amount, currency_name=name, currency_code=code)
+        if text is not None:
+            record["description"] = text
+        if source is not None:
+            record["from"] = source
+        record["to"] = _account(rng)
+        yield record
+
+
+def write_json(path: Union[str, Path], n: int, seed: int = 0) -> Path:
+    """Записывает n записей в формате operations.json, не держа их все в памяти."""
+    path = Path(path)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("[")
+        for i, record in enumerate(iter_records(n, seed, "json")):
+            f.write(",\n" if i else "\n")
+            json.dump(record, f, ensure_ascii=False)
+        f.write("\n]")
+    return path
+
+
+def write_csv(path: Union[str, Path], n: int, seed: int = 0) -> Path:
+    """Записывает n записей в формате transactions.csv (разделитель ";")."""
+    path = Path(path)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, CSV_COLUMNS, delimiter=";")
+        writer.writeheader()
+        writer.writerows(iter_records(n, seed, "csv"))
+    return path
+
+
+def write_xlsx(path: Union[str, Path], n: int, seed: int = 0) -> Path:
+    """Записывает n записей в формате transactions_excel.xlsx."""
+    from openpyxl import Workbook  # type: ignore[import-untyped]
+
+    path = Path(path)
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(CSV_COLUMNS)
+    for record in iter_records(n, seed, "csv"):
+        sheet.append([record.get(column) for column in CSV_COLUMNS])
+    workbook.save(path)
+    return path
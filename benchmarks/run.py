@@ -0,0 +1,253 @@
+"""
+Бенчмарки функций обработки и загрузчиков на синтетических данных.
+
+Запуск: python -m benchmarks.run --sizes 1e4 1e5 [--baseline benchmarks/baseline.json]
+Память на строку в разных представлениях: python -m benchmarks.run --sizes 1e5 --row-sizes
+"""
+
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from benchmarks.generate import iter_records, write_csv, write_json, write_xlsx
+from src.csv_xlsx import iter_transactions_xlsx, read_transactions_csv
+from src.dictionary_handler import categorize_transactions, search_transactions
+from src.generators import filter_by_currency
+from src.parallel import ParallelExecutor
+from src.processing import filter_by_state, sort_by_date
+from src.table import TransactionTable, read_table, read_transactions
+from src.utils import read_json_file
+from src.widget import mask_number
+
+DEFAULT_SIZES = (10**4, 10**5)
+DEFAULT_BASELINE = Path(__file__).with_name("baseline.json")
+DEFAULT_DATA_DIR = Path(__file__).with_name(".data")
+DEFAULT_THRESHOLD = 0.25
+# openpyxl пишет и читает xlsx на порядки медленнее остальных форматов
+MAX_XLSX_ROWS = 10**5
+CATEGORIES = {
+    "Вклады": ["вклада"],
+    "Организации": ["организации"],
+    "Карты": ["на карту", "с карты"],
+    "Счета": ["счет"],
+}
+
+Benchmark = Tuple[str, Callable[[], Any]]
+
+
+def measure(func: Callable[[], Any], repeat: int = 3, memory: bool = True) -> Dict[str, Optional[float]]:
+    """Лучшее время из repeat запусков и пиковая память отдельного запуска под tracemalloc (МБ)."""
+    peak_mb = None
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        func()
+        peak_mb = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - started)
+    return {"seconds": min(times), "peak_mb": peak_mb}
+
+
+def retained_bytes(load: Callable[[], Any]) -> int:
+    """Сколько памяти (байт по tracemalloc) занимает результат load после его создания."""
+    gc.collect()
+    tracemalloc.start()
+    result = load()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def row_sizes(json_file: Path, size: int) -> Dict[str, float]:
+    """Байт на строку для одного JSON-файла: список словарей, TransactionTable и список Transaction."""
+    return {
+        "dict": retained_bytes(lambda: read_json_file(json_file)) / size,
+        "TransactionTable": retained_bytes(lambda: read_table(json_file)) / size,
+        "Transaction": retained_bytes(lambda: read_transactions(json_file)) / size,
+    }
+
+
+def data_files(size: int, data_dir: Path, seed: int = 0) -> Dict[str, Path]:
+    """Файлы с size записями во всех форматах; уже созданные файлы переиспользуются."""
+    data_dir.mkdir(parents=True, exist_ok=True)
+    writers = {"json": write_json, "csv": write_csv}
+    if size <= MAX_XLSX_ROWS:
+        writers["xlsx"] = write_xlsx
+    files = {}
+    for file_type, write in writers.items():
+        path = data_dir / f"operations_{size}_{seed}.{file_type}"
+        if not path.exists():
+            write(path.with_suffix(".tmp"), size, seed).rename(path)
+        files[file_type] = path
+    return files
+
+
+def loader_benchmarks(files: Dict[str, Path]) -> List[Benchmark]:
+    benchmarks: List[Benchmark] = [
+        ("read_json_file", lambda: read_json_file(files["json"])),
+        ("read_table[json]", lambda: read_table(files["json"])),
+        ("read_transactions[json]", lambda: read_transactions(files["json"])),
+        ("read_transactions_csv", lambda: read_transactions_csv(str(files["csv"]))),
+        ("read_table[csv]", lambda: read_table(files["csv"])),
+    ]
+    if "xlsx" in files:
+        xlsx = str(files["xlsx"])
+        benchmarks += [
+            ("iter_transactions_xlsx", lambda: TransactionTable.from_records(iter_transactions_xlsx(xlsx))),
+            # Повторные запуски читают sidecar-кэш рядом с файлом
+            ("read_table[xlsx cached]", lambda: read_table(xlsx)),
+        ]
+    return benchmarks
+
+
+def function_benchmarks(records: List[Dict[str, Any]], table: TransactionTable) -> List[Benchmark]:
+    accounts = [record.get("from") or record["to"] for record in records]
+
+    parallel = ParallelExecutor()
+
+    def mask_all() -> List[str]:
+        mask_number.cache_clear()
+        return [mask_number(account) for account in accounts]
+
+    return [
+        ("sort_by_date[list]", lambda: sort_by_date(records)),
+        ("sort_by_date[table]", lambda: sort_by_date(table)),
+        ("filter_by_state[list]", lambda: filter_by_state(records, "EXECUTED")),
+        ("filter_by_state[table]", lambda: filter_by_state(table, "EXECUTED")),
+        ("filter_by_currency[list]", lambda: list(filter_by_currency(records, "USD"))),
+        ("filter_by_currency[table]", lambda: filter_by_currency(table, "USD")),
+        ("search_transactions[list]", lambda: search_transactions(records, "карт", ignore_case=True)),
+        ("search_transactions[table]", lambda: search_transactions(table, "карт", ignore_case=True)),
+        (
+            "search_transactions[list parallel]",
+            lambda: parallel.search_transactions(records, "карт", ignore_case=True),
+        ),
+        ("categorize_transactions[list]", lambda: categorize_transactions(records, CATEGORIES)),
+        ("categorize_transactions[table]", lambda: categorize_transactions(table, CATEGORIES)),
+        ("categorize_transactions[list parallel]", lambda: parallel.categorize_transactions(records, CATEGORIES)),
+        ("mask_number", mask_all),
+    ]
+
+
+def run_benchmarks(
+    sizes: List[int],
+    repeat: int = 3,
+    memory: bool = True,
+    data_dir: Path = DEFAULT_DATA_DIR,
+    only: Optional[str] = None,
+    seed: int = 0,
+) -> List[Dict[str, Any]]:
+    """Запускает все бенчмарки (или с подстрокой only в имени) для каждого размера."""
+    results = []
+    for size in sizes:
+        records = list(iter_records(size, seed))
+        table = TransactionTable.from_records(records)
+        benchmarks = loader_benchmarks(data_files(size, data_dir, seed)) + function_benchmarks(records, table)
+        for name, func in benchmarks:
+            if only and only not in name:
+                continue
+            result = {"name": name, "size": size, **measure(func, repeat, memory)}
+            print(_format_result(result), flush=True)
+            results.append(result)
+        del records, table
+    return results
+
+
+def _key(result: Dict[str, Any]) -> str:
+    return f"{result['name']}@{result['size']}"
+
+
+def _format_result(result: Dict[str, Any]) -> str:
+    peak = f"{result['peak_mb']:10.1f} MB" if result["peak_mb"] is not None else ""
+    return f"{result['name']:32} {result['size']:>10} {result['seconds']:10.4f} s{peak}"
+
+
+def load_baseline(path: Path) -> Dict[str, Dict[str, Any]]:
+    if not path.exists():
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return dict(json.load(f))
+
+
+def save_baseline(path: Path, results: List[Dict[str, Any]]) -> None:
+    """Дописывает результаты в базовую линию (замеры с тем же именем и размером заменяются)."""
+    baseline = load_baseline(path)
+    baseline.update({_key(result): {"seconds": result["seconds"], "peak_mb": result["peak_mb"]} for result in results})
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(dict(sorted(baseline.items())), f, indent=2)
+        f.write("\n")
+
+
+def compare(
+    results: List[Dict[str, Any]], baseline: Dict[str, Dict[str, Any]], threshold: float = DEFAULT_THRESHOLD
+) -> List[str]:
+    """Возвращает описания регрессий: время или пиковая память выросли больше чем на threshold."""
+    regressions = []
+    for result in results:
+        base = baseline.get(_key(result))
+        if base is None:
+            continue
+        for metric in ("seconds", "peak_mb"):
+            old, new = base.get(metric), result[metric]
+            if old and new is not None and new > old * (1 + threshold):
+                regressions.append(f"{_key(result)}: {metric} {old:.4f} -> {new:.4f} (x{new / old:.2f})")
+    return regressions
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Бенчмарки обработки транзакций")
+    parser.add_argument(
+        "--sizes",
+        nargs="+",
+        type=lambda value: int(float(value)),
+        default=list(DEFAULT_SIZES),
+        help="Размеры наборов данных, например 1e4 1e6",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Число замеров времени (берется лучший)")
+    parser.add_argument("--no-memory", action="store_true", help="Не замерять пиковую память")
+    parser.add_argument("--only", help="Запускать только бенчмарки с этой подстрокой в имени")
+    parser.add_argument("--data-dir", type=Path, default=DEFAULT_DATA_DIR, help="Каталог для сгенерированных файлов")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="Файл базовой линии")
+    parser.add_argument("--save-baseline", action="store_true", help="Записать результаты в базовую линию")
+    parser.add_argument(
+        "--threshold", type=float, default=DEFAULT_THRESHOLD, help="Допустимое ухудшение (0.25 = 25%%)"
+    )
+    parser.add_argument("--output", type=Path, help="Сохранить результаты в JSON-файл")
+    parser.add_argument("--row-sizes", action="store_true", help="Только замерить память на строку (байт)")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    if args.row_sizes:
+        for size in args.sizes:
+            for name, per_row in row_sizes(data_files(size, args.data_dir)["json"], size).items():
+                print(f"{name:32} {size:>10} {per_row:10.0f} B/row")
+        return 0
+    results = run_benchmarks(args.sizes, args.repeat, not args.no_memory, args.data_dir, args.only)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.save_baseline:
+        save_baseline(args.baseline, results)
+        return 0
+    regressions = compare(results, load_baseline(args.baseline), args.threshold)
+    for regression in regressions:
+        print(f"РЕГРЕССИЯ {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,145 +1,301 @@
-import re
-from pathlib import Path
-from typing import Dict, List, Any
+import argparse
+import os
+import sys
+from typing import IO, TYPE_CHECKING, Any, List, Optional
 
-from src.csv_xlsx import read_transactions_csv, read_transactions_xlsx
-from src.dictionary_handler import search_transactions
-from src.generators import filter_by_currency, transaction_descriptions
-from src.processing import filter_by_state, sort_by_date
-from src.utils import read_json_file, sum_amount
-from src.widget import convert_date_format, mask_number
+from src.profiling import Profiler, cprofile
+from src.query import TransactionQuery
+from src.render import DEFAULT_PAGE_SIZE, page_bounds, render_transactions
+from src.table import TransactionTable, read_table
 
+if TYPE_CHECKING:
+    from src.incremental import IncrementalProcessor
 
-def choose_file_format() -> tuple[List[Dict], str]:
+FILE_PATHS = {
+    "json": "data/operations.json",
+    "csv": "data/transactions.csv",
+    "excel": "data/transactions_excel.xlsx",
+}
+STATUSES = ("EXECUTED", "CANCELED", "PENDING")
+# Копии src.ingest.GLOB_CHARS и src.incremental.WATERMARK_MODES: ingest, incremental и
+# sqlite_store импортируются только в тех режимах, где они нужны
+GLOB_CHARS = frozenset("*?[")
+WATERMARK_MODES = ("ids", "date")
+
+
+def choose_file_format() -> tuple[TransactionTable, str]:
     """Запрашивает у пользователя формат файла и возвращает данные транзакций и тип файла.
 
     Returns:
-        tuple Список словарей с транзакциями и тип файла (json, csv, excel).
+        tuple Таблица транзакций (TransactionTable) и тип файла (json, csv, excel).
     """
     print("Добро пожаловать в программу работы с банковскими транзакциями!")
     file = input("""Выберите формат файла: 1. Json 2. CSV 3. Excel\n""")
     if file == "1":
         print("Для обработки выбран json файл.\n")
-        return read_json_file(Path("data/operations.json")), "json"
+        return read_table(FILE_PATHS["json"]), "json"
     elif file == "2":
         print("Для обработки выбран csv файл.\n")
-        return read_transactions_csv("data/transactions.csv"), "csv"
+        return read_table(FILE_PATHS["csv"]), "csv"
     elif file == "3":
         print("Для обработки выбран excel файл.\n")
-        return read_transactions_xlsx("data/transactions_excel.xlsx"), "excel"
+        return read_table(FILE_PATHS["excel"]), "excel"
     else:
         """Если выбрал не от 1 до 3 возращает обратно к началу работы программы """
         print("Пожалуйста, выберите правильный номер опции.")
         return choose_file_format()
 
 
-def filter_by_status(data: List[Dict]) -> List[Dict]:
-    """Фильтрует список транзакций по заданному статусу.
+def filter_by_status(query: TransactionQuery) -> TransactionQuery:
+    """Запрашивает статус, по которому нужно отфильтровать транзакции.
 
     Args:
-        data Список словарей с транзакциями.
+        query Запрос, в который записывается выбранный статус.
 
-    Returns Отфильтрованный список транзакций.
+    Returns Тот же запрос.
     """
     print("Выберите статус, по которому необходимо выполнить фильтрацию.")
     status = input("Доступные для сортировки статусы: EXECUTED, CANCELED, PENDING\n")
 
-    if status.upper() not in ("EXECUTED", "CANCELED", "PENDING"):
+    if status.upper() not in STATUSES:
         """Если выбрал некорректный статус возращает обратно к вопросу status"""
         print("Некорректный статус, повторите ввод.")
-        return filter_by_status(data)
+        return filter_by_status(query)
 
-    return filter_by_state(data, status)
+    query.state = status.upper()
+    return query
 
 
-def sort_by_date_and_currency(data: List[Dict], file_type: str) -> list[dict[Any, Any]]:
-    """Сортирует список транзакций по дате и фильтрует по валюте.
+def sort_by_date_and_currency(query: TransactionQuery) -> TransactionQuery:
+    """Запрашивает порядок сортировки по дате и фильтр по валюте.
 
     Args:
-        data Список словарей с транзакциями.
-        file_type Тип файла (json, csv, excel).
+        query Запрос, в который записываются выбранные условия.
 
-    Returns Отсортированный и отфильтрованный список транзакций.
+    Returns Тот же запрос.
     """
     to_sort = input("Отсортировать операции по дате? Да/нет \n")
     if to_sort.lower() == "да":
         time = input("По возрастанию или по убыванию?\n")
         if time.lower() == "по возрастанию":
-            data = sort_by_date(data)
+            query.order = "ascending"
         elif time.lower() == "по убыванию":
-            data = sort_by_date(data, "decreasing")
+            query.order = "descending"
         else:
             """Если выбрал некорректное значение возращает обратно к вопросу to_sort"""
             print("Некорректное значение, повторите ввод.")
-            return sort_by_date_and_currency(data, file_type)
+            return sort_by_date_and_currency(query)
     elif to_sort.lower() == "нет":
-        pass
+        query.order = None
     else:
         print("Некорректный ответ, повторите ввод.")
-        return sort_by_date_and_currency(data, file_type)
+        return sort_by_date_and_currency(query)
 
     to_sort = input("Выводить только рублевые транзакции? Да/нет \n")
     if to_sort.lower() == "да":
-        return filter_by_currency(data, "RUB")
+        query.currency = "RUB"
+        return query
     elif to_sort.lower() == "нет":
-        return data
+        query.currency = None
+        return query
     else:
         """Если выбрал некорректный ответ возращает обратно к вопросу to_sort"""
         print("Некорректный ответ, повторите ввод.")
-        return sort_by_date_and_currency(data, file_type)
+        return sort_by_date_and_currency(query)
 
 
-def filter_by_keyword(data: List[Dict]) -> List[Dict]:
-    """Фильтрует список транзакций по ключевому слову в описании.
+def filter_by_keyword(query: TransactionQuery) -> TransactionQuery:
+    """Запрашивает слово для поиска в описании транзакций.
 
     Args:
-        data Список словарей с транзакциями.
+        query Запрос, в который записывается строка поиска.
 
-    Returns Отфильтрованный список транзакций.
+    Returns Тот же запрос.
     """
     to_sort = input("Отсортировать список операций по определённому слову в описании? Да/нет\n")
     if to_sort.lower() == "да":
-        to_find = input("Что вы хотели бы найти? \n")
-        return search_transactions(data, to_find)
+        query.keyword = input("Что вы хотели бы найти? \n")
+        query.regex = True
+        return query
     elif to_sort.lower() == "нет":
-        return data
+        query.keyword = None
+        return query
     else:
         """Если выбрал некорректное ответ возращает обратно к вопросу to_sort"""
         print("Некорректный ответ, повторите ввод.")
-        return filter_by_keyword(data)
+        return filter_by_keyword(query)
 
 
-def print_transactions(data: List[Dict]) -> None:
-    """Выводит отформатированный список транзакций на консоль.
+def print_transactions(
+    data: Any,
+    profiler: Optional[Profiler] = None,
+    out: Optional[IO[str]] = None,
+    page: Optional[int] = None,
+    page_size: int = DEFAULT_PAGE_SIZE,
+) -> None:
+    """Выводит отформатированный список транзакций на консоль или в файл.
 
     Args:
-        data Список словарей с транзакциями.
+        data Список словарей с транзакциями, TransactionTable или любой итератор по транзакциям.
+        profiler Профилировщик, в который записываются этапы rates и print.
+        out Поток для вывода, по умолчанию sys.stdout.
+        page Номер страницы (с 1) для постраничного вывода, по умолчанию выводится вся выборка.
+        page_size Число операций на странице.
     """
-    print("Распечатываю список транзакций которые подходят под критерии")
-    if data and len(data) != 0:
-        print(f"Всего операций в выборке: {len(data)}\n")
-        for operation in data:
-            print(
-                convert_date_format(operation["date"]),
-                next(transaction_descriptions(data)),
-            )
-            if re.search("Перевод", operation["description"]):
-                print(mask_number(operation["from"]), " -> ", mask_number(operation["to"]))
-            else:
-                print(mask_number(operation["to"]))
-                print(f"Сумма: {sum_amount(operation)}руб. \n")
+    out = out or sys.stdout
+    if not isinstance(data, TransactionTable):
+        data = TransactionTable.from_records(data)
+    out.write("Распечатываю список транзакций которые подходят под критерии\n")
+    if len(data) != 0:
+        out.write(f"Всего операций в выборке: {len(data)}\n")
+        if page is not None:
+            rows = page_bounds(len(data), page, page_size)
+            pages = -(-len(data) // page_size)
+            out.write(f"Страница {page} из {pages}, операций на странице: {rows.stop - rows.start}\n")
+            data = data.take(rows)
+        out.write("\n")
+        render_transactions(data, out, profiler=profiler)
     else:
         """Если не найдено нечего того что хотел пользователь """
-        print("Не найдено ни одной транзакции подходящей под ваши условия фильтрации")
+        out.write("Не найдено ни одной транзакции подходящей под ваши условия фильтрации\n")
+
+
+def positive_int(value: str) -> int:
+    """Тип argparse для целого числа больше нуля (limit, номер и размер страницы)."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"ожидается целое число: {value!r}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"ожидается положительное число: {value}")
+    return number
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Разбирает аргументы командной строки для неинтерактивного запуска."""
+    parser = argparse.ArgumentParser(description="Обработка банковских транзакций")
+    parser.add_argument(
+        "--file",
+        help="Путь к файлу с транзакциями (.json, .csv, .xlsx), каталогу или шаблону вида 'exports/*.csv', "
+        "по умолчанию data/operations.json",
+    )
+    parser.add_argument("--workers", type=int, help="Число процессов для загрузки нескольких файлов")
+    parser.add_argument("--state", type=str.upper, choices=STATUSES, help="Статус операции")
+    parser.add_argument("--currency", type=str.upper, help="Код валюты, например RUB")
+    parser.add_argument("--search", help="Строка поиска в описании")
+    parser.add_argument("--regex", action="store_true", help="Считать строку поиска регулярным выражением")
+    parser.add_argument("--ignore-case", action="store_true", help="Искать без учета регистра")
+    parser.add_argument("--sort", choices=("asc", "desc"), help="Сортировка по дате")
+    parser.add_argument("--limit", type=positive_int, help="Максимальное число операций")
+    parser.add_argument("--page", type=positive_int, help="Вывести только эту страницу выборки (с 1)")
+    parser.add_argument(
+        "--page-size", type=positive_int, default=DEFAULT_PAGE_SIZE, help="Число операций на странице для --page"
+    )
+    parser.add_argument("--output", help="Записать список операций в файл, а не на консоль")
+    parser.add_argument("--db", help="Файл SQLite: --file загружается в него, а запрос выполняется в SQL по индексам")
+    parser.add_argument(
+        "--incremental", metavar="STATE_FILE", help="Обрабатывать только новые операции, храня состояние в файле"
+    )
+    parser.add_argument(
+        "--watermark", choices=WATERMARK_MODES, default="ids", help="Как определять новые операции: по id или по дате"
+    )
+    parser.add_argument("--profile-report", help="Сохранить замеры этапов обработки в JSON-файл")
+    parser.add_argument("--cprofile", help="Сохранить профиль cProfile (формат pstats) в файл")
+    return parser.parse_args(argv)
+
+
+def query_from_args(args: argparse.Namespace) -> TransactionQuery:
+    """Строит TransactionQuery из аргументов командной строки."""
+    order = {"asc": "ascending", "desc": "descending"}.get(args.sort) if args.sort else None
+    return TransactionQuery(
+        state=args.state,
+        currency=args.currency,
+        keyword=args.search,
+        regex=args.regex,
+        ignore_case=args.ignore_case,
+        order=order,
+        limit=args.limit,
+    )
+
+
+def print_incremental_summary(processor: "IncrementalProcessor", new_rows: int) -> None:
+    """Выводит число новых операций и накопленные агрегаты инкрементального режима."""
+    summary = processor.summary()
+    print(f"Новых операций: {new_rows}, всего обработано: {summary['processed']}")
+    print(f"По статусам: {summary['states']}")
+    print(f"По категориям: {summary['categories']}")
+    if summary["unconverted"]:
+        print(f"Нет курса, не учтены в итоге: {', '.join(summary['unconverted'])}")
+    print(f"Итого в рублях: {summary['total_rub']:.2f}\n")
+
 
+def load_data(file_path: str, workers: Optional[int] = None) -> TransactionTable:
+    """Загружает файл, а каталог или шаблон glob - параллельно, все файлы в одну таблицу."""
+    if not os.path.isdir(file_path) and not GLOB_CHARS & set(file_path):
+        return read_table(file_path)
+    from src.ingest import ingest
 
-def main() -> None:
-    """Главная функция программы, запускающая обработку транзакций."""
-    data, file_type = choose_file_format()
-    data = filter_by_status(data)
-    data = sort_by_date_and_currency(data, file_type)
-    data = filter_by_keyword(data)
-    print_transactions(data)
+    result = ingest(file_path, workers)
+    for failed, error in result.errors.items():
+        print(f"Не удалось загрузить {failed}: {error}", file=sys.stderr)
+    return result.table
+
+
+def run_in_store(
+    db_path: str, query: TransactionQuery, file_path: Optional[str], profiler: Profiler
+) -> TransactionTable:
+    """Загружает файлы (если указаны) в хранилище SQLite и выполняет в нем запрос."""
+    from src.ingest import expand_sources
+    from src.sqlite_store import TransactionStore
+
+    with TransactionStore(db_path) as store:
+        if file_path:
+            with profiler.stage("load") as stage:
+                stage.rows_out = sum(store.load_file(path) for path in expand_sources(file_path))
+        with profiler.stage("query", rows_in=len(store)) as stage:
+            result = store.run(query)
+            stage.rows_out = len(result)
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Главная функция программы, запускающая обработку транзакций.
+
+    Без аргументов работает в интерактивном режиме, с аргументами (см. parse_args) - без вопросов.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    args = parse_args(argv)
+    profiler = Profiler()
+    with cprofile(args.cprofile):
+        if argv and args.db:
+            result = run_in_store(args.db, query_from_args(args), args.file, profiler)
+        else:
+            if argv:
+                with profiler.stage("load") as stage:
+                    data = load_data(args.file or FILE_PATHS["json"], args.workers)
+                    stage.rows_out = len(data)
+                if args.incremental:
+                    from src.incremental import IncrementalProcessor
+
+                    with profiler.stage("incremental", rows_in=len(data)) as stage:
+                        processor = IncrementalProcessor(args.incremental, args.watermark)
+                        data = processor.update(data)
+                        stage.rows_out = len(data)
+                    print_incremental_summary(processor, len(data))
+                query = query_from_args(args)
+            else:
+                data, file_type = choose_file_format()
+                query = filter_by_keyword(sort_by_date_and_currency(filter_by_status(TransactionQuery())))
+            with profiler.stage("query", rows_in=len(data)) as stage:
+                result = query.run(data)
+                stage.rows_out = len(result)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as out:
+                print_transactions(result, profiler, out, args.page, args.page_size)
+        else:
+            print_transactions(result, profiler, page=args.page, page_size=args.page_size)
+    if args.profile_report:
+        profiler.save(args.profile_report)
 
 
 if __name__ == "__main__":
@@ -1,21 +1,96 @@
-from typing import Dict, List
+import csv
+import os
+import pickle
+from typing import Any, Dict, Iterator, List, Optional
 
+import numpy as np
 import pandas as pd
 
+from src.table import Categorical, TransactionTable
+
+# Схема файлов transactions.csv: типы столбцов задаются явно, без угадывания pandas
+CSV_DTYPES = {
+    "id": "Int64",
+    "state": "category",
+    "date": "object",
+    "amount": "float64",
+    "currency_name": "category",
+    "currency_code": "category",
+    "from": "object",
+    "to": "object",
+    "description": "category",
+}
+CSV_CHUNK_SIZE = 100_000
+# Версия формата файла-кэша XLSX: при изменении TransactionTable старые кэши перестраиваются
+XLSX_CACHE_VERSION = 1
+
+
+def _detect_separator(file_path: str) -> str:
+    """Определяет разделитель CSV-файла (";", "," или табуляция) по строке заголовка."""
+    with open(file_path, encoding="utf-8") as f:
+        header = f.readline()
+    try:
+        return csv.Sniffer().sniff(header, delimiters=";,\t").delimiter
+    except csv.Error:
+        return ","
+
 
 def read_transactions_csv(file_path: str) -> list:
     if file_path.endswith(".csv"):
         """
         read_transactions_csv возвращает список словарей
         """
-        df = pd.read_csv(file_path, encoding="utf-8")
-        transactions_list = df.to_dict(orient="records")
+        df = pd.read_csv(file_path, sep=_detect_separator(file_path), dtype=CSV_DTYPES, encoding="utf-8")
+        # Пропуски (NaN, pd.NA) превращаем в None, чтобы в словарях не было значений pandas
+        transactions_list = df.astype(object).where(df.notna(), None).to_dict(orient="records")
         return transactions_list
     else:
         print("Неверный формат файла CSV.")
         return []
 
 
+def _categorical(series: pd.Series) -> Categorical:
+    codes, uniques = pd.factorize(series.astype(object).fillna(""))
+    return Categorical(codes.astype(np.int32), tuple(str(value) for value in uniques))
+
+
+def table_from_frame(df: pd.DataFrame) -> TransactionTable:
+    """
+    Переводит DataFrame в плоском формате CSV/XLSX в TransactionTable без построения словарей.
+
+    Строки без id пропускаются, как и в TransactionTable.from_records.
+    """
+    df = df[df["id"].notna()]
+    dates = pd.to_datetime(df["date"], utc=True, format="ISO8601", errors="coerce").dt.tz_localize(None)
+    return TransactionTable(
+        id=df["id"].to_numpy(dtype=np.int64),
+        state=_categorical(df["state"]),
+        # NaT в int64 дает минимальное значение, то есть MISSING_DATE
+        date=dates.to_numpy(dtype="datetime64[us]").astype(np.int64),
+        amount=df["amount"].fillna(0.0).to_numpy(dtype=np.float64),
+        currency_code=_categorical(df["currency_code"]),
+        currency_name=_categorical(df["currency_name"]),
+        description=_categorical(df["description"]),
+        from_=df["from"].astype(object).fillna("").to_numpy(dtype=object),
+        to=df["to"].astype(object).fillna("").to_numpy(dtype=object),
+    )
+
+
+def iter_transactions_csv(file_path: str, chunksize: int = CSV_CHUNK_SIZE) -> Iterator[TransactionTable]:
+    """
+    Потоково читает CSV-файл с транзакциями пачками по chunksize строк.
+
+    Каждая пачка - TransactionTable, поэтому ее можно отфильтровать (filter_by_state, filter_by_currency)
+    и агрегировать (sum_amounts) сразу, не собирая весь файл в память.
+    """
+    reader = pd.read_csv(
+        file_path, sep=_detect_separator(file_path), dtype=CSV_DTYPES, encoding="utf-8", chunksize=chunksize
+    )
+    with reader:
+        for chunk in reader:
+            yield table_from_frame(chunk)
+
+
 def read_transactions_xlsx(file_path: str) -> List[Dict]:
     """
     Чтение финансовых операций из XLSX-файла.
@@ -24,6 +99,59 @@ def read_transactions_xlsx(file_path: str) -> List[Dict]:
     return opera_1.to_dict("records")  # Преобразуем DataFrame в список словарей
 
 
+def iter_transactions_xlsx(file_path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Потоково читает XLSX-файл построчно (openpyxl в режиме read_only).
+
+    Возвращает те же записи, что и read_transactions_xlsx, но по одной и без DataFrame;
+    пустые ячейки дают None.
+    """
+    from openpyxl import load_workbook  # type: ignore[import-untyped]
+
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [str(name) for name in header]
+        for row in rows:
+            yield dict(zip(columns, row))
+    finally:
+        workbook.close()
+
+
+def _xlsx_cache_path(file_path: str) -> str:
+    return file_path + ".cache.pkl"
+
+
+def read_xlsx_table(file_path: str, cache_path: Optional[str] = None) -> TransactionTable:
+    """
+    Загружает XLSX-файл в TransactionTable, используя файл-кэш рядом с исходным.
+
+    Кэш (pickle столбцовой таблицы) привязан ко времени изменения и размеру XLSX-файла:
+    пока файл не менялся, повторные запуски не разбирают XLSX вовсе.
+    """
+    cache_path = cache_path or _xlsx_cache_path(file_path)
+    stat = os.stat(file_path)
+    key = (XLSX_CACHE_VERSION, stat.st_mtime_ns, stat.st_size)
+    try:
+        with open(cache_path, "rb") as f:
+            cached_key, table = pickle.load(f)
+        if cached_key == key and isinstance(table, TransactionTable):
+            return table
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError, TypeError, AttributeError):
+        pass  # Кэша нет или он поврежден - перестраиваем
+
+    table = TransactionTable.from_records(iter_transactions_xlsx(file_path))
+    try:
+        with open(cache_path, "wb") as f:
+            pickle.dump((key, table), f, protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError:
+        pass  # Без кэша таблица все равно возвращается
+    return table
+
+
 """ Пример использования функции:
 #operations = read_transactions_xlsx("data/transactions_excel.xlsx")
 #print(operations)"""
@@ -1,32 +1,217 @@
+import atexit
 import datetime
 import functools
-from typing import Any, Callable
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
+FLUSH_EVERY = 1000
+FLUSH_INTERVAL = 1.0
+PERCENTILES = (50, 90, 99)
+# Сколько длительностей хранится на функцию для расчета перцентилей
+RESERVOIR_SIZE = 10_000
 
-def log(filename: Any = None) -> Callable:
+
+def _timestamp(seconds: float) -> str:
+    return datetime.datetime.fromtimestamp(seconds).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Перцентиль q (0-100) по методу ближайшего ранга; values должен быть отсортирован."""
+    if not values:
+        return 0.0
+    rank = max(int(-(-q * len(values) // 100)), 1)
+    return values[rank - 1]
+
+
+@dataclass
+class CallStats:
+    """
+    Накопленная статистика вызовов одной функции: длительности в секундах.
+
+    Память ограничена: для перцентилей хранится равномерная случайная выборка из не более
+    RESERVOIR_SIZE длительностей (reservoir sampling), максимум и сумма считаются точно.
+    Пока вызовов не больше RESERVOIR_SIZE, перцентили точные.
+    """
+
+    calls: int = 0
+    errors: int = 0
+    wall: List[float] = field(default_factory=list)
+    wall_max: float = 0.0
+    wall_total: float = 0.0
+    cpu_total: float = 0.0
+
+    def add(self, wall: float, cpu: float, ok: bool) -> None:
+        self.calls += 1
+        self.errors += not ok
+        if len(self.wall) < RESERVOIR_SIZE:
+            self.wall.append(wall)
+        else:
+            index = random.randrange(self.calls)
+            if index < RESERVOIR_SIZE:
+                self.wall[index] = wall
+        self.wall_max = max(self.wall_max, wall)
+        self.wall_total += wall
+        self.cpu_total += cpu
+
+    def summary(self) -> Dict[str, float]:
+        """Число вызовов, ошибок, перцентили и максимум wall-времени, суммарное CPU-время."""
+        wall = sorted(self.wall)
+        result: Dict[str, float] = {"calls": self.calls, "errors": self.errors}
+        for q in PERCENTILES:
+            result[f"wall_p{q}"] = percentile(wall, q)
+        result["wall_max"] = self.wall_max
+        result["wall_total"] = self.wall_total
+        result["cpu_total"] = self.cpu_total
+        return result
+
+
+class LogWriter:
     """
-    Декоратор для логирования вызова функции и ее результата.
+    Общий буферизованный писатель для декоратора log.
+
+    Строки копятся в памяти и записываются в файл одним open/write, когда их набирается
+    FLUSH_EVERY или с первой незаписанной строки прошло FLUSH_INTERVAL секунд (по фоновому
+    таймеру, даже если новых вызовов нет), а также при выходе из программы.
+    filename=None означает вывод в консоль без буферизации.
+    """
+
+    def __init__(self, filename: Optional[str]) -> None:
+        self.filename = filename
+        self._lock = threading.Lock()
+        # (время вызова, сообщение без времени) - время форматируется только при записи
+        self._lines: List[Tuple[float, str]] = []
+        self._stats: Dict[str, CallStats] = {}
+        self._timer: Optional[threading.Timer] = None
+
+    def write(self, started: float, message: str) -> None:
+        with self._lock:
+            self._lines.append((started, message))
+            # В консоль пишем сразу, в файл - пачками
+            if self.filename and len(self._lines) < FLUSH_EVERY:
+                if self._timer is None:
+                    self._timer = threading.Timer(FLUSH_INTERVAL, self.flush)
+                    self._timer.daemon = True
+                    self._timer.start()
+                return
+        self.flush()
+
+    def record(self, name: str, wall: float, cpu: float, ok: bool) -> None:
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                stats = self._stats[name] = CallStats()
+            stats.add(wall, cpu, ok)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {name: stats.summary() for name, stats in self._stats.items()}
+
+    def _stats_lines(self) -> List[Tuple[float, str]]:
+        now = time.time()
+        lines = []
+        for name, stats in self._stats.items():
+            summary = stats.summary()
+            lines.append(
+                (
+                    now,
+                    f"{name} calls={stats.calls} errors={stats.errors} "
+                    + " ".join(f"p{q}={summary[f'wall_p{q}'] * 1000:.3f}ms" for q in PERCENTILES)
+                    + f" max={stats.wall_max * 1000:.3f}ms cpu={stats.cpu_total:.6f}s",
+                )
+            )
+        self._stats.clear()
+        return lines
+
+    def flush(self, include_stats: bool = False) -> None:
+        """Записывает накопленные строки (и при include_stats - агрегированную статистику)."""
+        with self._lock:
+            lines = self._lines
+            if include_stats:
+                lines += self._stats_lines()
+            self._lines = []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if not lines:
+            return
+        text = "".join(f"{_timestamp(started)} {message}\n" for started, message in lines)
+        if self.filename:
+            with open(self.filename, "a") as f:
+                f.write(text)
+        else:
+            print(text, end="")
+
+
+_writers: Dict[Optional[str], LogWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def get_writer(filename: Optional[str]) -> LogWriter:
+    """Возвращает общий LogWriter для файла (один на имя файла)."""
+    with _writers_lock:
+        writer = _writers.get(filename)
+        if writer is None:
+            writer = _writers[filename] = LogWriter(filename)
+        return writer
+
+
+def flush_logs() -> None:
+    """Записывает все буферы и агрегированную статистику; вызывается автоматически при выходе."""
+    for writer in list(_writers.values()):
+        writer.flush(include_stats=True)
+
+
+def log_stats() -> Dict[str, Dict[str, float]]:
+    """Текущая статистика агрегированных функций: {имя функции: summary()}."""
+    result: Dict[str, Dict[str, float]] = {}
+    for writer in list(_writers.values()):
+        result.update(writer.stats())
+    return result
+
+
+atexit.register(flush_logs)
+
+
+def log(filename: Any = None, aggregate: bool = False) -> Callable:
+    """
+    Декоратор для логирования вызова функции, ее результата и длительности.
     Args:
         filename: (опционально) Имя файла для записи логов.
                    Если не указано, логи выводятся в консоль.
+        aggregate: Вместо строки на каждый вызов копить число вызовов и перцентили
+                   длительности и записывать их сводкой при flush_logs() или выходе.
     """
 
     def decorator(func: Callable) -> Callable:
+        writer = get_writer(filename)
+        name = func.__name__
+
         @functools.wraps(func)
         def wrapper(*args: Any, **kwargs: Any) -> Any:
-            timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            started = time.time()
+            wall_start = time.perf_counter()
+            cpu_start = time.process_time()
+            error: Optional[Exception] = None
             try:
                 result = func(*args, **kwargs)
-                log_message = f"{timestamp} {func.__name__} ok"
             except Exception as e:
                 result = None
-                log_message = f"{timestamp} {func.__name__} error: {type(e).__name__}. Inputs: {args}, {kwargs}"
+                error = e
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
 
-            if filename:
-                with open(filename, "a") as f:
-                    f.write(log_message + "\n")
+            if aggregate:
+                writer.record(name, wall, cpu, error is None)
+            elif error is None:
+                writer.write(started, f"{name} ok wall={wall:.6f}s cpu={cpu:.6f}s")
             else:
-                print(log_message)
+                writer.write(
+                    started,
+                    f"{name} error: {type(error).__name__}. Inputs: {args}, {kwargs} wall={wall:.6f}s cpu={cpu:.6f}s",
+                )
             return result
 
         return wrapper
@@ -36,24 +221,30 @@ def log(filename: Any = None) -> Callable:
 
 # Как это работает:
 #
-# 1. log(filename=None):
+# 1. log(filename=None, aggregate=False):
 #    - Внешняя функция декоратора.
-#    - filename: опциональный аргумент для имени файла лога.
+#    - filename: опциональный аргумент для имени файла лога; для каждого файла заводится
+#      один общий LogWriter.
 #
 # 2. decorator(func):
 #    - Внутренняя функция декоратора, которая принимает декорируемую функцию func.
 #
 # 3. wrapper(*args, **kwargs):
 #    - Обертка, которая будет вызываться вместо оригинальной функции.
-#    - Записывает текущее время.
+#    - Запоминает время вызова, wall-время (perf_counter) и CPU-время (process_time).
 #    - Блок try...except:
 #    - Пытается выполнить оригинальную функцию func.
 #    - Если успешен, формирует сообщение об успехе.
 #    - Если возникла ошибка, формирует сообщение об ошибке с типом ошибки и входными параметрами.
 #
 # 4. Запись лога:
-#    - Если filename указан, открывает файл в режиме добавления ("a") и записывает сообщение.
-#    - Иначе, выводит сообщение в консоль.
+#    - Сообщение кладется в буфер LogWriter; файл открывается один раз на пачку строк
+#      (FLUSH_EVERY строк или через FLUSH_INTERVAL секунд по фоновому таймеру)
+#      и при выходе из программы.
+#    - Если filename не указан, пачка выводится в консоль.
+#    - При aggregate=True строки не пишутся, а копится статистика: число вызовов,
+#      ошибок, перцентили wall-времени (по выборке не более RESERVOIR_SIZE значений)
+#      и суммарное CPU-время.
 #
 # 5. Возврат результата:
 #    - Возвращает результат выполнения оригинальной функции (или None, если была ошибка).
@@ -64,4 +255,4 @@ def my_function(x: int, y: int) -> int:
     return x + y
 
 
-my_function(1, 2)  # Вывод в файл mylog.txt
+"""my_function(1, 2)  # Вывод в файл mylog.txt"""
@@ -1,51 +1,250 @@
-import json
 import re
-from collections import Counter
-from typing import Any, Dict, List
+from collections import Counter, defaultdict
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Union, overload
 
+import numpy as np
 
-def search_transactions(transactions_1: List[Dict[str, Any]], search_string: str) -> List[Dict[str, Any]]:
+from src.logger import setup_logging
+from src.table import Record, RecordT, TransactionTable
+from src.utils import iter_json_file
+
+logger = setup_logging(__name__)
+
+
+REGEX_SPECIAL_CHARS = frozenset(".^$*+?{}[]\\|()")
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def compile_search(search_string: str, ignore_case: bool = False, regex: bool = True) -> Callable[[str], bool]:
+    """
+    Компилирует строку поиска один раз и возвращает функцию проверки описания.
+
+    Строка без специальных символов регулярных выражений ищется как обычная подстрока (быстрее re).
+    Некорректное регулярное выражение (например, одиночная "(") записывается в лог и ищется как подстрока.
+    """
+    flags = re.IGNORECASE if ignore_case else 0
+    if regex and REGEX_SPECIAL_CHARS.intersection(search_string):
+        try:
+            pattern = re.compile(search_string, flags)
+            return lambda description: pattern.search(description) is not None
+        except re.error as e:
+            logger.warning(f"Некорректное регулярное выражение {search_string!r}, ищем как подстроку: {e}")
+    if ignore_case:
+        literal = re.compile(re.escape(search_string), re.IGNORECASE)
+        return lambda description: literal.search(description) is not None
+    return lambda description: search_string in description
+
+
+def _is_literal(search_string: str, regex: bool) -> bool:
+    return not regex or not REGEX_SPECIAL_CHARS.intersection(search_string)
+
+
+@overload
+def search_transactions(
+    transactions_1: TransactionTable, search_string: str, ignore_case: bool = ..., regex: bool = ...
+) -> TransactionTable: ...
+
+
+@overload
+def search_transactions(
+    transactions_1: List[RecordT], search_string: str, ignore_case: bool = ..., regex: bool = ...
+) -> List[RecordT]: ...
+
+
+def search_transactions(
+    transactions_1: Union[List[RecordT], TransactionTable],
+    search_string: str,
+    ignore_case: bool = False,
+    regex: bool = True,
+) -> Union[List[RecordT], TransactionTable]:
     """
     Фильтрация списка словарей, проверяя наличие строки поиска в описании.
 
-        transactions_1 Список словарей с транзакциями.
-        search_string Строка поиска.
+        transactions_1 Список словарей с транзакциями или TransactionTable.
+        search_string Строка поиска (регулярное выражение, если regex=True).
+        ignore_case Искать без учета регистра.
+        regex Считать строку поиска регулярным выражением; иначе ищется обычная подстрока.
 
-    Returns Отфильтрованный список словарей с транзакциями.
+    Returns Отфильтрованный список словарей с транзакциями (для TransactionTable - TransactionTable,
+    при этом поиск выполняется один раз на каждое различное описание).
     """
+    matches = compile_search(search_string, ignore_case, regex)
+    if isinstance(transactions_1, TransactionTable):
+        return transactions_1.take(transactions_1.description.mask_where(matches))
     return [
         transaction
         for transaction in transactions_1
-        if "description" in transaction and re.search(search_string, transaction["description"])
+        if isinstance(transaction.get("description"), str) and matches(transaction["description"])
     ]
 
 
+class DescriptionIndex:
+    """
+    Обратный индекс по словам описаний для повторных поисков в одном наборе транзакций.
+
+    Строится один раз (например, сразу после загрузки): для каждого слова хранится
+    отсортированный список номеров описаний, где оно встречается. Поиск подстроки
+    пересекает списки слов запроса и проверяет только найденных кандидатов; результаты
+    запросов запоминаются. Регулярные выражения проверяются перебором, но тоже кэшируются.
+    Для TransactionTable индексируются различные описания, а не строки.
+    """
+
+    def __init__(self, transactions: Union[Sequence[Record], TransactionTable]) -> None:
+        self.transactions = transactions
+        self._descriptions: List[Optional[str]]
+        if isinstance(transactions, TransactionTable):
+            self._descriptions = list(transactions.description.categories)
+        else:
+            self._descriptions = [
+                description if isinstance(description, str) else None
+                for description in (transaction.get("description") for transaction in transactions)
+            ]
+        postings: Dict[str, List[int]] = defaultdict(list)
+        for i, description in enumerate(self._descriptions):
+            if description:
+                for token in set(TOKEN_PATTERN.findall(description.lower())):
+                    postings[token].append(i)
+        self._postings = {token: np.asarray(ids, dtype=np.int64) for token, ids in postings.items()}
+        self._token_cache: Dict[str, np.ndarray] = {}
+        self._results: Dict[tuple[str, bool, bool], np.ndarray] = {}
+
+    def _token_postings(self, token: str) -> np.ndarray:
+        """Номера описаний, в словах которых встречается token (часть слова тоже подходит)."""
+        if token not in self._token_cache:
+            lists = [ids for word, ids in self._postings.items() if token in word]
+            merged = np.unique(np.concatenate(lists)) if lists else np.empty(0, dtype=np.int64)
+            self._token_cache[token] = merged
+        return self._token_cache[token]
+
+    def _candidates(self, search_string: str) -> Optional[np.ndarray]:
+        tokens = TOKEN_PATTERN.findall(search_string.lower())
+        if not tokens:
+            return None
+        candidates = self._token_postings(tokens[0])
+        for token in tokens[1:]:
+            candidates = np.intersect1d(candidates, self._token_postings(token), assume_unique=True)
+        return candidates
+
+    def positions(self, search_string: str, ignore_case: bool = False, regex: bool = True) -> np.ndarray:
+        """Номера описаний (в порядке возрастания), подходящих под строку поиска."""
+        key = (search_string, ignore_case, regex)
+        if key not in self._results:
+            matches = compile_search(search_string, ignore_case, regex)
+            candidates = self._candidates(search_string) if _is_literal(search_string, regex) else None
+            ids = candidates.tolist() if candidates is not None else range(len(self._descriptions))
+            descriptions = self._descriptions
+            found = [i for i in ids if (description := descriptions[i]) is not None and matches(description)]
+            self._results[key] = np.asarray(found, dtype=np.int64)
+        return self._results[key]
+
+    def search(self, search_string: str, ignore_case: bool = False, regex: bool = True) -> Any:
+        """То же, что search_transactions, но с ответом из индекса: список словарей или TransactionTable."""
+        found = self.positions(search_string, ignore_case, regex)
+        if isinstance(self.transactions, TransactionTable):
+            matched = np.zeros(len(self._descriptions), dtype=bool)
+            matched[found] = True
+            return self.transactions.take(matched[self.transactions.description.codes])
+        return [self.transactions[i] for i in found.tolist()]
+
+
+class CategorizationResult(NamedTuple):
+    """Результат категоризации: число операций по категориям и (по запросу) категория каждой операции."""
+
+    counts: Dict[str, int]
+    labels: Optional[List[Optional[str]]]
+
+
+class CompiledCategorizer:
+    """
+    Категоризатор, собирающий все ключевые слова всех категорий в одно регулярное выражение.
+
+    Выражение вида (?=(слово1|слово2|...)) находит в описании все вхождения ключевых слов,
+    включая перекрывающиеся. Слова упорядочены по номеру категории, поэтому в каждой позиции
+    находится слово самой ранней категории, и результат совпадает с правилом
+    "побеждает первая подходящая категория" из categorize_transactions.
+    Описание приводится к нижнему регистру один раз, а результат для каждого
+    различного описания запоминается.
+    """
+
+    cache_size = 100_000
+
+    def __init__(self, categories: Dict[str, List[str]]) -> None:
+        self.categories = list(categories)
+        self._category_of: Dict[str, int] = {}
+        for index, keywords in enumerate(categories.values()):
+            for keyword in keywords:
+                self._category_of.setdefault(keyword.lower(), index)
+        keywords_in_order = sorted(self._category_of, key=self._category_of.__getitem__)
+        alternatives = "|".join(re.escape(keyword) for keyword in keywords_in_order)
+        self._pattern = re.compile(f"(?=({alternatives}))") if keywords_in_order else None
+        self._cache: Dict[str, Optional[int]] = {}
+
+    def category_index(self, description: Any) -> Optional[int]:
+        """Номер первой подходящей категории для описания или None."""
+        if not isinstance(description, str) or self._pattern is None:
+            return None
+        if description in self._cache:
+            return self._cache[description]
+        best: Optional[int] = None
+        for match in self._pattern.finditer(description.lower()):
+            index = self._category_of[match.group(1)]
+            if best is None or index < best:
+                best = index
+                if best == 0:
+                    break
+        if len(self._cache) >= self.cache_size:
+            self._cache.clear()
+        self._cache[description] = best
+        return best
+
+    def classify(self, description: Any) -> Optional[str]:
+        """Название первой подходящей категории для описания или None."""
+        index = self.category_index(description)
+        return None if index is None else self.categories[index]
+
+    def categorize(
+        self, transactions: Union[Iterable[Record], TransactionTable], with_labels: bool = False
+    ) -> CategorizationResult:
+        """
+        Подсчитывает операции по категориям за один проход.
+
+        Args:
+            transactions Список (или любой итератор) словарей с транзакциями или TransactionTable.
+            with_labels Вернуть также категорию каждой операции (None, если ни одна не подошла).
+        """
+        if isinstance(transactions, TransactionTable):
+            indices = [self.category_index(d) for d in transactions.description.categories]
+            row_indices: Iterable[Optional[int]] = (indices[code] for code in transactions.description.codes)
+        else:
+            row_indices = (self.category_index(transaction.get("description")) for transaction in transactions)
+
+        counts: Dict[str, int] = Counter()
+        labels: Optional[List[Optional[str]]] = [] if with_labels else None
+        for index in row_indices:
+            if index is not None:
+                counts[self.categories[index]] += 1
+            if labels is not None:
+                labels.append(None if index is None else self.categories[index])
+        return CategorizationResult(dict(counts), labels)
+
+
 def categorize_transactions(
-    transactions_2: List[Dict[str, Any]], categories_2: Dict[str, List[str]]
+    transactions_2: Union[Iterable[Record], TransactionTable], categories_2: Dict[str, List[str]]
 ) -> Dict[str, int]:
     """
     Подсчет операций в каждой категории, используя заданные ключевые слова.
 
-        transactions_2 Список словарей с транзакциями.
+        transactions_2 Список (или любой итератор) словарей с транзакциями или TransactionTable.
         categories_2 Словарь с категориями и соответствующими ключевыми словами.
 
     Returns Словарь, где ключи - названия категорий, а значения - количество транзакций, относящихся к каждой категории.
+    Операция относится к первой категории, хотя бы одно ключевое слово которой есть в описании (без учета регистра).
     """
-    category_counts_2: Dict[str, int] = Counter()
-
-    for transaction in transactions_2:
-        if "description" in transaction:
-            for category, keywords in categories_2.items():
-                # Проверяем наличие хотя бы одного ключевого слова в описании транзакции
-                if any(keyword.lower() in transaction["description"].lower() for keyword in keywords):
-                    category_counts_2[category] += 1
-                    break  # Выход из цикла по категориям, если найдено совпадение
-
-    return dict(category_counts_2)
+    return CompiledCategorizer(categories_2).categorize(transactions_2).counts
 
 
 # Пример использования:
-def read_transactions_from_json(file_path: str) -> Any:
+def read_transactions_from_json(file_path: str) -> Iterator[Dict[str, Any]]:
     """
     Чтение транзакций из JSON-файла.
 
@@ -53,32 +252,32 @@ def read_transactions_from_json(file_path: str) -> Any:
         file_path (str): Путь к JSON-файлу.
 
     Returns:
-        List[Dict[str, Any]]: Список словарей с транзакциями из JSON-файла.
+        Iterator[Dict[str, Any]]: Транзакции из JSON-файла по одной (файл читается потоково).
     """
-    with open(file_path, "r", encoding="utf-8") as file:
-        return json.load(file)
+    return iter_json_file(file_path)
 
 
-transactions = read_transactions_from_json("data/operations.json")
+if __name__ == "__main__":
+    transactions = read_transactions_from_json("data/operations.json")
 
-categories = {"Перевод": ["Перевод организации", "Перевод частному лицу"]}
+    categories = {"Перевод": ["Перевод организации", "Перевод частному лицу"]}
 
-category_counts = categorize_transactions(transactions, categories)
-# print("Количество операций в каждой категории:", category_counts)
+    category_counts = categorize_transactions(transactions, categories)
+    # print("Количество операций в каждой категории:", category_counts)
 
-transactions_4 = [
-    {"description": "Оплата за интернет"},
-    {"description": "Покупка продуктов в магазине"},
-    {"description": "Перевод денег другу"},
-    {"description": "Оплата за мобильную связь"},
-    {"description": "Покупка билетов на концерт"}
-]
+    transactions_4 = [
+        {"description": "Оплата за интернет"},
+        {"description": "Покупка продуктов в магазине"},
+        {"description": "Перевод денег другу"},
+        {"description": "Оплата за мобильную связь"},
+        {"description": "Покупка билетов на концерт"}
+    ]
 
-categories_4 = {
-    "Интернет": ["интернет", "онлайн"],
-    "Продукты": ["продукты", "магазин"],
-    "Другое": ["перевод", "концерт", "билеты"]
-}
+    categories_4 = {
+        "Интернет": ["интернет", "онлайн"],
+        "Продукты": ["продукты", "магазин"],
+        "Другое": ["перевод", "концерт", "билеты"]
+    }
 
-result = categorize_transactions(transactions_4, categories_4)
-print(result)  # Вывод: {'Интернет': 1, 'Продукты': 1, 'Другое': 3}
+    result = categorize_transactions(transactions_4, categories_4)
+    print(result)  # Вывод: {'Интернет': 1, 'Продукты': 1, 'Другое': 3}
@@ -1,23 +1,50 @@
+import asyncio
+import json
 import os
-from typing import Any
-
-import requests
-from dotenv import load_dotenv
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Protocol, Tuple, Union
 
 from src.logger import setup_logging
 
-logger = setup_logging()
+logger = setup_logging(__name__)
+
+DEFAULT_LATEST_URL = "https://api.apilayer.com/exchangerates_data/latest"
+
+
+@lru_cache(maxsize=None)
+def api_key() -> Optional[str]:
+    """Ключ API из окружения; файл .env читается (и python-dotenv импортируется) только при первом запросе."""
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    return os.getenv("api_key")
+
 
+def latest_url() -> str:
+    """
+    Адрес запроса latest: RATES_URL из окружения или .env (например, локальный сервер-заглушка).
 
-load_dotenv()
-API_KEY = os.getenv("api_key")
+    Читается при запросе, а не при импорте, чтобы переменная из .env тоже учитывалась.
+    """
+    api_key()
+    return os.getenv("RATES_URL", DEFAULT_LATEST_URL)
+
+
+class RateSource(Protocol):
+    """Источник курсов валют к рублю: CurrencyRateProvider или AsyncRateClient."""
+
+    def get_rates(self, currencies: Iterable[Any]) -> Dict[str, float]: ...
 
 
 def get_currency_rate(currency: Any) -> float:
     """Получает курс валюты от API и возвращает его в виде float"""
+    import requests
+
     url = f"https://api.apilayer.com/exchangerates_data/latest?symbols=RUB&base={currency}"
     try:
-        response = requests.get(url, headers={"apikey": API_KEY}, timeout=5)
+        response = requests.get(url, headers={"apikey": api_key()}, timeout=5)
         response.raise_for_status()  # Поднимает исключение, если код ответа не 2xx
         response_data = response.json()
         rate = response_data["rates"]["RUB"]
@@ -30,3 +57,271 @@ def get_currency_rate(currency: Any) -> float:
     except requests.exceptions.RequestException as e:
         logger.error(f"Ошибка API при получении курса {currency}/RUB: {e}")
         return 1.0
+
+
+class CurrencyRateProvider:
+    """
+    Поставщик курсов валют к рублю с кэшем.
+
+    Все недостающие валюты запрашиваются одним запросом ``latest`` с базой RUB,
+    полученные курсы хранятся в памяти ``ttl`` секунд и, если задан ``cache_file``,
+    сохраняются в JSON-файл, чтобы перезапуск программы не запрашивал их повторно.
+    При ошибке API используется последний известный (устаревший) курс, а если его нет,
+    валюта в результат не попадает (как и у AsyncRateClient); повторный запрос для этой
+    валюты делается не раньше чем через ``retry_after`` секунд.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 3600.0,
+        cache_file: Optional[Union[str, Path]] = None,
+        retry_after: float = 60.0,
+        url: Optional[str] = None,
+    ) -> None:
+        self.url = url
+        self.ttl = ttl
+        self.retry_after = retry_after
+        self.cache_file = Path(cache_file) if cache_file else None
+        self.requests_made = 0
+        # число запрошенных валют, найденных в кэше и отсутствовавших в нем
+        self.cache_hits = 0
+        self.cache_misses = 0
+        # код валюты -> (курс к рублю, время получения)
+        self._rates: Dict[str, Tuple[float, float]] = {}
+        # код валюты -> (устаревший курс или None, если его нет, время неудачи)
+        self._failures: Dict[str, Tuple[Optional[float], float]] = {}
+        # Файл кэша читается при первом обращении, а не при создании объекта
+        self._cache_loaded = self.cache_file is None
+
+    def get_rates(self, currencies: Iterable[Any]) -> Dict[str, float]:
+        """
+        Возвращает словарь курсов к рублю для переданных кодов валют.
+
+        Валюты, которых нет в ответе API, в результат не попадают.
+        """
+        if not self._cache_loaded:
+            self._cache_loaded = True
+            self._load_cache()
+        codes = {str(code) for code in currencies if code and code != "RUB"}
+        now = time.time()
+        missing = sorted(code for code in codes if not self._is_cached(code, now))
+        self.cache_hits += len(codes) - len(missing)
+        self.cache_misses += len(missing)
+        if missing:
+            self._fetch(missing, now)
+
+        rates = {"RUB": 1.0}
+        for code in codes:
+            if code in self._rates:
+                rates[code] = self._rates[code][0]
+                continue
+            fallback = self._failures.get(code, (None, 0.0))[0]
+            if fallback is not None:
+                rates[code] = fallback
+        return rates
+
+    def get_rate(self, currency: Any) -> Optional[float]:
+        """Возвращает курс одной валюты к рублю или None, если валюта неизвестна."""
+        return self.get_rates([currency]).get(currency)
+
+    def clear(self) -> None:
+        """Очищает кэш в памяти (файл кэша не удаляется)."""
+        self._rates.clear()
+        self._failures.clear()
+
+    def _is_cached(self, code: str, now: float) -> bool:
+        if code in self._rates and now - self._rates[code][1] < self.ttl:
+            return True
+        return code in self._failures and now - self._failures[code][1] < self.retry_after
+
+    def _fetch(self, codes: list, now: float) -> None:
+        """Запрашивает курсы всех переданных валют одним запросом."""
+        import requests
+
+        self.requests_made += 1
+        try:
+            response = requests.get(
+                self.url or latest_url(),
+                params={"base": "RUB", "symbols": ",".join(codes)},
+                headers={"apikey": api_key()},
+                timeout=5,
+            )
+            response.raise_for_status()
+            api_rates = response.json().get("rates", {})
+        except (requests.exceptions.RequestException, ValueError) as e:
+            logger.error(f"Ошибка API при получении курсов {','.join(codes)}/RUB: {e}")
+            for code in codes:
+                stale = self._rates.get(code)
+                if stale is not None:
+                    logger.warning(f"Используется устаревший курс {code}/RUB: {stale[0]}")
+                self._failures[code] = (stale[0] if stale is not None else None, now)
+            return
+
+        for code in codes:
+            rate = api_rates.get(code)
+            if rate:
+                # API возвращает количество валюты за 1 рубль, нам нужен курс валюты в рублях
+                self._rates[code] = (1 / float(rate), now)
+                self._failures.pop(code, None)
+                logger.info(f"Курс {code}/RUB: {self._rates[code][0]}")
+            else:
+                logger.error(f"Курс {code}/RUB не найден в ответе API")
+                self._failures[code] = (None, now)
+        self._save_cache()
+
+    def _load_cache(self) -> None:
+        if self.cache_file is None or not self.cache_file.exists():
+            return
+        try:
+            with open(self.cache_file, encoding="utf-8") as f:
+                data = json.load(f)
+            self._rates = {code: (float(rate), float(fetched_at)) for code, (rate, fetched_at) in data.items()}
+        except (OSError, ValueError, TypeError) as e:
+            logger.error(f"Ошибка при чтении кэша курсов {self.cache_file}: {e}")
+
+    def _save_cache(self) -> None:
+        if self.cache_file is None:
+            return
+        try:
+            with open(self.cache_file, "w", encoding="utf-8") as f:
+                json.dump({code: list(value) for code, value in self._rates.items()}, f)
+        except OSError as e:
+            logger.error(f"Ошибка при записи кэша курсов {self.cache_file}: {e}")
+
+
+class AsyncRateClient:
+    """
+    Асинхронный клиент курсов валют к рублю.
+
+    Курсы нескольких валют запрашиваются параллельно (не больше ``max_concurrency``
+    запросов одновременно) через общий пул соединений ``requests.Session``; сам запрос
+    выполняется в потоке через asyncio.to_thread. Ошибки сети и ответы 429/5xx повторяются
+    до ``retries`` раз с экспоненциальной задержкой ``backoff * 2**попытка``. Если курс так
+    и не получен, возвращается последний полученный курс (даже устаревший), а без него
+    валюта в результат не попадает - вместо молчаливого 1.0.
+    """
+
+    RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        max_concurrency: int = 4,
+        retries: int = 3,
+        backoff: float = 0.5,
+        timeout: float = 5.0,
+        ttl: float = 3600.0,
+    ) -> None:
+        self.url = url
+        self.max_concurrency = max_concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.ttl = ttl
+        self.requests_made = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        # код валюты -> (курс к рублю, время получения); устаревшие записи не удаляются
+        self._rates: Dict[str, Tuple[float, float]] = {}
+        self._session: Any = None
+
+    def session(self) -> Any:
+        """Общая requests.Session с пулом на max_concurrency соединений (создается при первом запросе)."""
+        if self._session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=self.max_concurrency, pool_maxsize=self.max_concurrency)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers["apikey"] = api_key() or ""
+            self._session = session
+        return self._session
+
+    def close(self) -> None:
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+    def _request(self, currency: str) -> float:
+        """Один синхронный запрос курса currency/RUB (выполняется в отдельном потоке)."""
+        self.requests_made += 1
+        response = self.session().get(
+            self.url or latest_url(), params={"symbols": "RUB", "base": currency}, timeout=self.timeout
+        )
+        response.raise_for_status()
+        return float(response.json()["rates"]["RUB"])
+
+    def _should_retry(self, error: Exception) -> bool:
+        import requests
+
+        if isinstance(error, requests.exceptions.HTTPError):
+            return error.response is not None and error.response.status_code in self.RETRY_STATUSES
+        return isinstance(error, requests.exceptions.RequestException)
+
+    async def fetch_rate(self, currency: str, semaphore: Optional[asyncio.Semaphore] = None) -> Optional[float]:
+        """Курс currency/RUB с повторами; при неудаче - последний известный курс или None."""
+        semaphore = semaphore or asyncio.Semaphore(self.max_concurrency)
+        for attempt in range(self.retries + 1):
+            try:
+                async with semaphore:
+                    rate = await asyncio.to_thread(self._request, currency)
+            except Exception as e:
+                if attempt < self.retries and self._should_retry(e):
+                    await asyncio.sleep(self.backoff * 2**attempt)
+                    continue
+                logger.error(f"Ошибка API при получении курса {currency}/RUB: {e}")
+                break
+            self._rates[currency] = (rate, time.time())
+            logger.info(f"Курс {currency}/RUB: {rate}")
+            return rate
+
+        stale = self._rates.get(currency)
+        if stale is None:
+            return None
+        logger.warning(f"Используется устаревший курс {currency}/RUB: {stale[0]}")
+        return stale[0]
+
+    async def fetch_rates(self, currencies: Iterable[Any]) -> Dict[str, float]:
+        """Курсы к рублю для всех валют; свежие курсы из кэша не запрашиваются повторно."""
+        codes = sorted({str(code) for code in currencies if code and code != "RUB"})
+        now = time.time()
+        rates = {"RUB": 1.0}
+        missing: List[str] = []
+        for code in codes:
+            cached = self._rates.get(code)
+            if cached is not None and now - cached[1] < self.ttl:
+                rates[code] = cached[0]
+            else:
+                missing.append(code)
+        self.cache_hits += len(codes) - len(missing)
+        self.cache_misses += len(missing)
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        fetched = await asyncio.gather(*(self.fetch_rate(code, semaphore) for code in missing))
+        rates.update({code: rate for code, rate in zip(missing, fetched) if rate is not None})
+        return rates
+
+    def get_rates(self, currencies: Iterable[Any]) -> Dict[str, float]:
+        """Синхронная обертка над fetch_rates для кода без собственного цикла событий."""
+        return asyncio.run(self.fetch_rates(currencies))
+
+    def get_rate(self, currency: Any) -> Optional[float]:
+        """Курс одной валюты к рублю или None, если его не удалось получить."""
+        return self.get_rates([currency]).get(currency)
+
+
+@lru_cache(maxsize=None)
+def default_rate_provider() -> Union[CurrencyRateProvider, AsyncRateClient]:
+    """
+    Общий источник курсов для функций конвертации.
+
+    По умолчанию - CurrencyRateProvider (RATES_TTL, RATES_CACHE_FILE), при RATES_CLIENT=async -
+    AsyncRateClient с параллельными запросами и повторами. Переменные окружения читаются
+    при первом вызове; .env загружается позже, только перед первым запросом к API.
+    """
+    ttl = float(os.getenv("RATES_TTL", "3600"))
+    if os.getenv("RATES_CLIENT", "").lower() == "async":
+        return AsyncRateClient(ttl=ttl)
+    return CurrencyRateProvider(ttl=ttl, cache_file=os.getenv("RATES_CACHE_FILE") or None)
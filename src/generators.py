@@ -1,18 +1,23 @@
 from random import randint
-from typing import Any, Generator, List
+from typing import Any, Generator, Iterable, Iterator, Union, overload
 
+from src.table import Record, RecordT, TransactionTable
 
-def transaction_descriptions(transactions: List[dict]) -> Generator[str, None, None]:
+
+def transaction_descriptions(transactions: Iterable[Record]) -> Generator[str, None, None]:
     """
     Генератор, возвращающий описания транзакций.
+
+    Принимает любой итератор, например iter_json_file, и пропускает записи без описания.
     """
     for transaction in transactions:
-        yield transaction["description"]
+        if "description" in transaction:
+            yield transaction["description"]
 
 
 # Пример вызова функции
 
-transactions = [
+"""transactions = [
     {"id": 1, "description": "Перевод организации"},
     {"id": 2, "description": "Перевод со счета на счет"},
     {"id": 3, "description": "Перевод со счета на счет"},
@@ -22,21 +27,42 @@ transactions = [
 
 descriptions = transaction_descriptions(transactions)
 
-"""for _ in range(5):
+for _ in range(5):
     print(next(descriptions))"""
 
 
-def filter_by_currency(transactions: List[dict], currency: str) -> Generator[Any, None, None]:
+@overload
+def filter_by_currency(transactions: TransactionTable, currency: str) -> TransactionTable: ...
+
+
+@overload
+def filter_by_currency(transactions: Iterable[RecordT], currency: str) -> Iterator[RecordT]: ...
+
+
+def filter_by_currency(
+    transactions: Union[Iterable[RecordT], TransactionTable], currency: str
+) -> Union[Iterator[RecordT], TransactionTable]:
     """
-    Генератор, возвращающий операции с заданной валютой из списка transactions.
+    Возвращает итератор по операциям с заданной валютой из списка transactions.
+
+    Понимает как формат JSON (operationAmount), так и плоский формат CSV/XLSX (currency_code).
+    Для TransactionTable фильтрация выполняется маской и возвращается TransactionTable.
     """
-    for transaction in transactions:
-        if transaction.get("operationAmount", {}).get("currency", {}).get("code") == currency:
-            yield transaction
+    if isinstance(transactions, TransactionTable):
+        return transactions.take(transactions.currency_code.mask(currency))
+    return (transaction for transaction in transactions if transaction_currency(transaction) == currency)
+
+
+def transaction_currency(transaction: Record) -> Any:
+    """Код валюты транзакции в формате JSON (operationAmount) или CSV/XLSX (currency_code)."""
+    operation_amount = transaction.get("operationAmount")
+    if operation_amount is not None:
+        return operation_amount.get("currency", {}).get("code")
+    return transaction.get("currency_code")
 
 
 # Пример вызова функции
-transactions = [
+"""transactions = [
     {"id": 939719570, "operationAmount": {"currency": {"name": "USD", "code": "USD"}}},
     {"id": 142264268, "operationAmount": {"currency": {"name": "USD", "code": "USD"}}},
     {"id": 873106923, "operationAmount": {"currency": {"name": "RUB", "code": "RUB"}}},
@@ -45,7 +71,7 @@ transactions = [
 
 usd_transactions = filter_by_currency(transactions, "USD")
 
-"""for _ in range(2):
+for _ in range(2):
     print(next(usd_transactions)["id"])"""
 """
 Этот код реализует функцию `filter_by_currency`, которая фильтрует операции в
@@ -0,0 +1,192 @@
+import json
+import os
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+import numpy as np
+
+from src.dictionary_handler import CompiledCategorizer
+from src.external_API import RateSource, default_rate_provider
+from src.logger import setup_logging
+from src.table import MISSING_DATE, TransactionTable, format_date
+
+logger = setup_logging(__name__)
+
+STATE_VERSION = 2
+WATERMARK_MODES = ("ids", "date")
+DEFAULT_CATEGORIES = {
+    "Вклады": ["вклад"],
+    "Переводы организациям": ["организации"],
+    "Переводы с карты": ["с карты"],
+    "Переводы со счета": ["со счета"],
+}
+
+
+@dataclass
+class IncrementalState:
+    """
+    Сохраняемое между запусками состояние инкрементальной обработки.
+
+    Водяной знак - максимальная дата обработанных операций (микросекунды от эпохи) и
+    отсортированный массив их id. Агрегаты: число операций по состояниям и категориям
+    и суммы по валютам в самой валюте операции. В рубли суммы переводятся только в summary,
+    по текущим курсам, поэтому неудачный запрос курсов не попадает в сохраненное состояние.
+    """
+
+    mode: str = "ids"
+    categories: Dict[str, List[str]] = field(default_factory=lambda: dict(DEFAULT_CATEGORIES))
+    max_date: int = int(MISSING_DATE)
+    seen_ids: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int64))
+    processed: int = 0
+    state_counts: Counter = field(default_factory=Counter)
+    category_counts: Counter = field(default_factory=Counter)
+    native_totals: Dict[str, float] = field(default_factory=dict)
+
+    def summary(self, provider: Optional[RateSource] = None) -> Dict[str, Any]:
+        """
+        Агрегаты в виде словаря для вывода или JSON.
+
+        Суммы по валютам переводятся в рубли курсами provider (по умолчанию общий поставщик);
+        валюты без курса не входят в total_rub и перечислены в unconverted.
+        """
+        rates = (provider or default_rate_provider()).get_rates(self.native_totals) if self.native_totals else {}
+        currency_totals = {code: total * rates[code] for code, total in self.native_totals.items() if code in rates}
+        return {
+            "processed": self.processed,
+            "max_date": format_date(self.max_date),
+            "states": dict(self.state_counts),
+            "categories": dict(self.category_counts),
+            "native_totals": dict(self.native_totals),
+            "currency_totals": currency_totals,
+            "unconverted": sorted(set(self.native_totals) - set(currency_totals)),
+            "total_rub": sum(currency_totals.values()),
+        }
+
+
+def _ids_path(state_path: Path) -> Path:
+    return state_path.with_name(state_path.name + ".ids.npy")
+
+
+def load_state(state_path: Union[str, Path]) -> Optional[IncrementalState]:
+    """Читает состояние (JSON с агрегатами и .ids.npy с id) или возвращает None, если его нет."""
+    state_path = Path(state_path)
+    if not state_path.exists():
+        return None
+    with open(state_path, encoding="utf-8") as f:
+        data = json.load(f)
+    if data.get("version") != STATE_VERSION:
+        raise ValueError(f"Неподдерживаемая версия файла состояния {state_path}: {data.get('version')}")
+    ids_path = _ids_path(state_path)
+    return IncrementalState(
+        mode=data["mode"],
+        categories=data["categories"],
+        max_date=int(data["max_date"]),
+        seen_ids=np.load(ids_path) if ids_path.exists() else np.empty(0, dtype=np.int64),
+        processed=int(data["processed"]),
+        state_counts=Counter(data["state_counts"]),
+        category_counts=Counter(data["category_counts"]),
+        native_totals={code: float(total) for code, total in data["native_totals"].items()},
+    )
+
+
+def save_state(state: IncrementalState, state_path: Union[str, Path]) -> None:
+    """Записывает состояние; файлы заменяются целиком, так что прерванная запись не портит прежнее."""
+    state_path = Path(state_path)
+    data = {
+        "version": STATE_VERSION,
+        "mode": state.mode,
+        "categories": state.categories,
+        "max_date": state.max_date,
+        "processed": state.processed,
+        "state_counts": dict(state.state_counts),
+        "category_counts": dict(state.category_counts),
+        "native_totals": state.native_totals,
+    }
+    ids_path = _ids_path(state_path)
+    # np.save сам дописывает .npy, поэтому временный файл тоже с этим суффиксом
+    ids_tmp = ids_path.with_name(ids_path.name[: -len(".npy")] + ".tmp.npy")
+    np.save(ids_tmp, state.seen_ids)
+    os.replace(ids_tmp, ids_path)
+    state_tmp = state_path.with_name(state_path.name + ".tmp")
+    with open(state_tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(state_tmp, state_path)
+
+
+class IncrementalProcessor:
+    """
+    Инкрементальная обработка выгрузок: каждый запуск учитывает только новые операции.
+
+    Новые операции определяются по водяному знаку: в режиме "ids" - id, которых еще не было
+    (повторы внутри выгрузки тоже отбрасываются), в режиме "date" - дата строго позже
+    максимальной обработанной. Агрегаты новых операций считаются по столбцам TransactionTable
+    и добавляются к сохраненным, поэтому работа после загрузки файла пропорциональна приросту.
+    """
+
+    def __init__(
+        self,
+        state_path: Union[str, Path],
+        mode: str = "ids",
+        categories: Optional[Dict[str, List[str]]] = None,
+        provider: Optional[RateSource] = None,
+    ) -> None:
+        if mode not in WATERMARK_MODES:
+            raise ValueError(f"Неизвестный режим водяного знака: {mode}")
+        self.state_path = Path(state_path)
+        self.provider = provider
+        stored = load_state(self.state_path)
+        if stored is None:
+            stored = IncrementalState(mode=mode, categories=categories or dict(DEFAULT_CATEGORIES))
+        elif stored.mode != mode or (categories is not None and categories != stored.categories):
+            raise ValueError(
+                f"Состояние {self.state_path} посчитано с другим режимом или категориями; удалите файл для пересчета"
+            )
+        self.state = stored
+        self._categorizer = CompiledCategorizer(stored.categories)
+
+    def new_rows(self, table: TransactionTable) -> np.ndarray:
+        """Маска операций таблицы, которых нет в сохраненном состоянии."""
+        if self.state.mode == "date":
+            new: np.ndarray = table.date > self.state.max_date
+            return new
+        mask = ~np.isin(table.id, self.state.seen_ids, assume_unique=False)
+        # из повторов id внутри самой выгрузки учитывается первый
+        _, first = np.unique(table.id, return_index=True)
+        unique = np.zeros(len(table), dtype=bool)
+        unique[first] = True
+        result: np.ndarray = mask & unique
+        return result
+
+    def update(self, transactions: Union[Iterable[Dict[str, Any]], TransactionTable]) -> TransactionTable:
+        """Отбирает новые операции, добавляет их к агрегатам, сохраняет состояние и возвращает их."""
+        table = (
+            transactions if isinstance(transactions, TransactionTable) else TransactionTable.from_records(transactions)
+        )
+        delta = table.take(self.new_rows(table))
+        if len(delta):
+            self._merge(delta)
+        save_state(self.state, self.state_path)
+        logger.info(f"Новых операций: {len(delta)} из {len(table)}, всего обработано: {self.state.processed}")
+        return delta
+
+    def summary(self) -> Dict[str, Any]:
+        """Агрегаты состояния с суммами в рублях по текущим курсам provider."""
+        return self.state.summary(self.provider)
+
+    def _merge(self, delta: TransactionTable) -> None:
+        state = self.state
+        counts = np.bincount(delta.state.codes, minlength=len(delta.state.categories))
+        state.state_counts.update(
+            {name: int(count) for name, count in zip(delta.state.categories, counts.tolist()) if count and name}
+        )
+        state.category_counts.update(self._categorizer.categorize(delta).counts)
+        codes = delta.currency_code
+        totals = np.bincount(codes.codes, weights=delta.amount, minlength=len(codes.categories))
+        for code, total in zip(codes.categories, totals.tolist()):
+            if code:
+                state.native_totals[code] = state.native_totals.get(code, 0.0) + total
+        state.processed += len(delta)
+        state.max_date = max(state.max_date, int(delta.date.max()))
+        state.seen_ids = np.union1d(state.seen_ids, delta.id)
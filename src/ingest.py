@@ -0,0 +1,93 @@
+import glob
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+from src.logger import setup_logging
+from src.table import TransactionTable, read_table
+
+logger = setup_logging(__name__)
+
+SUPPORTED_SUFFIXES = (".json", ".csv", ".xlsx")
+GLOB_CHARS = frozenset("*?[")
+
+Source = Union[str, Path]
+
+
+class IngestResult(NamedTuple):
+    """Результат ingest: объединенная таблица, загруженные файлы и ошибки по файлам."""
+
+    table: TransactionTable
+    files: List[str]
+    errors: Dict[str, str]
+
+
+def expand_sources(sources: Union[Source, Iterable[Source]]) -> List[str]:
+    """
+    Раскрывает источники в отсортированный список файлов.
+
+    Источник - путь к файлу, каталог (берутся файлы .json, .csv, .xlsx из него) или
+    шаблон glob вроде "exports/*.csv" (поддерживается "**" для вложенных каталогов).
+    """
+    if isinstance(sources, (str, Path)):
+        sources = [sources]
+    files: List[str] = []
+    for source in sources:
+        source = str(source)
+        if GLOB_CHARS & set(source):
+            files.extend(sorted(path for path in glob.glob(source, recursive=True) if os.path.isfile(path)))
+        elif os.path.isdir(source):
+            files.extend(
+                sorted(str(path) for path in Path(source).iterdir() if path.suffix.lower() in SUPPORTED_SUFFIXES)
+            )
+        else:
+            files.append(source)
+    return list(dict.fromkeys(files))
+
+
+def load_file(file_path: str) -> Tuple[str, Optional[TransactionTable], Optional[str]]:
+    """
+    Загружает один файл в воркере: (путь, таблица, None) или (путь, None, текст ошибки).
+
+    Исключение не выходит за пределы функции, поэтому поврежденный файл не прерывает
+    загрузку остальных.
+    """
+    try:
+        return file_path, read_table(file_path, strict=True), None
+    except Exception as e:
+        return file_path, None, f"{type(e).__name__}: {e}"
+
+
+def ingest(
+    sources: Union[Source, Iterable[Source]], workers: Optional[int] = None, executor: Optional[Executor] = None
+) -> IngestResult:
+    """
+    Загружает все файлы источников (JSON, CSV, XLSX) параллельно и склеивает их в одну таблицу.
+
+    Файлы разбираются в пуле процессов ProcessPoolExecutor из workers процессов (по умолчанию
+    по числу ядер), в воркеры передается путь, обратно - компактная TransactionTable.
+    При workers=1 или одном файле пул не создается. Строки итоговой таблицы идут в порядке
+    файлов. Ошибки отдельных файлов попадают в IngestResult.errors и в лог.
+    """
+    files = expand_sources(sources)
+    if executor is not None:
+        results = list(executor.map(load_file, files))
+    elif workers == 1 or len(files) <= 1:
+        results = [load_file(file_path) for file_path in files]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(load_file, files))
+
+    tables: List[TransactionTable] = []
+    loaded: List[str] = []
+    errors: Dict[str, str] = {}
+    for file_path, table, error in results:
+        if table is None:
+            errors[file_path] = error or "неизвестная ошибка"
+            logger.error(f"Ошибка при загрузке {file_path}: {errors[file_path]}")
+            continue
+        tables.append(table)
+        loaded.append(file_path)
+    logger.info(f"Загружено файлов: {len(loaded)}, с ошибками: {len(errors)}")
+    return IngestResult(TransactionTable.concat(tables), loaded, errors)
@@ -1,21 +1,155 @@
+import atexit
 import logging
-from typing import Any
+import os
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Mapping, Optional, Tuple, Union
 
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+ROOT_LOGGER = "src"
 
-def setup_logging() -> Any:
-    """Настраивает логирование."""
-    logger = logging.getLogger(__name__)
-    logger.setLevel(logging.DEBUG)
+_lock = threading.Lock()
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[QueueHandler] = None
 
-    formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
 
-    # Исправленное имя файла
-    file_handler = logging.FileHandler("app.log", mode="w")
-    file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
+class RateLimitFilter(logging.Filter):
+    """
+    Ограничивает частоту одинаковых сообщений.
 
-    # stream_handler = logging.StreamHandler()
-    # stream_handler.setFormatter(formatter)
-    # logger.addHandler(stream_handler)
+    Сообщения одного места вызова (файл и строка) пропускаются не чаще max_records раз
+    за interval секунд. Число отброшенных сообщений дописывается к первому сообщению
+    следующего интервала. max_records=None отключает ограничение.
+    """
 
+    def __init__(self, max_records: Optional[int] = None, interval: float = 1.0) -> None:
+        super().__init__()
+        self.max_records = max_records
+        self.interval = interval
+        # место вызова -> (начало интервала, пропущено в интервале, отброшено в интервале)
+        self._windows: Dict[Tuple[str, int], Tuple[float, int, int]] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.max_records is None:
+            return True
+        key = (record.pathname, record.lineno)
+        now = time.monotonic()
+        start, passed, dropped = self._windows.get(key, (now, 0, 0))
+        if now - start >= self.interval:
+            if dropped:
+                record.msg = f"{record.getMessage()} [пропущено похожих сообщений: {dropped}]"
+                record.args = None
+            start, passed, dropped = now, 0, 0
+        if passed >= self.max_records:
+            self._windows[key] = (start, passed, dropped + 1)
+            return False
+        self._windows[key] = (start, passed + 1, dropped)
+        return True
+
+
+rate_limit_filter = RateLimitFilter()
+
+
+def _parse_levels(spec: str) -> Dict[str, str]:
+    """Разбирает строку вида "src.masks=WARNING,src.utils=INFO"."""
+    levels = {}
+    for item in spec.split(","):
+        if "=" in item:
+            name, level = item.split("=", 1)
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def configure_levels(levels: Mapping[str, Union[int, str]]) -> None:
+    """Задает уровни логирования для отдельных модулей, например {"src.masks": "WARNING"}."""
+    for name, level in levels.items():
+        logging.getLogger(name).setLevel(level)
+
+
+def set_rate_limit(max_records: Optional[int], interval: float = 1.0) -> None:
+    """Включает (или отключает при max_records=None) ограничение частоты частых сообщений."""
+    rate_limit_filter.max_records = max_records
+    rate_limit_filter.interval = interval
+
+
+def _start() -> None:
+    """Один раз за процесс подключает к логгеру пакета QueueHandler и запускает QueueListener."""
+    global _listener, _queue_handler
+    with _lock:
+        if _listener is not None:
+            return
+        file_handler = logging.FileHandler(os.getenv("LOG_FILE", "app.log"), mode="a", encoding="utf-8", delay=True)
+        file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+        log_queue: "queue.Queue[Any]" = queue.Queue(-1)
+        _queue_handler = QueueHandler(log_queue)
+        _queue_handler.addFilter(rate_limit_filter)
+
+        root = logging.getLogger(ROOT_LOGGER)
+        root.setLevel(os.getenv("LOG_LEVEL", "DEBUG").upper())
+        root.addHandler(_queue_handler)
+        configure_levels(_parse_levels(os.getenv("LOG_LEVELS", "")))
+        if os.getenv("LOG_RATE_LIMIT"):
+            set_rate_limit(int(os.environ["LOG_RATE_LIMIT"]))
+
+        _listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Дописывает накопленные в очереди сообщения в файл и останавливает фоновый поток."""
+    global _listener, _queue_handler
+    with _lock:
+        if _listener is None:
+            return
+        root = logging.getLogger(ROOT_LOGGER)
+        if _queue_handler is not None:
+            _listener.stop()
+            root.removeHandler(_queue_handler)
+        for handler in _listener.handlers:
+            # в дочернем процессе обработчики подключены к логгеру напрямую
+            root.removeHandler(handler)
+            handler.close()
+        _listener = None
+        _queue_handler = None
+
+
+def _after_fork_in_child() -> None:
+    """
+    В дочернем процессе (например, в воркере ProcessPoolExecutor) фонового потока нет,
+    а atexit может не вызваться, поэтому записи пишутся в файл напрямую, без очереди.
+    """
+    global _lock, _queue_handler
+    _lock = threading.Lock()
+    if _listener is None or _queue_handler is None:
+        return
+    root = logging.getLogger(ROOT_LOGGER)
+    root.removeHandler(_queue_handler)
+    for handler in _listener.handlers:
+        handler.addFilter(rate_limit_filter)
+        root.addHandler(handler)
+    # _listener не сбрасывается: _start() в дочернем процессе ничего не делает
+    _queue_handler = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+def setup_logging(name: str = ROOT_LOGGER, level: Optional[Union[int, str]] = None) -> Any:
+    """
+    Настраивает логирование и возвращает логгер модуля.
+
+    Повторные вызовы ничего не добавляют: обработчик один на весь пакет src. В горячем коде
+    сообщение только кладется в очередь, в файл app.log (дописывается, а не перезаписывается)
+    его пишет фоновый QueueListener. Уровни модулей можно задать аргументом level,
+    функцией configure_levels или переменной окружения LOG_LEVELS.
+    """
+    _start()
+    logger = logging.getLogger(name)
+    if level is not None:
+        logger.setLevel(level)
     return logger
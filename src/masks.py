@@ -1,4 +1,5 @@
 import logging
+from collections import Counter
 
 from src.logger import setup_logging
 
@@ -6,13 +7,18 @@ from src.logger import setup_logging
 # masks_logger = logging.getLogger(__name__)
 # masks_logger.setLevel(logging.DEBUG)
 
-logger = setup_logging()
+logger = setup_logging(__name__)
 # Настраиваем обработчик для записи в файл
 # file_handler = logging.FileHandler("app.log", mode="w")
 # formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
 # file_handler.setFormatter(formatter)
 # masks_logger.addHandler(file_handler)
 
+# Вместо строки в логе на каждый вызов считаем вызовы; сводку пишет log_mask_stats.
+# Считаются именно вызовы mask_card/mask_account: widget.mask_number кэширует результаты,
+# поэтому при выводе операций повторные номера сюда не попадают (это промахи кэша, а не строки)
+mask_calls: Counter = Counter()
+
 
 def mask_card(card_number: str) -> str:
     """
@@ -20,10 +26,10 @@ def mask_card(card_number: str) -> str:
     """
     if len(card_number) == 16:  # Проверяем длину номера карты
         masked_card = card_number[:4] + " " + card_number[4:6] + "**" + " **** " + card_number[-4:]
-        logger.info("Функция mask_card выполнена успешно")  # Используем masks_logger
+        mask_calls["mask_card_ok"] += 1
         return masked_card
     else:
-        logger.error("С функцией mask_card что-то пошло не так")  # Используем masks_logger
+        mask_calls["mask_card_error"] += 1
         return "Некорректный номер карты"
 
 
@@ -33,12 +39,27 @@ def mask_account(account_number: str) -> str:
     """
     if len(account_number) >= 4:  # Проверяем, что номер счета хотя бы 4 символа
         masked_account = "**" + account_number[-4:]
-        logger.info("Функция mask_account выполнена успешно")  # Используем masks_logger
+        mask_calls["mask_account_ok"] += 1
         return masked_account
     else:
-        logger.error("С функцией mask_account что-то пошло не так")  # Используем masks_logger
+        mask_calls["mask_account_error"] += 1
         return "Некорректный номер счета"
 
 
+def log_mask_stats() -> None:
+    """
+    Пишет в лог одну строку со счетчиками вызовов mask_card/mask_account и обнуляет их.
+
+    Число обработанных строк эти счетчики не показывают: повторные номера берутся
+    из кэша mask_number (его статистика - mask_number.cache_info()).
+    """
+    if not mask_calls:
+        return
+    summary = ", ".join(f"{name}={count}" for name, count in sorted(mask_calls.items()))
+    has_errors = mask_calls["mask_card_error"] or mask_calls["mask_account_error"]
+    logger.log(logging.ERROR if has_errors else logging.INFO, f"Вызовы маскирования (без попаданий в кэш): {summary}")
+    mask_calls.clear()
+
+
 """mask_card("1234567890123456")
 mask_account("12345678901234567890123456789012")"""
@@ -0,0 +1,184 @@
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, TypeVar, Union, overload
+
+import numpy as np
+
+from src.dictionary_handler import (
+    CategorizationResult,
+    CompiledCategorizer,
+    categorize_transactions,
+    compile_search,
+    search_transactions,
+)
+from src.logger import setup_logging
+from src.table import TransactionTable
+
+logger = setup_logging(__name__)
+
+DEFAULT_CHUNK_SIZE = 100_000
+
+Transactions = Union[List[Dict[str, Any]], TransactionTable]
+T = TypeVar("T")
+
+
+def chunks(values: Sequence[T], chunk_size: int) -> List[Sequence[T]]:
+    """Делит последовательность на части по chunk_size элементов."""
+    if chunk_size < 1:
+        raise ValueError("Размер части должен быть положительным")
+    return [values[start : start + chunk_size] for start in range(0, len(values), chunk_size)]
+
+
+def _descriptions(transactions: Union[Iterable[Dict[str, Any]], TransactionTable]) -> Tuple[Sequence[Any], Any]:
+    """
+    Описания, которые нужно проверить, и способ развернуть результат по ним на строки.
+
+    Для TransactionTable это различные описания (категории столбца) и коды строк,
+    для остальных наборов - описание каждой строки и None.
+    """
+    if isinstance(transactions, TransactionTable):
+        return transactions.description.categories, transactions.description.codes
+    return [transaction.get("description") for transaction in transactions], None
+
+
+def _match_descriptions(descriptions: Sequence[Any], search_string: str, ignore_case: bool, regex: bool) -> np.ndarray:
+    """Маска описаний части, подходящих под строку поиска (те же правила, что у search_transactions)."""
+    matches = compile_search(search_string, ignore_case, regex)
+    return np.fromiter(
+        (isinstance(description, str) and bool(matches(description)) for description in descriptions),
+        dtype=bool,
+        count=len(descriptions),
+    )
+
+
+def _category_indices(descriptions: Sequence[Any], categories: Dict[str, List[str]]) -> np.ndarray:
+    """Номер первой подходящей категории для каждого описания части (-1, если ни одна не подошла)."""
+    categorizer = CompiledCategorizer(categories)
+    return np.fromiter(
+        (-1 if (index := categorizer.category_index(d)) is None else index for d in descriptions),
+        dtype=np.int32,
+        count=len(descriptions),
+    )
+
+
+class ParallelExecutor:
+    """
+    Поиск и категоризация транзакций в пуле процессов по схеме map-reduce.
+
+    В воркеры ProcessPoolExecutor (workers процессов, по умолчанию по числу ядер) уходят
+    только описания, частями по chunk_size: для списка - описание каждой операции, для
+    TransactionTable - различные описания столбца. Частичные результаты склеиваются
+    в порядке частей, поэтому найденные операции идут в исходном порядке, а счетчики
+    категорий совпадают с последовательным расчетом. При workers=1 или одной части
+    пул не создается, и результат считается в текущем процессе.
+    """
+
+    def __init__(
+        self, workers: Optional[int] = None, chunk_size: int = DEFAULT_CHUNK_SIZE, executor: Optional[Executor] = None
+    ) -> None:
+        if chunk_size < 1:
+            raise ValueError("Размер части должен быть положительным")
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.executor = executor
+
+    def map(self, func: Callable[..., np.ndarray], values: Sequence[Any], *args: Any) -> np.ndarray:
+        """Применяет func(часть, *args) к частям values и склеивает результаты в порядке частей."""
+        parts = chunks(values, self.chunk_size)
+        columns = [parts, *([arg] * len(parts) for arg in args)]
+        if self.executor is not None:
+            results = list(self.executor.map(func, *columns))
+        elif self.workers == 1 or len(parts) <= 1:
+            results = [func(part, *args) for part in parts]
+        else:
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                results = list(pool.map(func, *columns))
+        return np.concatenate(results) if results else func([], *args)
+
+    def search_mask(
+        self, transactions: Transactions, search_string: str, ignore_case: bool = False, regex: bool = True
+    ) -> np.ndarray:
+        """Маска операций, описание которых подходит под строку поиска."""
+        descriptions, codes = _descriptions(transactions)
+        matched = self.map(_match_descriptions, descriptions, search_string, ignore_case, regex)
+        return matched if codes is None else matched[codes]
+
+    @overload
+    def search_transactions(
+        self, transactions: TransactionTable, search_string: str, ignore_case: bool = ..., regex: bool = ...
+    ) -> TransactionTable: ...
+
+    @overload
+    def search_transactions(
+        self, transactions: List[Dict[str, Any]], search_string: str, ignore_case: bool = ..., regex: bool = ...
+    ) -> List[Dict[str, Any]]: ...
+
+    def search_transactions(
+        self, transactions: Transactions, search_string: str, ignore_case: bool = False, regex: bool = True
+    ) -> Transactions:
+        """Параллельный аналог dictionary_handler.search_transactions: тот же результат в том же порядке."""
+        mask = self.search_mask(transactions, search_string, ignore_case, regex)
+        if isinstance(transactions, TransactionTable):
+            return transactions.take(mask)
+        return [transactions[i] for i in np.flatnonzero(mask).tolist()]
+
+    def categorize(
+        self,
+        transactions: Union[Iterable[Dict[str, Any]], TransactionTable],
+        categories: Dict[str, List[str]],
+        with_labels: bool = False,
+    ) -> CategorizationResult:
+        """
+        Параллельный аналог CompiledCategorizer.categorize.
+
+        Воркеры возвращают номера категорий своих описаний; счетчики по строкам - один
+        np.bincount по склеенному столбцу номеров.
+        """
+        names = list(categories)
+        descriptions, codes = _descriptions(transactions)
+        indices = self.map(_category_indices, descriptions, categories)
+        rows = indices if codes is None else indices[codes]
+        totals = np.bincount(rows[rows >= 0], minlength=len(names))
+        # Порядок ключей - как у последовательного расчета: по первой операции каждой категории
+        found, first_rows = np.unique(rows, return_index=True)
+        in_order = found[np.argsort(first_rows)]
+        counts = {names[index]: int(totals[index]) for index in in_order.tolist() if index >= 0}
+        labels = [None if index < 0 else names[index] for index in rows.tolist()] if with_labels else None
+        logger.info(f"Категоризовано операций: {len(rows)}, описаний: {len(descriptions)}")
+        return CategorizationResult(counts, labels)
+
+    def categorize_transactions(
+        self, transactions: Union[Iterable[Dict[str, Any]], TransactionTable], categories: Dict[str, List[str]]
+    ) -> Dict[str, int]:
+        """Параллельный аналог dictionary_handler.categorize_transactions."""
+        return self.categorize(transactions, categories).counts
+
+
+def verify_parallel(
+    executor: ParallelExecutor,
+    transactions: Transactions,
+    search_string: str,
+    categories: Dict[str, List[str]],
+    ignore_case: bool = False,
+    regex: bool = True,
+) -> Dict[str, bool]:
+    """
+    Сверяет результаты executor с обычными search_transactions и categorize_transactions.
+
+    Returns словарь {"search": ..., "categorize": ...}: совпали ли найденные операции
+    (вместе с порядком) и счетчики категорий. Расхождение записывается в лог как ошибка.
+    """
+    serial = search_transactions(transactions, search_string, ignore_case, regex)
+    parallel = executor.search_transactions(transactions, search_string, ignore_case, regex)
+    if isinstance(serial, TransactionTable) and isinstance(parallel, TransactionTable):
+        same_search = bool(np.array_equal(serial.id, parallel.id))
+    else:
+        same_search = serial == parallel
+    checks = {
+        "search": same_search,
+        "categorize": categorize_transactions(transactions, categories)
+        == executor.categorize_transactions(transactions, categories),
+    }
+    for name, ok in checks.items():
+        if not ok:
+            logger.error(f"Параллельный результат {name} не совпал с последовательным")
+    return checks
@@ -1,24 +1,43 @@
-from datetime import datetime
-from typing import List
+from typing import Any, List, Optional, Sequence, TypeVar, Union, overload
 
+import numpy as np
 
-def sort_by_date(list_of_dicts: List[dict], order: str = "descending") -> List[dict]:
-    reverse = order == "descending"
+from src.table import MISSING_DATE, Record, RecordT, TransactionTable, date_order, parse_date, record_dates
+
+
+@overload
+def sort_by_date(list_of_dicts: TransactionTable, order: str = ...) -> TransactionTable: ...
+
+
+@overload
+def sort_by_date(list_of_dicts: List[RecordT], order: str = ...) -> List[RecordT]: ...
+
+
+def sort_by_date(
+    list_of_dicts: Union[List[RecordT], TransactionTable], order: str = "descending"
+) -> Union[List[RecordT], TransactionTable]:
     """
-        Сортирует список словарей по ключу 'date' в порядке возрастания или убывания.
+    Сортирует список словарей по ключу 'date' в порядке возрастания или убывания.
 
-        Args:
-    - list_of_dicts: Список словарей, содержащих ключ 'date' в виде строки.
-    - order: Порядок сортировки, либо 'по возрастанию', либо 'по убыванию'.По умолчанию используется 'по убыванию'
+    Args:
+    - list_of_dicts: Список словарей, содержащих ключ 'date' в виде строки, список Transaction или TransactionTable.
+    - order: Порядок сортировки, 'descending' (по убыванию, по умолчанию) или любое другое значение (по возрастанию).
 
-        Возвращает:
-        - Отсортированный список словарей по ключу 'date'.
-        """
-    return sorted(list_of_dicts, key=lambda x: datetime.fromisoformat(x["date"]), reverse=reverse)
+    Возвращает:
+    - Отсортированный список словарей по ключу 'date' (для TransactionTable - отсортированную таблицу).
+
+    Даты разбираются один раз в столбец int64 (у Transaction берутся готовые), после чего
+    сортировка - это argsort по нему.
+    """
+    descending = order == "descending"
+    if isinstance(list_of_dicts, TransactionTable):
+        return list_of_dicts.sort_by_date(descending)
+    dates = record_dates(list_of_dicts)
+    return [list_of_dicts[i] for i in date_order(dates, descending)]
 
 
 # Пример использования
-input_data = [
+"""input_data = [
     {"id": 41428829, "state": "EXECUTED", "date": "2019-07-03T18:35:29.512364"},
     {"id": 939719570, "state": "EXECUTED", "date": "2018-06-30T02:08:58.425572"},
     {"id": 594226727, "state": "CANCELED", "date": "2018-09-12T21:27:25.241689"},
@@ -26,26 +45,39 @@ input_data = [
 ]
 
 
-"""output_descending = sort_by_date(input_data, "descending")
+output_descending = sort_by_date(input_data, "descending")
 print(output_descending)"""
 
 
-def filter_by_state(list_of_dicts: List[dict], state: str = "EXECUTED") -> List[dict]:
+@overload
+def filter_by_state(list_of_dicts: TransactionTable, state: str = ...) -> TransactionTable: ...
+
+
+@overload
+def filter_by_state(list_of_dicts: List[RecordT], state: str = ...) -> List[RecordT]: ...
+
+
+def filter_by_state(
+    list_of_dicts: Union[List[RecordT], TransactionTable], state: str = "EXECUTED"
+) -> Union[List[RecordT], TransactionTable]:
     """
     Фильтрует список словарей по ключу 'state'.
 
     Args:
-    - list_of_dicts: Список словарей, содержащих ключ 'state' в виде строки.
+    - list_of_dicts: Список словарей, содержащих ключ 'state' в виде строки, или TransactionTable
+      (тогда фильтрация выполняется маской и возвращается TransactionTable).
     - state: Состояние, по которому будет производиться фильтрация. По умолчанию 'EXECUTED'.
 
     Возвращает:
     - Отфильтрованный список словарей, содержащих указанное 'state'.
     """
+    if isinstance(list_of_dicts, TransactionTable):
+        return list_of_dicts.take(list_of_dicts.state.mask(state))
     return [item for item in list_of_dicts if item.get("state") == state]
 
 
 # Пример использования
-input_data = [
+"""input_data = [
     {"id": 41428829, "state": "EXECUTED", "date": "2019-07-03T18:35:29.512364"},
     {"id": 939719570, "state": "EXECUTED", "date": "2018-06-30T02:08:58.425572"},
     {"id": 594226727, "state": "CANCELED", "date": "2018-09-12T21:27:25.241689"},
@@ -57,5 +89,130 @@ output_default = filter_by_state(input_data, "EXECUTED")
 output_canceled = filter_by_state(input_data, "CANCELED")
 
 
-"""print(output_default)
+print(output_default)
 print(output_canceled)"""
+
+
+# Список словарей (или Transaction) либо TransactionTable
+Transactions = TypeVar("Transactions", List[Any], TransactionTable)
+
+
+def _dates(list_of_dicts: Union[Sequence[Record], TransactionTable]) -> np.ndarray:
+    """Столбец дат int64: у TransactionTable он уже есть, у списка операций собирается один раз."""
+    if isinstance(list_of_dicts, TransactionTable):
+        return list_of_dicts.date
+    return record_dates(list_of_dicts)
+
+
+@overload
+def _take(list_of_dicts: TransactionTable, indices: np.ndarray) -> TransactionTable: ...
+
+
+@overload
+def _take(list_of_dicts: Sequence[RecordT], indices: np.ndarray) -> List[RecordT]: ...
+
+
+def _take(
+    list_of_dicts: Union[Sequence[RecordT], TransactionTable], indices: np.ndarray
+) -> Union[List[RecordT], TransactionTable]:
+    if isinstance(list_of_dicts, TransactionTable):
+        return list_of_dicts.take(indices)
+    return [list_of_dicts[i] for i in indices.tolist()]
+
+
+def head(list_of_dicts: Transactions, n: int) -> Transactions:
+    """Первые n операций в исходном порядке."""
+    return _take(list_of_dicts, np.arange(min(max(n, 0), len(list_of_dicts))))
+
+
+def _top_indices(dates: np.ndarray, n: int, largest: bool) -> np.ndarray:
+    """
+    Индексы n самых поздних (largest=True) или самых ранних дат, упорядоченные как в sort_by_date.
+
+    Выбор делается через np.argpartition за O(len), сортируются только выбранные n элементов.
+    Из равных граничных дат берутся те, что раньше в исходном порядке, как у sorted(...)[:n].
+    """
+    n = max(0, min(n, len(dates)))
+    if n == 0:
+        return np.empty(0, dtype=np.intp)
+    keys = dates if largest else ~dates  # ~x = -x - 1 без переполнения на MISSING_DATE
+    threshold = keys[np.argpartition(keys, len(keys) - n)[len(keys) - n]]
+    above = np.flatnonzero(keys > threshold)
+    ties = np.flatnonzero(keys == threshold)[: n - len(above)]
+    selected = np.sort(np.concatenate([above, ties]))
+    indices: np.ndarray = selected[date_order(dates[selected], descending=largest)]
+    return indices
+
+
+def latest(list_of_dicts: Transactions, n: int, state: Optional[str] = None) -> Transactions:
+    """
+    Возвращает n последних по дате операций (от новых к старым), не сортируя весь набор.
+
+    Args:
+    - list_of_dicts: Список словарей с ключом 'date' или TransactionTable.
+    - n: Сколько операций вернуть.
+    - state: Если задан, сначала выполняется filter_by_state.
+
+    Результат совпадает с sort_by_date(filter_by_state(...))[:n].
+    """
+    if state is not None:
+        list_of_dicts = filter_by_state(list_of_dicts, state)
+    return _take(list_of_dicts, _top_indices(_dates(list_of_dicts), n, largest=True))
+
+
+def earliest(list_of_dicts: Transactions, n: int, state: Optional[str] = None) -> Transactions:
+    """
+    Возвращает n самых ранних по дате операций (от старых к новым), не сортируя весь набор.
+
+    Результат совпадает с sort_by_date(filter_by_state(...), "ascending")[:n].
+    """
+    if state is not None:
+        list_of_dicts = filter_by_state(list_of_dicts, state)
+    return _take(list_of_dicts, _top_indices(_dates(list_of_dicts), n, largest=False))
+
+
+class DateIndex:
+    """
+    Отсортированный индекс дат для быстрых выборок по диапазону.
+
+    Строится один раз за O(n log n); каждый запрос between выполняет два двоичных поиска
+    (np.searchsorted) и возвращает k найденных операций, то есть стоит O(log n + k).
+    """
+
+    def __init__(self, list_of_dicts: Union[Sequence[Record], TransactionTable]) -> None:
+        self.data = list_of_dicts
+        dates = _dates(list_of_dicts)
+        self._order = date_order(dates, descending=False)
+        self._sorted_dates = dates[self._order]
+
+    def positions(self, start: Any = None, end: Any = None, order: str = "descending") -> np.ndarray:
+        """Индексы операций с датой в отрезке [start, end]; None означает открытую границу."""
+        low = np.searchsorted(self._sorted_dates, _bound(start, MISSING_DATE + 1), side="left")
+        high = np.searchsorted(self._sorted_dates, _bound(end, np.iinfo(np.int64).max), side="right")
+        indices = self._order[low:high]
+        if order == "descending":
+            indices = indices[date_order(self._sorted_dates[low:high], descending=True)]
+        return indices
+
+    def between(self, start: Any = None, end: Any = None, order: str = "descending") -> Any:
+        """Операции с датой в отрезке [start, end] в том же виде, что и исходные данные."""
+        return _take(self.data, self.positions(start, end, order))
+
+
+def _bound(value: Any, default: int) -> int:
+    if value is None:
+        return int(default)
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    return parse_date(value)
+
+
+def between(
+    list_of_dicts: Transactions, start: Any = None, end: Any = None, order: str = "descending"
+) -> Transactions:
+    """
+    Возвращает операции с датой в отрезке [start, end] (границы - строки ISO, datetime или None).
+
+    Для повторных запросов к одним и тем же данным выгоднее один раз построить DateIndex.
+    """
+    return _take(list_of_dicts, DateIndex(list_of_dicts).positions(start, end, order))
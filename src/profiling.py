@@ -0,0 +1,178 @@
+import cProfile
+import functools
+import json
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from src.decorators import CallStats, get_writer
+
+# имя кэша -> функция, возвращающая накопленные (попадания, промахи)
+CACHE_PROBES: Dict[str, Callable[[], Tuple[int, int]]] = {}
+
+
+def register_cache(name: str, probe: Callable[[], Tuple[int, int]]) -> None:
+    """Регистрирует кэш, попадания в который учитываются в отчете по этапам."""
+    CACHE_PROBES[name] = probe
+
+
+def _mask_number_probe() -> Tuple[int, int]:
+    from src.widget import mask_number
+
+    info = mask_number.cache_info()
+    return info.hits, info.misses
+
+
+def _currency_rates_probe() -> Tuple[int, int]:
+    from src.external_API import default_rate_provider
+
+    # Замер не должен сам создавать поставщика курсов
+    if not default_rate_provider.cache_info().currsize:
+        return 0, 0
+    provider = default_rate_provider()
+    return provider.cache_hits, provider.cache_misses
+
+
+register_cache("mask_number", _mask_number_probe)
+register_cache("currency_rates", _currency_rates_probe)
+
+
+def _cache_snapshot() -> Dict[str, Tuple[int, int]]:
+    return {name: probe() for name, probe in CACHE_PROBES.items()}
+
+
+def _rows(value: Any) -> Optional[int]:
+    try:
+        return len(value)
+    except TypeError:
+        return None
+
+
+@dataclass
+class Stage:
+    """Данные одного выполнения этапа, которые заполняет сам этап: число строк на входе и выходе."""
+
+    name: str
+    rows_in: Optional[int] = None
+    rows_out: Optional[int] = None
+
+
+@dataclass
+class StageReport:
+    """Накопленные данные этапа за все его выполнения."""
+
+    timings: CallStats = field(default_factory=CallStats)
+    rows_in: int = 0
+    rows_out: int = 0
+    cache: Dict[str, Tuple[int, int]] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        summary = self.timings.summary()
+        cache = {}
+        for name, (hits, misses) in self.cache.items():
+            total = hits + misses
+            cache[name] = {"hits": hits, "misses": misses, "hit_rate": hits / total if total else None}
+        return {
+            "calls": summary["calls"],
+            "errors": summary["errors"],
+            "wall": summary["wall_total"],
+            "wall_max": summary["wall_max"],
+            "cpu": summary["cpu_total"],
+            "rows_in": self.rows_in,
+            "rows_out": self.rows_out,
+            "cache": cache,
+        }
+
+
+class Profiler:
+    """
+    Замеры этапов обработки: wall- и CPU-время, число строк на входе и выходе,
+    попадания в зарегистрированные кэши (CACHE_PROBES) за время этапа.
+
+    Если задан log_file, каждое выполнение этапа дописывается в него строкой через
+    общий буферизованный писатель декоратора log.
+    """
+
+    def __init__(self, log_file: Optional[str] = None) -> None:
+        self.stages: Dict[str, StageReport] = {}
+        self._writer = get_writer(log_file) if log_file else None
+
+    @contextmanager
+    def stage(self, name: str, rows_in: Optional[int] = None) -> Iterator[Stage]:
+        """Замеряет блок кода как этап name; rows_out (и rows_in) можно задать у полученного Stage."""
+        current = Stage(name, rows_in)
+        caches = _cache_snapshot()
+        started = time.time()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        ok = False
+        try:
+            yield current
+            ok = True
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+            self._record(current, wall, cpu, ok, caches)
+            if self._writer is not None:
+                self._writer.write(
+                    started,
+                    f"stage {name} {'ok' if ok else 'error'} wall={wall:.6f}s cpu={cpu:.6f}s "
+                    f"rows_in={current.rows_in} rows_out={current.rows_out}",
+                )
+
+    def track(self, name: Optional[str] = None) -> Callable:
+        """Декоратор: замеряет функцию как этап; строки считаются по len() первого аргумента и результата."""
+
+        def decorator(func: Callable) -> Callable:
+            stage_name = name or func.__name__
+
+            @functools.wraps(func)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                with self.stage(stage_name, _rows(args[0]) if args else None) as current:
+                    result = func(*args, **kwargs)
+                    current.rows_out = _rows(result)
+                return result
+
+            return wrapper
+
+        return decorator
+
+    def _record(self, current: Stage, wall: float, cpu: float, ok: bool, caches: Dict[str, Tuple[int, int]]) -> None:
+        report = self.stages.get(current.name)
+        if report is None:
+            report = self.stages[current.name] = StageReport()
+        report.timings.add(wall, cpu, ok)
+        report.rows_in += current.rows_in or 0
+        report.rows_out += current.rows_out or 0
+        for cache_name, (hits, misses) in _cache_snapshot().items():
+            before_hits, before_misses = caches.get(cache_name, (0, 0))
+            if hits == before_hits and misses == before_misses:
+                continue
+            total_hits, total_misses = report.cache.get(cache_name, (0, 0))
+            report.cache[cache_name] = (total_hits + hits - before_hits, total_misses + misses - before_misses)
+
+    def report(self) -> Dict[str, Any]:
+        """Отчет по этапам в порядке их первого выполнения."""
+        stages = {name: report.to_dict() for name, report in self.stages.items()}
+        return {"stages": stages, "wall_total": sum(stage["wall"] for stage in stages.values())}
+
+    def save(self, path: str) -> None:
+        """Сохраняет report() в JSON-файл."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, ensure_ascii=False, indent=2)
+
+
+@contextmanager
+def cprofile(path: Optional[str]) -> Iterator[Optional[cProfile.Profile]]:
+    """Запускает cProfile на время блока и сохраняет статистику в path (формат pstats); path=None - без профилирования."""
+    if path is None:
+        yield None
+        return
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield profile
+    finally:
+        profile.disable()
+        profile.dump_stats(path)
@@ -0,0 +1,100 @@
+from dataclasses import dataclass
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Optional, Union
+
+import numpy as np
+
+from src.dictionary_handler import compile_search
+from src.generators import transaction_currency
+from src.processing import Transactions, earliest, head, latest, sort_by_date
+from src.table import TransactionTable
+
+
+@dataclass
+class TransactionQuery:
+    """
+    Декларативный запрос к набору транзакций.
+
+    Все условия (состояние, валюта, слово в описании) проверяются за один проход по данным,
+    и только прошедшие фильтр операции сортируются по дате или отбираются по limit.
+
+    Атрибуты:
+    - state: Состояние операции (EXECUTED, CANCELED, PENDING) или None.
+    - currency: Код валюты (RUB, USD, ...) или None.
+    - keyword: Строка поиска в описании или None.
+    - regex: Считать keyword регулярным выражением (иначе - обычной подстрокой).
+    - ignore_case: Искать keyword без учета регистра.
+    - order: 'descending', 'ascending' или None (исходный порядок).
+    - limit: Максимальное число операций в результате (не меньше нуля) или None.
+    """
+
+    state: Optional[str] = None
+    currency: Optional[str] = None
+    keyword: Optional[str] = None
+    regex: bool = False
+    ignore_case: bool = False
+    order: Optional[str] = None
+    limit: Optional[int] = None
+
+    def __post_init__(self) -> None:
+        if self.limit is not None and self.limit < 0:
+            raise ValueError("Число операций limit не может быть отрицательным")
+
+    def _keyword_predicate(self) -> Optional[Callable[[str], Any]]:
+        if not self.keyword:
+            return None
+        return compile_search(self.keyword, self.ignore_case, self.regex)
+
+    def predicate(self) -> Callable[[Dict[str, Any]], bool]:
+        """Объединенное условие для одной транзакции-словаря (формат JSON или CSV/XLSX)."""
+        state, currency, matches = self.state, self.currency, self._keyword_predicate()
+
+        def check(transaction: Dict[str, Any]) -> bool:
+            if state is not None and transaction.get("state") != state:
+                return False
+            if currency is not None and transaction_currency(transaction) != currency:
+                return False
+            if matches is not None:
+                description = transaction.get("description")
+                return isinstance(description, str) and bool(matches(description))
+            return True
+
+        return check
+
+    def mask(self, table: TransactionTable) -> np.ndarray:
+        """Объединенное условие для TransactionTable в виде одной булевой маски."""
+        mask = np.ones(len(table), dtype=bool)
+        if self.state is not None:
+            mask &= table.state.mask(self.state)
+        if self.currency is not None:
+            mask &= table.currency_code.mask(self.currency)
+        matches = self._keyword_predicate()
+        if matches is not None:
+            mask &= table.description.mask_where(matches)
+        return mask
+
+    def run(self, transactions: Union[Iterable[Dict[str, Any]], TransactionTable]) -> Any:
+        """
+        Выполняет запрос.
+
+        Для TransactionTable возвращает TransactionTable, для любого другого итератора
+        (список, iter_json_file, ...) - список словарей.
+        """
+        if isinstance(transactions, TransactionTable):
+            return self._finish(transactions.take(self.mask(transactions)))
+        matched = filter(self.predicate(), transactions)
+        if self.order is None and self.limit is not None:
+            # Без сортировки достаточно первых limit совпадений - дальше данные не читаются
+            return list(islice(matched, self.limit))
+        return self._finish(list(matched))
+
+    def _finish(self, matched: Transactions) -> Transactions:
+        if self.order is None:
+            if self.limit is None:
+                return matched
+            return head(matched, self.limit)
+        if self.limit is None:
+            return sort_by_date(matched, self.order)
+        if self.order == "descending":
+            return latest(matched, self.limit)
+        return earliest(matched, self.limit)
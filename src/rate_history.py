@@ -0,0 +1,166 @@
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from src.external_API import api_key
+from src.logger import setup_logging
+from src.table import parse_date
+
+logger = setup_logging(__name__)
+
+DAY_US = 86_400_000_000
+DEFAULT_TIMESERIES_URL = "https://api.apilayer.com/exchangerates_data/timeseries"
+
+
+def _day(value: Any) -> int:
+    """Номер дня от начала эпохи для даты (строки ISO 8601, datetime или микросекунд от эпохи)."""
+    epoch_us = value if isinstance(value, (int, np.integer)) else parse_date(value)
+    return int(epoch_us) // DAY_US
+
+
+class RateHistory:
+    """
+    Исторические курсы валют к рублю: матрица float64 «день × валюта».
+
+    Строка матрицы - день от start_day подряд, столбец - валюта из codes. Дни без курса
+    (выходные, пропуски в источнике) заполняются последним известным курсом, даты после
+    последнего дня получают курс последнего дня, а до первого - NaN. Поиск курса по
+    (дате, коду) - это два индекса в массиве, без словарей по датам и запросов к API.
+    """
+
+    def __init__(self, start_day: int, codes: Iterable[str], rates: np.ndarray) -> None:
+        self.start_day = int(start_day)
+        self.codes = tuple(codes)
+        rates = np.asarray(rates, dtype=np.float64)
+        # Без валют reshape(-1, 0) невозможен: пустая история - матрица 0 × 0
+        self.rates = _forward_fill(rates.reshape(-1, len(self.codes)) if self.codes else np.empty((0, 0)))
+        self._columns = {code: i for i, code in enumerate(self.codes)}
+
+    def __len__(self) -> int:
+        """Число дней в истории."""
+        return len(self.rates)
+
+    @classmethod
+    def from_records(cls, records: Iterable[Tuple[Any, str, float]]) -> "RateHistory":
+        """Строит историю из троек (дата, код валюты, курс в рублях)."""
+        days: List[int] = []
+        codes: List[str] = []
+        values: List[float] = []
+        for moment, code, rate in records:
+            days.append(_day(moment))
+            codes.append(code)
+            values.append(float(rate))
+        if not days:
+            return cls(0, (), np.empty((0, 0)))
+        unique_codes, columns = np.unique(np.asarray(codes, dtype=str), return_inverse=True)
+        day_column = np.asarray(days, dtype=np.int64)
+        start_day = int(day_column.min())
+        rates = np.full((int(day_column.max()) - start_day + 1, len(unique_codes)), np.nan)
+        rates[day_column - start_day, columns] = values
+        return cls(start_day, unique_codes.tolist(), rates)
+
+    @classmethod
+    def from_timeseries(cls, payload: Dict[str, Any]) -> "RateHistory":
+        """
+        Строит историю из ответа timeseries API: {"base": "RUB", "rates": {"2020-01-01": {"USD": 0.0135}}}.
+
+        API отдает количество валюты за единицу базовой валюты, поэтому курс валюты в рублях -
+        это курс рубля к базе, деленный на курс валюты (при базе RUB - просто обратное число).
+        Сама базовая валюта получает курс рубля. Дни без курса рубля при другой базе пропускаются.
+        """
+        base = payload.get("base", "RUB")
+        return cls.from_records(_rub_records(base, payload.get("rates", {})))
+
+    @classmethod
+    def from_file(cls, file_path: Union[str, Path]) -> "RateHistory":
+        """Загружает историю из .npz (см. save) или из JSON в формате ответа timeseries API."""
+        file_path = Path(file_path)
+        if file_path.suffix == ".npz":
+            with np.load(file_path) as data:
+                return cls(int(data["start_day"]), data["codes"].tolist(), data["rates"])
+        with open(file_path, encoding="utf-8") as f:
+            return cls.from_timeseries(json.load(f))
+
+    @classmethod
+    def fetch(cls, start: Any, end: Any, codes: Iterable[str], url: Optional[str] = None) -> "RateHistory":
+        """Загружает курсы валют codes за период [start, end] одним запросом timeseries."""
+        import requests
+
+        api_key()  # загружает .env, поэтому RATES_TIMESERIES_URL читается после него
+        endpoint = url or os.getenv("RATES_TIMESERIES_URL") or DEFAULT_TIMESERIES_URL
+        symbols = ",".join(sorted({code for code in codes if code and code != "RUB"}))
+        response = requests.get(
+            endpoint,
+            params={"start_date": str(start)[:10], "end_date": str(end)[:10], "base": "RUB", "symbols": symbols},
+            headers={"apikey": api_key()},
+            timeout=30,
+        )
+        response.raise_for_status()
+        history = cls.from_timeseries(response.json())
+        logger.info(f"Загружена история курсов {symbols}: {len(history)} дней")
+        return history
+
+    def save(self, file_path: Union[str, Path]) -> None:
+        """Сохраняет историю в сжатый .npz-файл."""
+        np.savez_compressed(
+            file_path, start_day=self.start_day, codes=np.asarray(self.codes, dtype=str), rates=self.rates
+        )
+
+    def rate(self, moment: Any, code: str) -> Optional[float]:
+        """Курс валюты code в рублях на дату moment или None, если курса нет."""
+        if code == "RUB":
+            return 1.0
+        column = self._columns.get(code)
+        offset = _day(moment) - self.start_day
+        if column is None or offset < 0 or not len(self.rates):
+            return None
+        rate = self.rates[min(offset, len(self.rates) - 1), column]
+        return None if np.isnan(rate) else float(rate)
+
+    def lookup(self, dates: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        """
+        Курсы для столбцов дат (int64, микросекунды от эпохи) и кодов валют одним векторным проходом.
+
+        Для RUB курс 1.0, для неизвестных валют и дат до начала истории - NaN.
+        """
+        result = np.full(len(dates), np.nan)
+        currencies, inverse = np.unique(np.asarray(codes, dtype=str), return_inverse=True)
+        columns = np.array([self._columns.get(code, -1) for code in currencies.tolist()], dtype=np.int64)
+        row_columns = columns[inverse] if len(columns) else np.empty(0, dtype=np.int64)
+        offsets = np.asarray(dates, dtype=np.int64) // DAY_US - self.start_day
+        known = (row_columns >= 0) & (offsets >= 0) & (len(self.rates) > 0)
+        rows = np.minimum(offsets[known], len(self.rates) - 1)
+        result[known] = self.rates[rows, row_columns[known]]
+        if "RUB" in currencies:
+            result[inverse == int(np.searchsorted(currencies, "RUB"))] = 1.0
+        return result
+
+
+def _rub_records(base: str, rates: Dict[str, Dict[str, float]]) -> Iterable[Tuple[str, str, float]]:
+    """Тройки (день, код, курс в рублях) из курсов timeseries с базой base."""
+    for day, day_rates in rates.items():
+        rub_per_base = 1.0 if base == "RUB" else day_rates.get("RUB")
+        if not rub_per_base:
+            logger.warning(f"Нет курса RUB к {base} на {day}, день пропущен")
+            continue
+        if base != "RUB":
+            yield day, base, rub_per_base
+        for code, rate in day_rates.items():
+            if rate and code != "RUB":
+                yield day, code, rub_per_base / rate
+
+
+def _forward_fill(rates: np.ndarray) -> np.ndarray:
+    """Заполняет пропуски (NaN) в каждом столбце последним известным значением выше."""
+    if not rates.size:
+        return rates
+    known = ~np.isnan(rates)
+    last_known = np.where(known, np.arange(len(rates))[:, None], 0)
+    np.maximum.accumulate(last_known, axis=0, out=last_known)
+    filled = rates[last_known, np.arange(rates.shape[1])]
+    # до первого известного значения в столбце курс остается неизвестным
+    filled[~np.maximum.accumulate(known, axis=0)] = np.nan
+    return filled
@@ -0,0 +1,97 @@
+import re
+from typing import IO, Any, Iterable, List, Optional, Union
+
+import numpy as np
+
+from src.external_API import RateSource
+from src.masks import log_mask_stats
+from src.profiling import Profiler
+from src.rate_history import DAY_US, RateHistory
+from src.table import MISSING_DATE, TransactionTable, format_day
+from src.utils import converted_amounts
+from src.widget import mask_many
+
+# Сколько операций форматируется в одну строку перед записью в поток
+BATCH_SIZE = 10_000
+DEFAULT_PAGE_SIZE = 50
+TRANSFER_PATTERN = re.compile("Перевод")
+
+
+def page_bounds(total: int, page: int, page_size: int = DEFAULT_PAGE_SIZE) -> slice:
+    """Срез строк страницы page (с 1) по page_size операций; страница за концом выборки пуста."""
+    if page < 1 or page_size < 1:
+        raise ValueError("Номер и размер страницы должны быть положительными")
+    start = min((page - 1) * page_size, total)
+    return slice(start, min(start + page_size, total))
+
+
+def format_days(dates: np.ndarray) -> np.ndarray:
+    """
+    Даты вида 26.08.2019 для столбца дат (микросекунды от эпохи).
+
+    format_day вызывается один раз на каждый различный день, пустые даты дают пустую строку.
+    """
+    missing = dates == MISSING_DATE
+    days, inverse = np.unique(np.where(missing, 0, dates) // DAY_US, return_inverse=True)
+    labels = np.asarray([format_day(day * DAY_US) for day in days.tolist()], dtype=object)
+    result: np.ndarray = labels[inverse]
+    result[missing] = ""
+    return result
+
+
+def format_rows(table: TransactionTable, rub_amounts: np.ndarray) -> str:
+    """
+    Форматирует операции таблицы одним куском текста.
+
+    Для переводов выводятся счета отправителя и получателя, для остальных операций -
+    счет получателя и сумма в рублях. Даты, маски счетов и признак перевода считаются
+    по столбцам до цикла, в самом цикле только склеиваются строки.
+    """
+    transfer = table.description.mask_where(TRANSFER_PATTERN.search)
+    sources = np.full(len(table), "", dtype=object)
+    sources[transfer] = mask_many(table.from_[transfer].tolist())
+    rows = zip(
+        format_days(table.date).tolist(),
+        table.description.values().tolist(),
+        transfer.tolist(),
+        sources.tolist(),
+        mask_many(table.to.tolist()),
+        rub_amounts.tolist(),
+    )
+    parts: List[str] = []
+    for day, description, is_transfer, source, target, amount in rows:
+        if is_transfer:
+            parts.append(f"{day} {description}\n{source}  ->  {target}\n")
+        else:
+            parts.append(f"{day} {description}\n{target}\nСумма: {amount:.2f}руб. \n\n")
+    return "".join(parts)
+
+
+def render_transactions(
+    data: Union[Iterable[Any], TransactionTable],
+    out: IO[str],
+    provider: Optional[RateSource] = None,
+    history: Optional[RateHistory] = None,
+    batch_size: int = BATCH_SIZE,
+    profiler: Optional[Profiler] = None,
+) -> int:
+    """
+    Записывает операции в поток out пачками по batch_size и возвращает их число.
+
+    Суммы в рублях считаются заранее для всей выборки (converted_amounts - один запрос курсов),
+    каждая пачка форматируется format_rows в одну строку и пишется одним вызовом write,
+    поэтому вывод миллиона операций упирается в запись, а не в вызовы print.
+    """
+    profiler = profiler or Profiler()
+    table = data if isinstance(data, TransactionTable) else TransactionTable.from_records(data)
+    with profiler.stage("rates", rows_in=len(table)) as stage:
+        rub_amounts = converted_amounts(table, provider, history)
+        stage.rows_out = len(rub_amounts)
+    with profiler.stage("print", rows_in=len(table)) as stage:
+        for start in range(0, len(table), batch_size):
+            selector = slice(start, start + batch_size)
+            out.write(format_rows(table.take(selector), rub_amounts[selector]))
+        out.flush()
+        stage.rows_out = len(table)
+        log_mask_stats()
+    return len(table)
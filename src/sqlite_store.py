@@ -0,0 +1,245 @@
+import sqlite3
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+from src.dictionary_handler import REGEX_SPECIAL_CHARS, compile_search
+from src.logger import setup_logging
+from src.query import TransactionQuery
+from src.table import Categorical, TransactionTable
+from src.utils import iter_json_records
+
+logger = setup_logging(__name__)
+
+BATCH_SIZE = 10_000
+COLUMNS = ("id", "state", "date", "amount", "currency_code", "currency_name", "description", "from_", "to_")
+# Триграммный индекс FTS5 находит подстроки от 3 символов без учета регистра
+FTS_MIN_LENGTH = 3
+INSERT_SQL = f"INSERT OR IGNORE INTO transactions ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    id INTEGER NOT NULL UNIQUE,
+    state TEXT NOT NULL,
+    date INTEGER NOT NULL,
+    amount REAL NOT NULL,
+    currency_code TEXT NOT NULL,
+    currency_name TEXT NOT NULL,
+    description TEXT NOT NULL,
+    from_ TEXT NOT NULL,
+    to_ TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_transactions_state ON transactions (state, date);
+CREATE INDEX IF NOT EXISTS idx_transactions_date ON transactions (date);
+CREATE INDEX IF NOT EXISTS idx_transactions_currency ON transactions (currency_code, date);
+CREATE VIRTUAL TABLE IF NOT EXISTS transactions_fts USING fts5(
+    description, content='transactions', content_rowid='rowid', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS transactions_ai AFTER INSERT ON transactions BEGIN
+    INSERT INTO transactions_fts (rowid, description) VALUES (new.rowid, new.description);
+END;
+CREATE TRIGGER IF NOT EXISTS transactions_ad AFTER DELETE ON transactions BEGIN
+    INSERT INTO transactions_fts (transactions_fts, rowid, description) VALUES ('delete', old.rowid, old.description);
+END;
+"""
+
+
+def _fts_phrase(search_string: str) -> str:
+    """Строка поиска как фраза FTS5 (кавычки внутри удваиваются)."""
+    return '"' + search_string.replace('"', '""') + '"'
+
+
+class TransactionStore:
+    """
+    Хранилище транзакций в файле SQLite.
+
+    Записи загружаются пачками executemany в одной транзакции; порядок загрузки сохраняется
+    в rowid, поэтому результаты идут в том же порядке, что и у функций над списками.
+    Индексы по state, date и currency_code и триграммный индекс FTS5 по description позволяют
+    фильтровать, сортировать и искать в SQL, не поднимая всю историю в память; в Python
+    возвращается только результат - в виде TransactionTable.
+    """
+
+    def __init__(self, db_path: Union[str, Path] = ":memory:") -> None:
+        self.db_path = str(db_path)
+        self.connection = sqlite3.connect(self.db_path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self) -> "TransactionStore":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return int(self.connection.execute("SELECT count(*) FROM transactions").fetchone()[0])
+
+    # Загрузка
+
+    def load(self, tables: Union[TransactionTable, Iterable[TransactionTable]], batch_size: int = BATCH_SIZE) -> int:
+        """
+        Добавляет таблицы (или одну таблицу) в хранилище одной транзакцией.
+
+        Операции с уже загруженным id пропускаются. Возвращает число добавленных строк:
+        сумму rowcount пачек (INSERT OR IGNORE не считает пропущенные строки, а вставки
+        триггера полнотекстового индекса в rowcount не входят), без count(*) по таблице.
+        """
+        if isinstance(tables, TransactionTable):
+            tables = [tables]
+        added = 0
+        with self.connection:
+            for table in tables:
+                rows = _rows(table)
+                while batch := list(islice(rows, batch_size)):
+                    added += self.connection.executemany(INSERT_SQL, batch).rowcount
+        logger.info(f"Загружено в {self.db_path}: {added} операций")
+        return added
+
+    def load_file(self, file_path: Union[str, Path], batch_size: int = BATCH_SIZE) -> int:
+        """
+        Загружает файл JSON, CSV или XLSX.
+
+        JSON и CSV читаются потоково пачками по batch_size записей, поэтому файл не
+        поднимается в память целиком. Ошибка чтения (в том числе поврежденный JSON)
+        выбрасывается, и вся загрузка файла откатывается.
+        """
+        suffix = Path(file_path).suffix.lower()
+        if suffix == ".json":
+            return self.load(_json_batches(str(file_path), batch_size), batch_size)
+        if suffix == ".csv":
+            from src.csv_xlsx import iter_transactions_csv
+
+            return self.load(iter_transactions_csv(str(file_path), chunksize=batch_size), batch_size)
+        if suffix == ".xlsx":
+            from src.csv_xlsx import read_xlsx_table
+
+            return self.load(read_xlsx_table(str(file_path)), batch_size)
+        raise ValueError(f"Неподдерживаемый формат файла: {file_path}")
+
+    # Запросы
+
+    def select(
+        self,
+        where: Iterable[str] = (),
+        params: Iterable[Any] = (),
+        order: Optional[str] = None,
+        limit: Optional[int] = None,
+        join_fts: bool = False,
+    ) -> TransactionTable:
+        """Выполняет SELECT по условиям where (соединенным через AND) и возвращает TransactionTable."""
+        sql = f"SELECT {', '.join('t.' + column for column in COLUMNS)} FROM transactions AS t"
+        if join_fts:
+            sql += " JOIN transactions_fts ON transactions_fts.rowid = t.rowid"
+        where = list(where)
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        if order == "descending":
+            sql += " ORDER BY t.date DESC, t.rowid"
+        elif order is not None:
+            sql += " ORDER BY t.date, t.rowid"
+        else:
+            sql += " ORDER BY t.rowid"
+        params = list(params)
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return _table(self.connection.execute(sql, params))
+
+    def filter_by_state(self, state: str = "EXECUTED") -> TransactionTable:
+        """Аналог processing.filter_by_state: индекс по state."""
+        return self.select(["t.state = ?"], [state])
+
+    def filter_by_currency(self, currency: str) -> TransactionTable:
+        """Аналог generators.filter_by_currency: индекс по currency_code."""
+        return self.select(["t.currency_code = ?"], [currency])
+
+    def sort_by_date(self, order: str = "descending") -> TransactionTable:
+        """Аналог processing.sort_by_date (устойчивая сортировка): обход индекса по date."""
+        return self.select(order=order)
+
+    def search_transactions(
+        self, search_string: str, ignore_case: bool = False, regex: bool = True
+    ) -> TransactionTable:
+        """Аналог dictionary_handler.search_transactions с теми же правилами сопоставления."""
+        where, params, join_fts = self._search_clause(search_string, ignore_case, regex)
+        return self.select(where, params, join_fts=join_fts)
+
+    def run(self, query: TransactionQuery) -> TransactionTable:
+        """Выполняет TransactionQuery одним SQL-запросом: фильтры, сортировка и limit - в SQLite."""
+        where: List[str] = []
+        params: List[Any] = []
+        join_fts = False
+        if query.state is not None:
+            where.append("t.state = ?")
+            params.append(query.state)
+        if query.currency is not None:
+            where.append("t.currency_code = ?")
+            params.append(query.currency)
+        if query.keyword:
+            search_where, search_params, join_fts = self._search_clause(query.keyword, query.ignore_case, query.regex)
+            where += search_where
+            params += search_params
+        return self.select(where, params, query.order, query.limit, join_fts)
+
+    def _search_clause(self, search_string: str, ignore_case: bool, regex: bool) -> Tuple[List[str], List[Any], bool]:
+        """
+        Условия поиска по описанию.
+
+        Точное сопоставление выполняет та же функция compile_search, что и в памяти
+        (зарегистрирована в SQLite как matches_description). Для подстроки от 3 символов
+        кандидаты сначала отбираются триграммным индексом FTS5.
+        """
+        matches = compile_search(search_string, ignore_case, regex)
+        self.connection.create_function(
+            "matches_description", 1, lambda description: bool(matches(description)), deterministic=True
+        )
+        where = ["t.description != ''", "matches_description(t.description)"]
+        literal = not regex or not REGEX_SPECIAL_CHARS.intersection(search_string)
+        if literal and len(search_string) >= FTS_MIN_LENGTH:
+            return ["transactions_fts MATCH ?"] + where, [_fts_phrase(search_string)], True
+        return where, [], False
+
+
+def _json_batches(file_path: str, batch_size: int) -> Iterator[TransactionTable]:
+    records = iter_json_records(file_path)
+    while batch := list(islice(records, batch_size)):
+        yield TransactionTable.from_records(batch)
+
+
+def _rows(table: TransactionTable) -> Iterator[Tuple[Any, ...]]:
+    """Строки таблицы в виде кортежей для executemany (столбцы в порядке COLUMNS)."""
+    return zip(
+        table.id.tolist(),
+        table.state.values().tolist(),
+        table.date.tolist(),
+        table.amount.tolist(),
+        table.currency_code.values().tolist(),
+        table.currency_name.values().tolist(),
+        table.description.values().tolist(),
+        table.from_.tolist(),
+        table.to.tolist(),
+    )
+
+
+def _table(cursor: sqlite3.Cursor) -> TransactionTable:
+    """Собирает TransactionTable из строк результата запроса."""
+    rows = cursor.fetchall()
+    columns: Dict[str, Any] = dict(zip(COLUMNS, zip(*rows))) if rows else {column: () for column in COLUMNS}
+    return TransactionTable(
+        id=np.asarray(columns["id"], dtype=np.int64),
+        state=Categorical.from_values(columns["state"]),
+        date=np.asarray(columns["date"], dtype=np.int64),
+        amount=np.asarray(columns["amount"], dtype=np.float64),
+        currency_code=Categorical.from_values(columns["currency_code"]),
+        currency_name=Categorical.from_values(columns["currency_name"]),
+        description=Categorical.from_values(columns["description"]),
+        from_=np.asarray(columns["from_"], dtype=object),
+        to=np.asarray(columns["to_"], dtype=object),
+    )
@@ -0,0 +1,437 @@
+import sys
+import warnings
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Protocol, Sequence, Tuple, TypeVar, Union
+
+import numpy as np
+
+EPOCH = datetime(1970, 1, 1)
+EPOCH_ORDINAL = EPOCH.toordinal()
+MISSING_DATE = np.iinfo(np.int64).min
+
+
+def parse_date(value: Any) -> int:
+    """
+    Переводит дату операции (строку ISO 8601 или datetime) в микросекунды от начала эпохи (UTC).
+
+    Даты без часового пояса считаются датами в UTC. Пустое значение дает MISSING_DATE.
+    """
+    if value is None or value == "" or (isinstance(value, float) and np.isnan(value)):
+        return int(MISSING_DATE)
+    moment = value if isinstance(value, datetime) else datetime.fromisoformat(str(value))
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    delta = moment - EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def parse_dates(values: Iterable[Any]) -> np.ndarray:
+    """
+    Переводит последовательность дат в столбец int64 (микросекунды от эпохи), как parse_date.
+
+    Строки в тех форматах, что встречаются в выгрузках (2019-08-26T10:50:58.294041, 2023-09-05T11:30:32Z),
+    разбираются numpy целиком за один вызов; остальные значения - по одному через parse_date.
+    """
+    values = list(values)
+    with warnings.catch_warnings():
+        # numpy предупреждает о часовом поясе в строке (UserWarning в numpy 2, DeprecationWarning
+        # в 1.x): суффикс Z отрезаем заранее, строки с другими смещениями разбираем по одной
+        warnings.simplefilter("error")
+        try:
+            parsed = np.array([_strip_utc(value) for value in values], dtype="datetime64[us]")
+            column: np.ndarray = parsed.astype(np.int64)
+            return column
+        except (ValueError, TypeError, Warning):
+            pass
+    return np.fromiter((parse_date(value) for value in values), dtype=np.int64, count=len(values))
+
+
+def _strip_utc(value: Any) -> Any:
+    return value[:-1] if isinstance(value, str) and value.endswith("Z") else value
+
+
+def format_date(epoch_us: int) -> str:
+    """Обратное к parse_date преобразование: строка вида 2019-08-26T10:50:58.294041."""
+    if epoch_us == MISSING_DATE:
+        return ""
+    return (EPOCH + timedelta(microseconds=int(epoch_us))).isoformat(timespec="microseconds")
+
+
+def format_day(epoch_us: int) -> str:
+    """Дата в виде 26.08.2019 по числу микросекунд от эпохи."""
+    day = date.fromordinal(EPOCH_ORDINAL + int(epoch_us) // 86_400_000_000)
+    return f"{day.day:02d}.{day.month:02d}.{day.year}"
+
+
+def _clean(value: Any) -> str:
+    """Приводит строковое поле к str: None и NaN из pandas становятся пустой строкой."""
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return ""
+    return sys.intern(str(value))
+
+
+@dataclass(frozen=True)
+class Categorical:
+    """Столбец с небольшим числом различных строк: коды int32 и кортеж категорий."""
+
+    codes: np.ndarray
+    categories: Tuple[str, ...]
+
+    @classmethod
+    def from_values(cls, values: Iterable[Any]) -> "Categorical":
+        index: Dict[str, int] = {}
+        codes = [index.setdefault(_clean(value), len(index)) for value in values]
+        return cls(np.asarray(codes, dtype=np.int32), tuple(index))
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def mask(self, value: str) -> np.ndarray:
+        """Маска строк, равных value."""
+        mask: np.ndarray = self.codes == (self.categories.index(value) if value in self.categories else -1)
+        return mask
+
+    def mask_where(self, predicate: Callable[[str], Any]) -> np.ndarray:
+        """Маска строк, для которых predicate истинен; predicate вызывается один раз на категорию."""
+        matched = np.fromiter((bool(predicate(c)) for c in self.categories), dtype=bool, count=len(self.categories))
+        mask: np.ndarray = matched[self.codes]
+        return mask
+
+    def take(self, selector: Union[np.ndarray, slice]) -> "Categorical":
+        return Categorical(self.codes[selector], self.categories)
+
+    @classmethod
+    def concat(cls, parts: List["Categorical"]) -> "Categorical":
+        """Склеивает столбцы: категории объединяются, коды каждой части переводятся в общие."""
+        index: Dict[str, int] = {}
+        codes = []
+        for part in parts:
+            remap = np.fromiter(
+                (index.setdefault(c, len(index)) for c in part.categories), dtype=np.int32, count=len(part.categories)
+            )
+            codes.append(remap[part.codes] if len(part.codes) else part.codes.astype(np.int32))
+        return cls(np.concatenate(codes) if codes else np.empty(0, dtype=np.int32), tuple(index))
+
+    def values(self) -> np.ndarray:
+        """Столбец строк (object), восстановленный из кодов."""
+        values: np.ndarray = np.asarray(self.categories, dtype=object)[self.codes]
+        return values
+
+
+@dataclass(frozen=True)
+class TransactionTable:
+    """
+    Нормализованное столбцовое представление набора транзакций.
+
+    Каждое поле - массив одной длины: id (int64), дата в микросекундах от эпохи (int64),
+    сумма (float64), состояние, валюта и описание как Categorical, счета отправителя
+    и получателя как массивы строк. Фильтры над таблицей - это операции с масками,
+    а не циклы по словарям.
+    """
+
+    id: np.ndarray
+    state: Categorical
+    date: np.ndarray
+    amount: np.ndarray
+    currency_code: Categorical
+    currency_name: Categorical
+    description: Categorical
+    from_: np.ndarray
+    to: np.ndarray
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict[str, Any]]) -> "TransactionTable":
+        """
+        Строит таблицу из словарей в формате JSON (operationAmount) или CSV/XLSX (amount, currency_code).
+
+        Записи без id (пустые словари, пустые строки таблиц) пропускаются.
+        """
+        columns: Dict[str, List[Any]] = {name: [] for name in _RECORD_COLUMNS}
+        for record in records:
+            record_id = record.get("id")
+            if record_id is None or (isinstance(record_id, float) and np.isnan(record_id)):
+                continue
+            operation_amount = record.get("operationAmount")
+            if operation_amount is not None:
+                currency = operation_amount.get("currency", {})
+                amount, code, name = operation_amount.get("amount"), currency.get("code"), currency.get("name")
+            else:
+                amount, code, name = record.get("amount"), record.get("currency_code"), record.get("currency_name")
+            columns["id"].append(int(record_id))
+            columns["state"].append(record.get("state"))
+            columns["date"].append(record.get("date"))
+            columns["amount"].append(0.0 if amount is None else amount)
+            columns["currency_code"].append(code)
+            columns["currency_name"].append(name)
+            columns["description"].append(record.get("description"))
+            columns["from_"].append(_clean(record.get("from")))
+            columns["to"].append(_clean(record.get("to")))
+        return cls(
+            id=np.asarray(columns["id"], dtype=np.int64),
+            state=Categorical.from_values(columns["state"]),
+            date=parse_dates(columns["date"]),
+            amount=np.nan_to_num(np.asarray(columns["amount"], dtype=object).astype(np.float64)),
+            currency_code=Categorical.from_values(columns["currency_code"]),
+            currency_name=Categorical.from_values(columns["currency_name"]),
+            description=Categorical.from_values(columns["description"]),
+            from_=np.asarray(columns["from_"], dtype=object),
+            to=np.asarray(columns["to"], dtype=object),
+        )
+
+    @classmethod
+    def concat(cls, tables: List["TransactionTable"]) -> "TransactionTable":
+        """Склеивает таблицы в одну (строки в порядке таблиц)."""
+        if not tables:
+            return cls.from_records([])
+        return cls(
+            id=np.concatenate([table.id for table in tables]),
+            state=Categorical.concat([table.state for table in tables]),
+            date=np.concatenate([table.date for table in tables]),
+            amount=np.concatenate([table.amount for table in tables]),
+            currency_code=Categorical.concat([table.currency_code for table in tables]),
+            currency_name=Categorical.concat([table.currency_name for table in tables]),
+            description=Categorical.concat([table.description for table in tables]),
+            from_=np.concatenate([table.from_ for table in tables]),
+            to=np.concatenate([table.to for table in tables]),
+        )
+
+    def __len__(self) -> int:
+        return len(self.id)
+
+    def take(self, selector: Union[np.ndarray, slice]) -> "TransactionTable":
+        """Возвращает таблицу из строк, выбранных булевой маской, массивом индексов или срезом."""
+        return TransactionTable(
+            id=self.id[selector],
+            state=self.state.take(selector),
+            date=self.date[selector],
+            amount=self.amount[selector],
+            currency_code=self.currency_code.take(selector),
+            currency_name=self.currency_name.take(selector),
+            description=self.description.take(selector),
+            from_=self.from_[selector],
+            to=self.to[selector],
+        )
+
+    def record(self, i: int) -> Dict[str, Any]:
+        """Строка таблицы в виде словаря в формате operations.json."""
+        record: Dict[str, Any] = {
+            "id": int(self.id[i]),
+            "state": self.state.categories[self.state.codes[i]],
+            "date": format_date(self.date[i]),
+            "operationAmount": {
+                "amount": float(self.amount[i]),
+                "currency": {
+                    "name": self.currency_name.categories[self.currency_name.codes[i]],
+                    "code": self.currency_code.categories[self.currency_code.codes[i]],
+                },
+            },
+            "description": self.description.categories[self.description.codes[i]],
+        }
+        if self.from_[i]:
+            record["from"] = self.from_[i]
+        record["to"] = self.to[i]
+        return record
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return (self.record(i) for i in range(len(self)))
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        return list(self)
+
+    def sort_by_date(self, descending: bool = True) -> "TransactionTable":
+        """Сортирует таблицу по столбцу дат (устойчиво, как sorted)."""
+        return self.take(date_order(self.date, descending))
+
+    def transactions(self) -> List["Transaction"]:
+        """
+        Строки таблицы в виде записей Transaction.
+
+        Строковые поля берутся из категорий столбцов, поэтому одинаковые состояния,
+        валюты и описания во всех записях - один и тот же объект str.
+        """
+        rows = zip(
+            self.id.tolist(),
+            self.state.values().tolist(),
+            self.date.tolist(),
+            self.amount.tolist(),
+            self.currency_code.values().tolist(),
+            self.currency_name.values().tolist(),
+            self.description.values().tolist(),
+            self.from_.tolist(),
+            self.to.tolist(),
+        )
+        return [Transaction(*row) for row in rows]
+
+
+class Record(Protocol):
+    """Операция, которую читают как словарь: dict из JSON/CSV/XLSX или Transaction."""
+
+    def __getitem__(self, key: str, /) -> Any: ...
+
+    def get(self, key: str, default: Any = None, /) -> Any: ...
+
+    def __contains__(self, key: object, /) -> bool: ...
+
+
+# Тип операций в функциях, которые возвращают переданные им записи (словари или Transaction)
+RecordT = TypeVar("RecordT", bound=Record)
+
+
+@dataclass(slots=True)
+class Transaction:
+    """
+    Компактная запись об одной операции: плоские поля в __slots__ вместо вложенных словарей.
+
+    Сумма и валюта хранятся прямо в записи, дата - числом микросекунд от эпохи, а состояние,
+    валюта и описание - интернированными строками, общими для всех записей. При этом запись
+    читается как словарь в формате operations.json (transaction["operationAmount"]["amount"],
+    transaction.get("from")), поэтому с ней работают те же функции, что и со словарями.
+    """
+
+    id: int
+    state: str
+    date: int
+    amount: float
+    currency_code: str
+    currency_name: str
+    description: str
+    from_: str
+    to: str
+
+    @classmethod
+    def from_record(cls, record: Dict[str, Any]) -> "Transaction":
+        """Запись из словаря в формате JSON (operationAmount) или CSV/XLSX (amount, currency_code)."""
+        operation_amount = record.get("operationAmount")
+        if operation_amount is not None:
+            currency = operation_amount.get("currency", {})
+            amount, code, name = operation_amount.get("amount"), currency.get("code"), currency.get("name")
+        else:
+            amount, code, name = record.get("amount"), record.get("currency_code"), record.get("currency_name")
+        amount = float(0.0 if amount is None else amount)
+        return cls(
+            id=int(record["id"]),
+            state=_clean(record.get("state")),
+            date=parse_date(record.get("date")),
+            amount=0.0 if np.isnan(amount) else amount,
+            currency_code=_clean(code),
+            currency_name=_clean(name),
+            description=_clean(record.get("description")),
+            from_=_clean(record.get("from")),
+            to=_clean(record.get("to")),
+        )
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "operationAmount":
+            return {"amount": self.amount, "currency": {"name": self.currency_name, "code": self.currency_code}}
+        if key == "date":
+            return format_date(self.date)
+        attribute = _TRANSACTION_KEYS.get(key)
+        if attribute is None or (key == "from" and not self.from_):
+            raise KeyError(key)
+        return getattr(self, attribute)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key: object) -> bool:
+        return key in _TRANSACTION_KEYS and (key != "from" or bool(self.from_))
+
+    def keys(self) -> List[str]:
+        """Ключи словаря в формате operations.json (как у TransactionTable.record)."""
+        keys = ["id", "state", "date", "operationAmount", "description"]
+        if self.from_:
+            keys.append("from")
+        keys.append("to")
+        return keys
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def to_record(self) -> Dict[str, Any]:
+        """Запись в виде словаря в формате operations.json."""
+        return {key: self[key] for key in self.keys()}
+
+
+# Ключи словаря, которые понимает Transaction, и соответствующие им атрибуты
+# (плоские ключи CSV/XLSX тоже читаются)
+_TRANSACTION_KEYS = {
+    "id": "id",
+    "state": "state",
+    "date": "date",
+    "operationAmount": "operationAmount",
+    "amount": "amount",
+    "currency_code": "currency_code",
+    "currency_name": "currency_name",
+    "description": "description",
+    "from": "from_",
+    "to": "to",
+}
+
+
+def record_dates(records: Sequence[Record]) -> np.ndarray:
+    """
+    Столбец дат int64 (микросекунды от эпохи) для списка операций.
+
+    У Transaction дата уже разобрана и берется из поля date как есть; строки дат словарей
+    разбираются parse_dates за один вызов.
+    """
+    dates = [record.date for record in records if isinstance(record, Transaction)]
+    if len(dates) == len(records):
+        return np.asarray(dates, dtype=np.int64)
+    return parse_dates(record.get("date") for record in records)
+
+
+def date_order(dates: np.ndarray, descending: bool = True) -> np.ndarray:
+    """
+    Порядок индексов для устойчивой сортировки столбца дат.
+
+    Совпадает с порядком sorted(..., reverse=descending): равные даты сохраняют исходный порядок.
+    """
+    if not descending:
+        ascending: np.ndarray = np.argsort(dates, kind="stable")
+        return ascending
+    # Устойчивая сортировка по убыванию: сортируем перевернутый массив и переворачиваем результат
+    order: np.ndarray = len(dates) - 1 - np.argsort(dates[::-1], kind="stable")[::-1]
+    return order
+
+
+_RECORD_COLUMNS = ("id", "state", "date", "amount", "currency_code", "currency_name", "description", "from_", "to")
+
+
+def read_table(file_path: Union[str, Path], file_type: Optional[str] = None, strict: bool = False) -> TransactionTable:
+    """
+    Загружает транзакции из JSON, CSV или XLSX файла в TransactionTable.
+
+    Формат определяется по расширению файла, если не передан file_type ("json", "csv", "excel").
+    Поврежденный JSON по умолчанию записывается в лог и дает пустую таблицу, а при strict=True
+    выбрасывает ValueError, как ошибки чтения CSV и XLSX.
+    """
+    # Импорты внутри веток: src.utils использует TransactionTable (циклический импорт),
+    # а pandas и openpyxl загружаются только для своих форматов
+    suffix = file_type or Path(file_path).suffix.lower().lstrip(".")
+    if suffix == "json":
+        from src.utils import iter_json_records, read_json_file
+
+        if strict:
+            return TransactionTable.from_records(iter_json_records(file_path))
+        return TransactionTable.from_records(read_json_file(Path(file_path)))
+    if suffix == "csv":
+        from src.csv_xlsx import iter_transactions_csv
+
+        # Столбцы собираются из пачек DataFrame напрямую, без промежуточных словарей
+        return TransactionTable.concat(list(iter_transactions_csv(str(file_path))))
+    if suffix in ("xlsx", "excel"):
+        from src.csv_xlsx import read_xlsx_table
+
+        return read_xlsx_table(str(file_path))
+    raise ValueError(f"Неподдерживаемый формат файла: {file_path}")
+
+
+def read_transactions(file_path: Union[str, Path], file_type: Optional[str] = None) -> List[Transaction]:
+    """Загружает транзакции из JSON, CSV или XLSX файла (как read_table) в виде списка Transaction."""
+    return read_table(file_path, file_type).transactions()
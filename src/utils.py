@@ -1,42 +1,133 @@
 import json
 import os
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import IO, Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
 
-from dotenv import load_dotenv
+import numpy as np
 
-from src.external_API import get_currency_rate
+from src.external_API import RateSource, default_rate_provider
 from src.logger import setup_logging
+from src.rate_history import RateHistory
+from src.table import Record, TransactionTable, parse_dates
 
-logger = setup_logging()
+logger = setup_logging(__name__)
+
+
+JSON_CHUNK_SIZE = 64 * 1024
+
+
+def _iter_json_array(f: IO[str], chunk_size: int = JSON_CHUNK_SIZE) -> Iterator[Any]:
+    """
+    Разбирает JSON-массив из файла по частям и возвращает его элементы по одному.
+
+    В памяти держится только текущий кусок файла и разбираемый элемент.
+    Если верхний уровень не массив или файл поврежден, выбрасывает ValueError (json.JSONDecodeError).
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    eof = False
+
+    def skip_whitespace() -> str:
+        """Пропускает пробелы, при необходимости дочитывая файл; возвращает следующий символ или ""."""
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n":
+                pos += 1
+            if pos < len(buffer) or eof:
+                return buffer[pos : pos + 1]
+            read_more()
+
+    def read_more() -> None:
+        nonlocal buffer, pos, eof
+        chunk = f.read(chunk_size)
+        eof = not chunk
+        buffer = "".join((buffer[pos:], chunk))
+        pos = 0
+
+    if skip_whitespace() != "[":
+        raise ValueError("JSON-файл не содержит список транзакций")
+    pos += 1
+    if skip_whitespace() == "]":
+        return
+
+    while True:
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+            # Число в конце буфера могло быть обрезано посередине, поэтому после элемента
+            # нужен хотя бы один символ (или конец файла)
+            complete = end < len(buffer) or eof
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            complete = False
+        if not complete:
+            read_more()
+            continue
+        yield item
+        pos = end
+        separator = skip_whitespace()
+        pos += 1
+        if separator == "]":
+            return
+        if separator != ",":
+            raise json.JSONDecodeError("Ожидалась ',' или ']'", buffer, pos - 1)
+        skip_whitespace()
+
+
+def iter_json_records(file_path: Union[str, Path], chunk_size: int = JSON_CHUNK_SIZE) -> Iterator[Dict[str, Any]]:
+    """
+    Потоково считывает транзакции из JSON-файла, как iter_json_file, но не скрывает ошибки.
+
+    Отсутствующий файл дает FileNotFoundError, поврежденный или обрезанный - ValueError.
+    """
+    with open(file_path, encoding="utf-8") as f:
+        yield from _iter_json_array(f, chunk_size)
+
+
+def iter_json_file(file_path: Union[str, Path], chunk_size: int = JSON_CHUNK_SIZE) -> Iterator[Dict[str, Any]]:
+    """
+    Потоково считывает транзакции из JSON-файла с массивом на верхнем уровне.
+
+    Транзакции возвращаются по одной, весь список в память не загружается.
+    Если файл не найден, поврежден или содержит не массив, ошибка записывается в лог и чтение прекращается.
+    """
+    try:
+        yield from iter_json_records(file_path, chunk_size)
+    except (FileNotFoundError, ValueError) as e:
+        logger.error(f"Ошибка при чтении JSON-файла: {e}")
 
 
 def read_json_file(file_path: Path) -> List[Dict[str, Any]]:
     """Считывает транзакции из JSON-файла."""
     try:
         with open(file_path, encoding="utf-8") as f:
-            data = json.load(f)
-        if isinstance(data, list):
-            return data
-        else:
-            return []
-    except (FileNotFoundError, json.JSONDecodeError) as e:
+            return list(_iter_json_array(f))
+    except (FileNotFoundError, ValueError) as e:
         logger.error(f"Ошибка при чтении JSON-файла: {e}")
         return []
 
 
-def sum_amount(transaction: dict) -> float:
-    """Суммирует суммы всех транзакций"""
+def sum_amount(
+    transaction: Record, provider: Optional[RateSource] = None, history: Optional[RateHistory] = None
+) -> float:
+    """
+    Возвращает сумму транзакции в рублях.
+
+    Курсы берутся из кэширующего provider (по умолчанию общий default_rate_provider()),
+    поэтому повторные транзакции в той же валюте не делают новых запросов к API.
+    Если передана history, используется курс на дату операции (а без него - текущий).
+    """
+    provider = provider or default_rate_provider()
     total = 0.0
     currency = transaction.get("operationAmount", {}).get("currency", {}).get("code")
     amount = float(transaction.get("operationAmount", {}).get("amount", 0.0))
 
-    if currency == "RUB":
-        total += amount
-    elif currency == "EUR":
-        total += amount * get_currency_rate("EUR")
-    elif currency == "USD":
-        total += amount * get_currency_rate("USD")
+    rate = history.rate(transaction.get("date"), currency) if history is not None and currency else None
+    if rate is None:
+        rate = provider.get_rates([currency]).get(currency) if currency else None
+    if rate is not None:
+        total += amount * rate
     else:
         logger.warning(f"Неизвестная валюта: {currency}")
 
@@ -44,6 +135,119 @@ def sum_amount(transaction: dict) -> float:
     return total
 
 
+class AmountsSummary(NamedTuple):
+    """Результат sum_amounts: общая сумма, суммы по валютам и суммы каждой транзакции в рублях."""
+
+    total: float
+    by_currency: Dict[str, float]
+    rub_amounts: np.ndarray
+
+
+def _amount_columns(
+    transactions: Union[Iterable[Record], TransactionTable], with_dates: bool = False
+) -> Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]:
+    """
+    Собирает из транзакций столбцы сумм (float64), кодов валют и, при with_dates, дат (int64).
+
+    Поддерживает как вложенный формат JSON (operationAmount), так и плоский формат CSV/XLSX
+    (amount, currency_code). Пустые суммы считаются нулевыми, пустые коды - пустой строкой.
+    TransactionTable уже хранит все столбцы и отдает их без обхода строк.
+    """
+    if isinstance(transactions, TransactionTable):
+        return transactions.amount, transactions.currency_code.values(), transactions.date if with_dates else None
+    amounts = []
+    codes = []
+    dates = []
+    for transaction in transactions:
+        operation_amount = transaction.get("operationAmount")
+        if operation_amount is not None:
+            amount = operation_amount.get("amount")
+            code = operation_amount.get("currency", {}).get("code")
+        else:
+            amount = transaction.get("amount")
+            code = transaction.get("currency_code")
+        amounts.append(0.0 if amount is None else amount)
+        codes.append(code if isinstance(code, str) else "")
+        if with_dates:
+            dates.append(transaction.get("date"))
+    amount_column = np.nan_to_num(np.asarray(amounts, dtype=object).astype(np.float64))
+    return amount_column, np.asarray(codes, dtype=object), parse_dates(dates) if with_dates else None
+
+
+def _rub_amounts(
+    amounts: np.ndarray,
+    codes: np.ndarray,
+    provider: RateSource,
+    dates: Optional[np.ndarray] = None,
+    history: Optional[RateHistory] = None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Переводит столбец сумм в рубли.
+
+    С history курс каждой транзакции берется на дату операции; транзакции, для которых
+    в истории курса нет, как и все транзакции без history, переводятся по текущему курсу
+    provider - один курс на группу транзакций с одинаковой валютой.
+    """
+    currencies, inverse = np.unique(codes.astype(str), return_inverse=True)
+    if history is not None and dates is not None:
+        row_rates = history.lookup(dates, codes)
+        missing = np.isnan(row_rates)
+    else:
+        row_rates = np.zeros(len(amounts), dtype=np.float64)
+        missing = np.ones(len(amounts), dtype=bool)
+
+    fallback_groups = np.unique(inverse[missing])
+    if len(fallback_groups):
+        if history is not None:
+            logger.warning(f"Нет исторического курса для {int(missing.sum())} операций, используется текущий курс")
+        fallback_codes = currencies[fallback_groups].tolist()
+        rates = provider.get_rates(fallback_codes)
+        group_rates = np.zeros(len(currencies), dtype=np.float64)
+        for i, code in zip(fallback_groups.tolist(), fallback_codes):
+            if code in rates:
+                group_rates[i] = rates[code]
+            else:
+                logger.warning(f"Неизвестная валюта: {code}")
+        row_rates[missing] = group_rates[inverse[missing]]
+    return amounts * row_rates, currencies, inverse
+
+
+def converted_amounts(
+    transactions: Union[Iterable[Record], TransactionTable],
+    provider: Optional[RateSource] = None,
+    history: Optional[RateHistory] = None,
+) -> np.ndarray:
+    """
+    Возвращает столбец сумм транзакций в рублях (операции в неизвестной валюте дают 0).
+
+    С history каждая операция переводится по курсу на свою дату.
+    """
+    amounts, codes, dates = _amount_columns(transactions, with_dates=history is not None)
+    return _rub_amounts(amounts, codes, provider or default_rate_provider(), dates, history)[0]
+
+
+def sum_amounts(
+    transactions: Union[Iterable[Record], TransactionTable],
+    provider: Optional[RateSource] = None,
+    history: Optional[RateHistory] = None,
+) -> AmountsSummary:
+    """
+    Суммирует все транзакции в рублях.
+
+    Транзакции группируются по коду валюты, курсы всех валют запрашиваются одним запросом,
+    и каждая группа умножается на свой курс целиком. С history (историческими курсами)
+    суммы, даты и валюты собираются за один проход, и каждая операция переводится по курсу
+    на дату операции.
+
+    Returns AmountsSummary с общей суммой, суммами по валютам (в рублях) и суммой каждой транзакции в рублях.
+    """
+    amounts, codes, dates = _amount_columns(transactions, with_dates=history is not None)
+    rub, currencies, inverse = _rub_amounts(amounts, codes, provider or default_rate_provider(), dates, history)
+    totals = np.bincount(inverse, weights=rub, minlength=len(currencies))
+    by_currency = {code: float(total) for code, total in zip(currencies.tolist(), totals.tolist()) if code}
+    return AmountsSummary(float(rub.sum()), by_currency, rub)
+
+
 if __name__ == "__main__":
     operations_path = Path("../data/operations.json")  # Путь к файлу с операциями
     transactions = read_json_file(operations_path)
@@ -1,14 +1,27 @@
-from datetime import datetime
+from functools import lru_cache
+from typing import Any, Iterable, List, Union
+
+import numpy as np
 
 from src.masks import mask_account, mask_card
+from src.table import format_day, parse_date
+
+# Одни и те же карты и счета повторяются в миллионах строк, поэтому маски кэшируются
+MASK_CACHE_SIZE = 65536
 
 
+@lru_cache(maxsize=MASK_CACHE_SIZE)
 def mask_number(input_str: str) -> str:
     """
     Принимает на вход строку с информацией — тип карты/счета и номер карты/счета.
     Возвращает исходную строку с замаскированным номером карты/счета.
+
+    Результаты кэшируются (LRU на MASK_CACHE_SIZE строк), статистика - mask_number.cache_info().
+    Пустая строка (нет счета отправителя) возвращается как есть.
     """
     split_str = input_str.split()
+    if not split_str:
+        return input_str
     if split_str[0] in ["Visa", "MasterCard", "Maestro"]:
         return " ".join([*filter(str.isalpha, split_str), mask_card("".join([i for i in split_str if i.isdigit()]))])
     elif split_str[0] == "Счет":
@@ -17,10 +30,20 @@ def mask_number(input_str: str) -> str:
         return input_str
 
 
-def convert_date_format(input_str: str) -> str:
+def mask_many(values: Iterable[Any]) -> List[str]:
+    """
+    Маскирует сразу много строк "тип номер" (например, столбец from или to).
+
+    Пустые значения (None, NaN, "") дают пустую строку.
+    """
+    return [mask_number(value) if isinstance(value, str) else "" for value in values]
+
+
+def convert_date_format(input_str: Union[str, int, np.integer]) -> str:
     """
     Функция, которая принимает на вход строку вида 2018-07-11T02:26:18.671407
-    и возвращает строку с датой.
+    (или 2023-09-05T11:30:32Z, или уже разобранную дату - число микросекунд от эпохи,
+    как в столбце TransactionTable.date) и возвращает строку с датой.
     """
-    input_date = datetime.strptime(input_str, "%Y-%m-%dT%H:%M:%S.%f")
-    return input_date.strftime("%d.%m.%Y")
+    epoch_us = parse_date(input_str) if isinstance(input_str, str) else int(input_str)
+    return format_day(epoch_us)
@@ -0,0 +1,33 @@
+from pathlib import Path
+
+from benchmarks.generate import iter_records, write_csv, write_json
+from benchmarks.run import compare, load_baseline, run_benchmarks, save_baseline
+from src.table import read_table
+
+
+def test_generator_is_deterministic() -> None:
+    assert list(iter_records(50, seed=1)) == list(iter_records(50, seed=1))
+    assert list(iter_records(50, seed=1)) != list(iter_records(50, seed=2))
+    assert len({record["id"] for record in iter_records(1000)}) == 1000
+
+
+def test_generated_files_load(tmp_path: Path) -> None:
+    json_table = read_table(write_json(tmp_path / "operations.json", 200))
+    csv_table = read_table(write_csv(tmp_path / "transactions.csv", 200))
+    assert len(json_table) == len(csv_table) == 200
+    assert json_table.id.tolist() == csv_table.id.tolist()
+    assert set(json_table.state.categories) <= {"EXECUTED", "CANCELED", "PENDING"}
+
+
+def test_run_and_compare(tmp_path: Path) -> None:
+    results = run_benchmarks([100], repeat=1, memory=True, data_dir=tmp_path, only="[table]")
+    assert {result["name"] for result in results} >= {"sort_by_date[table]", "filter_by_state[table]"}
+    assert all(result["seconds"] >= 0 and result["peak_mb"] is not None for result in results)
+
+    baseline_path = tmp_path / "baseline.json"
+    save_baseline(baseline_path, results)
+    baseline = load_baseline(baseline_path)
+    assert compare(results, baseline) == []
+
+    slower = [{**result, "seconds": result["seconds"] * 2 + 1} for result in results]
+    assert len(compare(slower, baseline)) == len(results)
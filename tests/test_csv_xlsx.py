@@ -3,8 +3,17 @@ from typing import Any
 from unittest.mock import patch
 
 import pandas as pd
+from openpyxl import Workbook  # type: ignore[import-untyped]
 
-from src.csv_xlsx import read_transactions_csv, read_transactions_xlsx
+from src.csv_xlsx import (
+    iter_transactions_csv,
+    iter_transactions_xlsx,
+    read_transactions_csv,
+    read_transactions_xlsx,
+    read_xlsx_table,
+)
+from src.processing import filter_by_state
+from src.table import TransactionTable
 
 
 def test_read_transactions_csv() -> None:
@@ -37,5 +46,79 @@ def test_read_from_xlsx(mock_read_excel: Any) -> None:
     unittest.TestCase().assertEqual(result, expected_result)
 
 
+CSV_HEADER = "id,state,date,amount,currency_name,currency_code,from,to,description\n"
+CSV_ROWS = [
+    "650703,EXECUTED,2023-09-05T11:30:32Z,16210,Sol,PEN,Счет 58803664561298323391,Счет 39745660563456619397,"
+    "Перевод организации\n",
+    "5380041,CANCELED,2021-02-01T11:54:58Z,23789,Peso,UYU,,Счет 23294994494356835683,Открытие вклада\n",
+    ",,,,,,,,\n",
+    "3598919,EXECUTED,2020-12-06T23:00:58Z,29740,Peso,COP,Discover 3172601889670065,"
+    "Discover 0720428384694643,Перевод с карты на карту\n",
+]
+
+
+def test_read_transactions_csv_comma_separated(tmp_path: Any) -> None:
+    """
+    Тест для файла с разделителем-запятой и пустыми значениями
+    """
+    path = tmp_path / "transactions.csv"
+    path.write_text(CSV_HEADER + "".join(CSV_ROWS), encoding="utf-8")
+    transactions_list = read_transactions_csv(str(path))
+    assert len(transactions_list) == 4
+    assert transactions_list[0]["currency_code"] == "PEN"
+    assert transactions_list[1]["from"] is None
+
+
+def test_iter_transactions_csv_batches() -> None:
+    """
+    Потоковое чтение по частям дает те же строки, что и чтение целиком
+    """
+    batches = list(iter_transactions_csv("data/transactions.csv", chunksize=250))
+    assert all(isinstance(batch, TransactionTable) for batch in batches)
+    assert sum(len(batch) for batch in batches) == 998
+    executed = sum(len(filter_by_state(batch, "EXECUTED")) for batch in batches)
+    full = TransactionTable.from_records(read_transactions_csv("data/transactions.csv"))
+    assert executed == len(filter_by_state(full, "EXECUTED"))
+    assert batches[0].record(0) == full.record(0)
+
+
+def _write_xlsx(path: Any, rows: list) -> None:
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(["id", "state", "date", "amount", "currency_name", "currency_code", "from", "to", "description"])
+    for row in rows:
+        sheet.append(row)
+    workbook.save(path)
+
+
+XLSX_ROWS = [
+    [650703, "EXECUTED", "2023-09-05T11:30:32Z", 16210, "Sol", "PEN", "Счет 5880", "Счет 3974", "Перевод организации"],
+    [5380041, "CANCELED", "2021-02-01T11:54:58Z", 23789, "Peso", "UYU", None, "Счет 2329", "Открытие вклада"],
+]
+
+
+def test_iter_transactions_xlsx(tmp_path: Any) -> None:
+    path = tmp_path / "transactions.xlsx"
+    _write_xlsx(path, XLSX_ROWS)
+    records = list(iter_transactions_xlsx(str(path)))
+    assert len(records) == 2
+    assert records[0]["currency_code"] == "PEN"
+    assert records[1]["from"] is None
+
+
+def test_read_xlsx_table_uses_cache(tmp_path: Any) -> None:
+    path = tmp_path / "transactions.xlsx"
+    _write_xlsx(path, XLSX_ROWS)
+    assert read_xlsx_table(str(path)).id.tolist() == [650703, 5380041]
+    assert (tmp_path / "transactions.xlsx.cache.pkl").exists()
+
+    with patch("src.csv_xlsx.iter_transactions_xlsx") as mock_iter:
+        assert read_xlsx_table(str(path)).id.tolist() == [650703, 5380041]
+        mock_iter.assert_not_called()
+
+    _write_xlsx(path, XLSX_ROWS[:1])
+    assert read_xlsx_table(str(path)).id.tolist() == [650703]
+
+
 if __name__ == "main":
     unittest.main()
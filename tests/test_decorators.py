@@ -1,4 +1,12 @@
-from src.decorators import my_function
+import os
+import re
+import time
+from pathlib import Path
+
+import pytest
+
+from src import decorators
+from src.decorators import CallStats, flush_logs, log, log_stats, my_function, percentile
 
 
 def test_my_function() -> None:
@@ -7,3 +15,87 @@ def test_my_function() -> None:
     assert my_function(3, 2) == 5
     assert my_function(4, 2) == 6
     assert my_function(5, 2) == 7
+
+
+def test_log_buffers_writes(tmp_path: Path) -> None:
+    filename = str(tmp_path / "log.txt")
+
+    @log(filename=filename)
+    def divide(x: int, y: int) -> float:
+        return x / y
+
+    assert divide(4, 2) == 2
+    assert divide(1, 0) is None
+    assert not os.path.exists(filename)
+
+    flush_logs()
+    lines = Path(filename).read_text().splitlines()
+    assert len(lines) == 2
+    assert re.fullmatch(r"\S+ \S+ divide ok wall=\d+\.\d{6}s cpu=\d+\.\d{6}s", lines[0])
+    assert "divide error: ZeroDivisionError. Inputs: (1, 0), {}" in lines[1]
+
+
+def test_log_flushes_by_timer(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(decorators, "FLUSH_INTERVAL", 0.05)
+    filename = tmp_path / "timer.txt"
+
+    @log(filename=str(filename))
+    def add(x: int, y: int) -> int:
+        return x + y
+
+    add(1, 2)
+    deadline = time.monotonic() + 5
+    while not filename.exists() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert " add ok wall=" in filename.read_text()
+
+
+def test_log_console(capsys: pytest.CaptureFixture) -> None:
+    @log()
+    def add(x: int, y: int) -> int:
+        return x + y
+
+    assert add(1, 2) == 3
+    assert " add ok wall=" in capsys.readouterr().out
+
+
+def test_log_aggregate(tmp_path: Path) -> None:
+    filename = str(tmp_path / "stats.txt")
+
+    @log(filename=filename, aggregate=True)
+    def check(x: int) -> int:
+        if x < 0:
+            raise ValueError
+        return x
+
+    for x in range(-1, 99):
+        check(x)
+    stats = log_stats()["check"]
+    assert stats["calls"] == 100 and stats["errors"] == 1
+    assert stats["wall_p50"] <= stats["wall_p99"] <= stats["wall_max"]
+
+    flush_logs()
+    (line,) = Path(filename).read_text().splitlines()
+    assert re.search(r" check calls=100 errors=1 p50=\S+ms p90=\S+ms p99=\S+ms max=\S+ms cpu=\S+s$", line)
+    assert "check" not in log_stats()
+
+
+def test_percentile() -> None:
+    values = [float(x) for x in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile(values, 100) == 100.0
+    assert percentile([], 50) == 0.0
+
+
+def test_call_stats_is_bounded(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(decorators, "RESERVOIR_SIZE", 100)
+    stats = CallStats()
+    for x in range(1, 1001):
+        stats.add(float(x), 0.0, True)
+    summary = stats.summary()
+    assert len(stats.wall) == 100
+    assert summary["calls"] == 1000
+    assert summary["wall_max"] == 1000.0
+    assert summary["wall_total"] == 500500.0
+    assert 1.0 <= summary["wall_p50"] <= summary["wall_p99"] <= 1000.0
@@ -0,0 +1,127 @@
+import random
+from typing import Any, Dict, List
+
+import pytest
+
+from src.dictionary_handler import (
+    CompiledCategorizer,
+    DescriptionIndex,
+    categorize_transactions,
+    compile_search,
+    search_transactions,
+)
+from src.table import TransactionTable
+
+
+def naive_categorize(transactions: List[Dict[str, Any]], categories: Dict[str, List[str]]) -> Dict[str, int]:
+    """Исходная реализация: вложенные циклы по категориям и ключевым словам."""
+    counts: Dict[str, int] = {}
+    for transaction in transactions:
+        if "description" in transaction:
+            for category, keywords in categories.items():
+                if any(keyword.lower() in transaction["description"].lower() for keyword in keywords):
+                    counts[category] = counts.get(category, 0) + 1
+                    break
+    return counts
+
+
+@pytest.fixture
+def categories() -> Dict[str, List[str]]:
+    return {
+        "Вклады": ["вклада"],
+        "Организации": ["Перевод организации"],
+        "Переводы": ["перевод", "на карту"],
+        "Счета": ["счет"],
+    }
+
+
+def test_first_category_wins(categories: Dict[str, List[str]]) -> None:
+    categorizer = CompiledCategorizer(categories)
+    # "перевод" встречается раньше в строке, но категория "Организации" идет раньше "Переводов"
+    assert categorizer.classify("Перевод организации") == "Организации"
+    assert categorizer.classify("Перевод со счета на счет") == "Переводы"
+    assert categorizer.classify("Открытие вклада") == "Вклады"
+    assert categorizer.classify("Оплата") is None
+    assert categorizer.classify(None) is None
+
+
+def test_matches_naive_implementation(categories: Dict[str, List[str]]) -> None:
+    words = ["Перевод", "организации", "со", "счета", "на", "карту", "Открытие", "вклада", "Оплата", "СЧЕТ"]
+    rng = random.Random(1)
+    transactions: List[Dict[str, Any]] = [
+        {"description": " ".join(rng.choice(words) for _ in range(rng.randint(1, 4)))} for _ in range(500)
+    ]
+    transactions.append({"id": 1})
+    assert categorize_transactions(transactions, categories) == naive_categorize(transactions, categories)
+
+
+def test_labels_and_table(categories: Dict[str, List[str]]) -> None:
+    records = [
+        {"id": 1, "description": "Перевод организации"},
+        {"id": 2, "description": "Открытие вклада"},
+        {"id": 3, "description": "Оплата"},
+        {"id": 4, "description": "Перевод организации"},
+    ]
+    result = CompiledCategorizer(categories).categorize(records, with_labels=True)
+    assert result.counts == {"Организации": 2, "Вклады": 1}
+    assert result.labels == ["Организации", "Вклады", None, "Организации"]
+
+    table_result = CompiledCategorizer(categories).categorize(TransactionTable.from_records(records), True)
+    assert table_result == result
+
+
+def test_empty_categories() -> None:
+    assert categorize_transactions([{"description": "Перевод"}], {}) == {}
+
+
+@pytest.fixture
+def descriptions() -> List[Dict[str, Any]]:
+    return [
+        {"id": 1, "description": "Перевод организации"},
+        {"id": 2, "description": "Перевод со счета на счет"},
+        {"id": 3},
+        {"id": 4, "description": "Открытие вклада (срочный)"},
+        {"id": 5, "description": "перевод с карты на карту"},
+    ]
+
+
+def test_compile_search() -> None:
+    assert compile_search("Перевод")("Перевод организации")
+    assert not compile_search("Перевод")("перевод с карты")
+    assert compile_search("Перевод", ignore_case=True)("перевод с карты")
+    assert compile_search("^Откр.+вклада")("Открытие вклада")
+    assert compile_search("(")("Открытие вклада (срочный)")
+    assert not compile_search("(")("Открытие вклада")
+
+
+def test_search_transactions(descriptions: List[Dict[str, Any]]) -> None:
+    assert [t["id"] for t in search_transactions(descriptions, "Перевод")] == [1, 2]
+    assert [t["id"] for t in search_transactions(descriptions, "перевод", ignore_case=True)] == [1, 2, 5]
+    assert [t["id"] for t in search_transactions(descriptions, "(срочный)", regex=False)] == [4]
+    assert [t["id"] for t in search_transactions(descriptions, "(")] == [4]
+
+
+@pytest.mark.parametrize(
+    "search_string, ignore_case, regex",
+    [
+        ("Перевод", False, True),
+        ("перевод", True, True),
+        ("од ор", False, False),
+        ("на карту", True, False),
+        ("счета на", False, True),
+        ("(", False, True),
+        ("^п", False, True),
+        ("вклада (срочный)", False, False),
+        ("нет такого", False, False),
+    ],
+)
+def test_description_index_matches_scan(
+    descriptions: List[Dict[str, Any]], search_string: str, ignore_case: bool, regex: bool
+) -> None:
+    expected = search_transactions(descriptions, search_string, ignore_case, regex)
+    index = DescriptionIndex(descriptions)
+    assert index.search(search_string, ignore_case, regex) == expected
+    assert index.search(search_string, ignore_case, regex) == expected
+
+    table_index = DescriptionIndex(TransactionTable.from_records(descriptions))
+    assert table_index.search(search_string, ignore_case, regex).id.tolist() == [t["id"] for t in expected]
@@ -0,0 +1,142 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from src.external_API import AsyncRateClient, CurrencyRateProvider
+from src.utils import sum_amount, sum_amounts
+
+RATES = {"USD": 90.0, "EUR": 100.0, "CNY": 12.5, "KZT": 0.2}
+
+
+class StubServer(ThreadingHTTPServer):
+    """Локальный сервер-заглушка API курсов: ответы, ошибки и задержка задаются атрибутами."""
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.delay = 0.0
+        # валюта -> список статусов ошибок, которые вернутся перед успешным ответом
+        self.failures: Dict[str, List[int]] = {}
+        self.down = False
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/latest"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    server: StubServer
+
+    def do_GET(self) -> None:
+        server = self.server
+        with server.lock:
+            server.active += 1
+            server.max_active = max(server.max_active, server.active)
+        try:
+            time.sleep(server.delay)
+            params = parse_qs(urlparse(self.path).query)
+            base = params.get("base", [""])[0]
+            failures = server.failures.get(base)
+            if server.down or failures:
+                self._reply(failures.pop(0) if failures else 500, {"error": "unavailable"})
+            elif base == "RUB":
+                symbols = params["symbols"][0].split(",")
+                self._reply(200, {"rates": {code: 1 / RATES[code] for code in symbols if code in RATES}})
+            elif base in RATES:
+                self._reply(200, {"rates": {"RUB": RATES[base]}})
+            else:
+                self._reply(400, {"error": "unknown base"})
+        finally:
+            with server.lock:
+                server.active -= 1
+
+    def _reply(self, status: int, body: Dict[str, Any]) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+@pytest.fixture
+def server() -> Iterator[StubServer]:
+    stub = StubServer()
+    thread = threading.Thread(target=stub.serve_forever, daemon=True)
+    thread.start()
+    yield stub
+    stub.shutdown()
+    stub.server_close()
+
+
+def test_fetches_concurrently_with_limit(server: StubServer) -> None:
+    server.delay = 0.2
+    client = AsyncRateClient(url=server.url, max_concurrency=2)
+    rates = client.get_rates(["USD", "EUR", "CNY", "KZT", "RUB", None])
+    client.close()
+
+    assert rates == {"RUB": 1.0, **RATES}
+    assert server.max_active == 2
+
+
+def test_uses_fresh_cache(server: StubServer) -> None:
+    client = AsyncRateClient(url=server.url)
+    client.get_rates(["USD"])
+    client.get_rates(["USD"])
+    assert client.requests_made == 1
+
+
+def test_retries_with_backoff(server: StubServer) -> None:
+    server.failures["USD"] = [503, 429]
+    client = AsyncRateClient(url=server.url, retries=3, backoff=0.01)
+    assert client.get_rates(["USD"]) == {"RUB": 1.0, "USD": 90.0}
+    assert client.requests_made == 3
+
+
+def test_client_errors_are_not_retried(server: StubServer) -> None:
+    client = AsyncRateClient(url=server.url, retries=3, backoff=0.01)
+    assert client.get_rates(["XXX"]) == {"RUB": 1.0}
+    assert client.requests_made == 1
+
+
+def test_stale_cache_fallback(server: StubServer) -> None:
+    client = AsyncRateClient(url=server.url, retries=1, backoff=0.01, ttl=0.0)
+    assert client.get_rates(["USD"])["USD"] == 90.0
+    server.down = True
+    # Устаревший курс вместо 1.0, а валюта без курса в результат не попадает
+    assert client.get_rates(["USD", "EUR"]) == {"RUB": 1.0, "USD": 90.0}
+
+
+def test_provider_uses_url_and_stale_rate(server: StubServer) -> None:
+    provider = CurrencyRateProvider(url=server.url, ttl=0.0, retry_after=0.0)
+    assert provider.get_rates(["USD", "EUR"]) == {"RUB": 1.0, "USD": 90.0, "EUR": 100.0}
+    server.down = True
+    assert provider.get_rate("USD") == 90.0
+    assert provider.get_rate("CNY") is None
+
+
+def test_url_from_environment(server: StubServer, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("RATES_URL", server.url)
+    assert CurrencyRateProvider().get_rate("USD") == 90.0
+    assert AsyncRateClient().get_rate("EUR") == 100.0
+
+
+def test_async_client_in_conversion_path(server: StubServer) -> None:
+    client = AsyncRateClient(url=server.url)
+    transactions = [
+        {"operationAmount": {"amount": "2", "currency": {"code": "USD"}}},
+        {"operationAmount": {"amount": "1", "currency": {"code": "XXX"}}},
+    ]
+    summary = sum_amounts(transactions, client)
+    assert summary.rub_amounts.tolist() == [180.0, 0.0]
+    assert sum_amount(transactions[0], client) == 180.0
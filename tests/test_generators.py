@@ -33,3 +33,8 @@ def test_filter_by_currency(dict_list_with_currency: list[dict]) -> None:
 def test_transaction_descriptions(dict_list_for_descriptions: list[dict]) -> None:
     assert list(transaction_descriptions(dict_list_for_descriptions))[0] == "Перевод организации"
     assert list(transaction_descriptions(dict_list_for_descriptions))[1] == "Перевод со счета на счет"
+
+
+def test_filter_by_currency_flat_records() -> None:
+    transactions = [{"id": 1, "currency_code": "PEN"}, {"id": 2, "currency_code": "RUB"}]
+    assert [t["id"] for t in filter_by_currency(transactions, "RUB")] == [2]
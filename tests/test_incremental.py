@@ -0,0 +1,83 @@
+from pathlib import Path
+from typing import Any, Dict, List
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.incremental import IncrementalProcessor, load_state
+
+
+def operation(op_id: int, day: int, state: str = "EXECUTED", code: str = "RUB", amount: str = "100") -> Dict[str, Any]:
+    return {
+        "id": op_id,
+        "state": state,
+        "date": f"2020-01-{day:02d}T10:00:00",
+        "operationAmount": {"amount": amount, "currency": {"name": code, "code": code}},
+        "description": "Перевод организации" if op_id % 2 else "Открытие вклада",
+        "to": "Счет 64686473678894779589",
+    }
+
+
+@pytest.fixture
+def provider() -> MagicMock:
+    mock = MagicMock()
+    mock.get_rates.side_effect = lambda codes: {"RUB": 1.0, "USD": 90.0}
+    return mock
+
+
+@pytest.fixture
+def first_export() -> List[Dict[str, Any]]:
+    return [operation(1, 1), operation(2, 2, "CANCELED"), operation(3, 3, code="USD", amount="2")]
+
+
+def test_rerun_processes_only_delta(tmp_path: Path, provider: MagicMock, first_export: List[Dict[str, Any]]) -> None:
+    state_path = tmp_path / "state.json"
+    assert len(IncrementalProcessor(state_path, provider=provider).update(first_export)) == 3
+
+    second_export = first_export + [operation(4, 4), operation(4, 4), operation(5, 2, "PENDING")]
+    delta = IncrementalProcessor(state_path, provider=provider).update(second_export)
+    assert delta.id.tolist() == [4, 5]
+
+    state = load_state(state_path)
+    assert state is not None
+    assert state.processed == 5
+    assert state.state_counts == {"EXECUTED": 3, "CANCELED": 1, "PENDING": 1}
+    assert state.category_counts == {"Переводы организациям": 3, "Вклады": 2}
+    assert state.native_totals == {"RUB": 400.0, "USD": 2.0}
+    assert state.summary(provider)["currency_totals"] == {"RUB": 400.0, "USD": 180.0}
+    assert state.seen_ids.tolist() == [1, 2, 3, 4, 5]
+    assert len(IncrementalProcessor(state_path, provider=provider).update(second_export)) == 0
+
+
+def test_date_watermark(tmp_path: Path, provider: MagicMock, first_export: List[Dict[str, Any]]) -> None:
+    state_path = tmp_path / "state.json"
+    IncrementalProcessor(state_path, mode="date", provider=provider).update(first_export)
+    # операция 5 новая, но ее дата не позже водяного знака
+    delta = IncrementalProcessor(state_path, mode="date", provider=provider).update(
+        first_export + [operation(4, 4), operation(5, 2)]
+    )
+    assert delta.id.tolist() == [4]
+    assert load_state(state_path).summary(provider)["max_date"].startswith("2020-01-04")  # type: ignore[union-attr]
+
+
+def test_mismatched_state_is_rejected(tmp_path: Path, provider: MagicMock, first_export: List[Dict[str, Any]]) -> None:
+    state_path = tmp_path / "state.json"
+    IncrementalProcessor(state_path, provider=provider).update(first_export)
+    with pytest.raises(ValueError):
+        IncrementalProcessor(state_path, mode="date")
+    with pytest.raises(ValueError):
+        IncrementalProcessor(state_path, categories={"Все": ["а"]})
+
+
+def test_failed_rates_are_not_persisted(tmp_path: Path, first_export: List[Dict[str, Any]]) -> None:
+    state_path = tmp_path / "state.json"
+    offline = MagicMock()
+    offline.get_rates.side_effect = lambda codes: {"RUB": 1.0}
+    processor = IncrementalProcessor(state_path, provider=offline)
+    processor.update(first_export)
+    summary = processor.summary()
+    assert summary["total_rub"] == 200.0 and summary["unconverted"] == ["USD"]
+
+    online = MagicMock()
+    online.get_rates.side_effect = lambda codes: {"RUB": 1.0, "USD": 90.0}
+    assert IncrementalProcessor(state_path, provider=online).summary()["total_rub"] == 380.0
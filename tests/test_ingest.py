@@ -0,0 +1,57 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+from src.ingest import expand_sources, ingest
+from src.table import TransactionTable, read_table
+
+DATA = Path(__file__).resolve().parent.parent / "data"
+
+
+@pytest.fixture
+def exports(tmp_path: Path) -> Path:
+    for name in ("operations.json", "transactions.csv", "transactions_excel.xlsx"):
+        shutil.copy(DATA / name, tmp_path / name)
+    (tmp_path / "notes.txt").write_text("не транзакции")
+    return tmp_path
+
+
+def test_expand_sources(exports: Path) -> None:
+    by_dir = expand_sources(exports)
+    assert [Path(path).name for path in by_dir] == ["operations.json", "transactions.csv", "transactions_excel.xlsx"]
+    assert expand_sources([str(exports / "*.csv"), exports / "transactions.csv"]) == [
+        str(exports / "transactions.csv")
+    ]
+
+
+def test_ingest_merges_in_file_order(exports: Path) -> None:
+    result = ingest(exports, workers=2)
+    expected = [read_table(path) for path in expand_sources(exports)]
+    assert result.errors == {}
+    assert len(result.table) == sum(len(table) for table in expected)
+    assert result.table.id.tolist() == [i for table in expected for i in table.id.tolist()]
+    assert result.table.record(0) == expected[0].record(0)
+    assert result.table.record(len(result.table) - 1) == expected[-1].record(len(expected[-1]) - 1)
+    assert set(result.table.state.categories) == {"EXECUTED", "CANCELED", "PENDING"}
+
+
+def test_bad_file_is_isolated(exports: Path) -> None:
+    (exports / "broken.xlsx").write_bytes(b"not a zip file")
+    (exports / "truncated.json").write_text('[{"id": 1, "state": "EXECUTED"}, {"id": 2, "sta', encoding="utf-8")
+    result = ingest([exports, exports / "notes.txt"], workers=2)
+    assert set(result.errors) == {
+        str(exports / "broken.xlsx"),
+        str(exports / "truncated.json"),
+        str(exports / "notes.txt"),
+    }
+    assert len(result.files) == 3
+    assert len(result.table) == sum(len(read_table(path)) for path in result.files)
+
+
+def test_concat_remaps_categories() -> None:
+    first = TransactionTable.from_records([{"id": 1, "state": "EXECUTED"}, {"id": 2, "state": "CANCELED"}])
+    second = TransactionTable.from_records([{"id": 3, "state": "PENDING"}, {"id": 4, "state": "EXECUTED"}])
+    merged = TransactionTable.concat([first, second])
+    assert merged.state.values().tolist() == ["EXECUTED", "CANCELED", "PENDING", "EXECUTED"]
+    assert len(TransactionTable.concat([])) == 0
@@ -0,0 +1,44 @@
+import logging
+from unittest.mock import MagicMock, patch
+
+from src.logger import RateLimitFilter, configure_levels, setup_logging
+
+
+def _record(lineno: int = 10) -> logging.LogRecord:
+    return logging.LogRecord("src.masks", logging.INFO, "masks.py", lineno, "Сообщение %s", ("1",), None)
+
+
+def test_setup_logging_is_idempotent() -> None:
+    first = setup_logging("src.masks")
+    handlers = list(logging.getLogger("src").handlers)
+    second = setup_logging("src.masks")
+    setup_logging("src.utils")
+    assert first is second
+    assert logging.getLogger("src").handlers == handlers
+    assert len(handlers) == 1
+    assert not first.handlers
+
+
+def test_module_levels() -> None:
+    logger = setup_logging("src.test_module_levels", level="WARNING")
+    assert not logger.isEnabledFor(logging.INFO)
+    configure_levels({"src.test_module_levels": logging.DEBUG})
+    assert logger.isEnabledFor(logging.DEBUG)
+
+
+@patch("src.logger.time.monotonic")
+def test_rate_limit_filter(mock_time: MagicMock) -> None:
+    rate_filter = RateLimitFilter(max_records=2, interval=1.0)
+    mock_time.return_value = 100.0
+    assert [rate_filter.filter(_record()) for _ in range(4)] == [True, True, False, False]
+    assert rate_filter.filter(_record(lineno=20))
+
+    mock_time.return_value = 101.5
+    record = _record()
+    assert rate_filter.filter(record)
+    assert record.getMessage() == "Сообщение 1 [пропущено похожих сообщений: 2]"
+
+
+def test_rate_limit_disabled_by_default() -> None:
+    rate_filter = RateLimitFilter()
+    assert all(rate_filter.filter(_record()) for _ in range(1000))
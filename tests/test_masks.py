@@ -1,4 +1,6 @@
-from src.masks import mask_account, mask_card
+from unittest.mock import patch
+
+from src.masks import log_mask_stats, mask_account, mask_calls, mask_card
 
 """
 # Проверка функции mask_card() с аннотациями типов
@@ -18,3 +20,18 @@ def test_mask_card() -> None:
 def test_mask_account() -> None:
     assert mask_account("73654108430135874305") == "**4305"
     assert mask_account("123") == "Некорректный номер счета"
+
+
+def test_mask_calls_are_aggregated() -> None:
+    mask_calls.clear()
+    with patch("src.masks.logger") as mock_logger:
+        for _ in range(3):
+            mask_card("1234567890123456")
+        mask_account("123")
+        mock_logger.info.assert_not_called()
+        assert mask_calls == {"mask_card_ok": 3, "mask_account_error": 1}
+
+        log_mask_stats()
+        mock_logger.log.assert_called_once()
+        assert "mask_card_ok=3" in mock_logger.log.call_args.args[1]
+    assert not mask_calls
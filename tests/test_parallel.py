@@ -0,0 +1,52 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+import pytest
+
+from benchmarks.generate import iter_records
+from src.dictionary_handler import CompiledCategorizer, categorize_transactions, search_transactions
+from src.parallel import ParallelExecutor, chunks, verify_parallel
+from src.table import TransactionTable
+
+CATEGORIES = {"Вклады": ["вклада"], "Карты": ["на карту", "с карты"], "Счета": ["счет"]}
+
+
+@pytest.fixture(scope="module")
+def records() -> List[Dict[str, Any]]:
+    return list(iter_records(2_000, seed=3))
+
+
+def test_chunks(records: List[Dict[str, Any]]) -> None:
+    assert [len(part) for part in chunks(records, 900)] == [900, 900, 200]
+    assert chunks([], 10) == []
+    with pytest.raises(ValueError):
+        chunks(records, 0)
+
+
+def test_process_pool_matches_serial(records: List[Dict[str, Any]]) -> None:
+    executor = ParallelExecutor(workers=2, chunk_size=300)
+    result = executor.categorize(records, CATEGORIES, with_labels=True)
+    assert result == CompiledCategorizer(CATEGORIES).categorize(records, with_labels=True)
+    assert list(result.counts) == list(categorize_transactions(records, CATEGORIES))
+    assert executor.search_transactions(records, "карт", ignore_case=True) == search_transactions(
+        records, "карт", ignore_case=True
+    )
+
+    table = TransactionTable.from_records(records)
+    found = executor.search_transactions(table, r"Перевод .* счет")
+    assert found.id.tolist() == search_transactions(table, r"Перевод .* счет").id.tolist()
+    assert executor.categorize(table, CATEGORIES, with_labels=True) == CompiledCategorizer(CATEGORIES).categorize(
+        table, with_labels=True
+    )
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 5_000])
+def test_verify_parallel(records: List[Dict[str, Any]], chunk_size: int) -> None:
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        executor = ParallelExecutor(chunk_size=chunk_size, executor=pool)
+        assert verify_parallel(executor, records[:500], "организации", CATEGORIES) == {
+            "search": True,
+            "categorize": True,
+        }
+        assert executor.search_transactions([], "вклад") == []
+        assert executor.categorize_transactions([], CATEGORIES) == {}
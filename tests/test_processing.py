@@ -1,8 +1,10 @@
-from typing import List
+from datetime import datetime
+from typing import Any, Dict, List
 
 import pytest
 
-from src.processing import filter_by_state, sort_by_date
+from src.processing import DateIndex, between, earliest, filter_by_state, latest, sort_by_date
+from src.table import TransactionTable, parse_date, parse_dates
 
 
 @pytest.fixture
@@ -31,3 +33,60 @@ def test_filter_sort_by_date(input_data_filter: List[dict]) -> None:
         {"date": "2018-10-14T08:21:33.419441", "id": 615064591, "state": "CANCELED"},
         {"date": "2019-07-03T18:35:29.512364", "id": 41428829, "state": "EXECUTED"},
     ]
+
+
+def test_sort_by_date_descending_is_stable() -> None:
+    data: List[Dict[str, Any]] = [
+        {"id": 1, "date": "2019-07-03T18:35:29.512364"},
+        {"id": 2, "date": "2018-06-30T02:08:58"},
+        {"id": 3, "date": "2019-07-03T18:35:29.512364"},
+        {"id": 4, "date": "2018-06-30T02:08:58.000000"},
+    ]
+    assert [item["id"] for item in sort_by_date(data)] == [1, 3, 2, 4]
+    assert [item["id"] for item in sort_by_date(data, "ascending")] == [2, 4, 1, 3]
+    assert sort_by_date(data) == sorted(data, key=lambda x: datetime.fromisoformat(x["date"]), reverse=True)
+
+
+def test_sort_by_date_table(input_data_filter: List[dict]) -> None:
+    table = TransactionTable.from_records(input_data_filter)
+    assert sort_by_date(table).id.tolist() == [item["id"] for item in sort_by_date(input_data_filter)]
+    assert sort_by_date(table, "ascending").id.tolist() == [939719570, 594226727, 615064591, 41428829]
+
+
+def test_parse_dates_matches_parse_date() -> None:
+    values = ["2019-07-03T18:35:29.512364", "2023-09-05T11:30:32Z", None, "2019-07-03T18:35:29+03:00"]
+    assert parse_dates(values).tolist() == [parse_date(value) for value in values]
+
+
+@pytest.fixture
+def many_operations() -> List[dict]:
+    states = ["EXECUTED", "CANCELED"]
+    return [
+        {"id": i, "state": states[i % 2], "date": f"2019-{i % 12 + 1:02d}-{i % 28 + 1:02d}T10:00:00.000000"}
+        for i in range(200)
+    ]
+
+
+def test_latest_and_earliest_match_full_sort(many_operations: List[dict]) -> None:
+    executed = filter_by_state(many_operations, "EXECUTED")
+    assert latest(many_operations, 10, "EXECUTED") == sort_by_date(executed)[:10]
+    assert earliest(many_operations, 10, "EXECUTED") == sort_by_date(executed, "ascending")[:10]
+    assert latest(many_operations, 500) == sort_by_date(many_operations)
+    assert latest(many_operations, 0) == []
+
+    table = TransactionTable.from_records(many_operations)
+    assert latest(table, 10, "EXECUTED").id.tolist() == [item["id"] for item in sort_by_date(executed)[:10]]
+
+
+def test_between(many_operations: List[dict]) -> None:
+    expected = [
+        item
+        for item in sort_by_date(many_operations)
+        if "2019-03-01T00:00:00" <= item["date"] <= "2019-05-10T10:00:00.000000"
+    ]
+    assert between(many_operations, "2019-03-01T00:00:00", "2019-05-10T10:00:00") == expected
+
+    index = DateIndex(TransactionTable.from_records(many_operations))
+    assert index.between("2019-03-01T00:00:00", "2019-05-10T10:00:00").id.tolist() == [i["id"] for i in expected]
+    assert len(index.between(end="2019-01-01T00:00:00")) == 0
+    assert len(index.between()) == 200
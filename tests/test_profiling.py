@@ -0,0 +1,62 @@
+import json
+import pstats
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from src.profiling import CACHE_PROBES, Profiler, cprofile
+from src.widget import mask_number
+
+
+def test_stage_records_rows_and_timings() -> None:
+    profiler = Profiler()
+    for _ in range(2):
+        with profiler.stage("filter", rows_in=10) as stage:
+            stage.rows_out = 4
+    with pytest.raises(ValueError):
+        with profiler.stage("filter"):
+            raise ValueError
+
+    stage_report = profiler.report()["stages"]["filter"]
+    assert stage_report["calls"] == 3 and stage_report["errors"] == 1
+    assert stage_report["rows_in"] == 20 and stage_report["rows_out"] == 8
+    assert stage_report["wall"] >= stage_report["wall_max"] >= 0
+
+
+def test_track_counts_rows() -> None:
+    profiler = Profiler()
+
+    @profiler.track()
+    def evens(values: List[int]) -> List[int]:
+        return [value for value in values if value % 2 == 0]
+
+    assert evens(list(range(10))) == [0, 2, 4, 6, 8]
+    assert evens.__name__ == "evens"
+    assert profiler.report()["stages"]["evens"]["rows_in"] == 10
+    assert profiler.report()["stages"]["evens"]["rows_out"] == 5
+
+
+def test_cache_hit_rate(monkeypatch: pytest.MonkeyPatch) -> None:
+    counter = {"hits": 0, "misses": 0}
+    monkeypatch.setitem(CACHE_PROBES, "test_cache", lambda: (counter["hits"], counter["misses"]))
+    profiler = Profiler()
+    with profiler.stage("lookup"):
+        counter["hits"] += 3
+        counter["misses"] += 1
+        mask_number("7000792289606361")
+        mask_number("7000792289606361")
+    cache = profiler.report()["stages"]["lookup"]["cache"]
+    assert cache["test_cache"] == {"hits": 3, "misses": 1, "hit_rate": 0.75}
+    assert cache["mask_number"]["hits"] >= 1
+
+
+def test_save_and_cprofile(tmp_path: Path) -> None:
+    profiler = Profiler(log_file=str(tmp_path / "stages.txt"))
+    with cprofile(str(tmp_path / "run.prof")):
+        with profiler.stage("sum") as stage:
+            stage.rows_out = sum(range(1000))
+    profiler.save(str(tmp_path / "report.json"))
+
+    assert json.loads((tmp_path / "report.json").read_text())["stages"]["sum"]["rows_out"] == 499500
+    assert pstats.Stats(str(tmp_path / "run.prof")).get_stats_profile().func_profiles
@@ -0,0 +1,54 @@
+from pathlib import Path
+from typing import Iterator, List
+
+import pytest
+
+from src.dictionary_handler import search_transactions
+from src.generators import filter_by_currency
+from src.processing import filter_by_state, sort_by_date
+from src.query import TransactionQuery
+from src.table import TransactionTable
+from src.utils import read_json_file
+
+
+@pytest.fixture
+def operations() -> List[dict]:
+    return [operation for operation in read_json_file(Path("data/operations.json")) if operation]
+
+
+def test_query_matches_chained_functions(operations: List[dict]) -> None:
+    query = TransactionQuery(state="EXECUTED", currency="RUB", keyword="Перевод", regex=True, order="descending")
+    expected = search_transactions(
+        list(filter_by_currency(sort_by_date(filter_by_state(operations, "EXECUTED")), "RUB")), "Перевод"
+    )
+    assert query.run(operations) == expected
+    assert query.run(TransactionTable.from_records(operations)).id.tolist() == [item["id"] for item in expected]
+
+
+def test_query_limit(operations: List[dict]) -> None:
+    query = TransactionQuery(state="EXECUTED", order="ascending", limit=5)
+    assert query.run(operations) == sort_by_date(filter_by_state(operations, "EXECUTED"), "ascending")[:5]
+    assert len(TransactionQuery(limit=3).run(TransactionTable.from_records(operations))) == 3
+
+
+def test_query_rejects_negative_limit() -> None:
+    with pytest.raises(ValueError):
+        TransactionQuery(limit=-1)
+
+
+def test_query_limit_stops_reading_stream(operations: List[dict]) -> None:
+    consumed = []
+
+    def stream() -> Iterator[dict]:
+        for operation in operations:
+            consumed.append(operation)
+            yield operation
+
+    result = TransactionQuery(keyword="вклада", limit=1).run(stream())
+    assert len(result) == 1
+    assert len(consumed) < len(operations)
+
+
+def test_query_literal_keyword(operations: List[dict]) -> None:
+    assert TransactionQuery(keyword="(").run(operations) == []
+    assert TransactionQuery(currency="EUR").run(operations) == []
@@ -0,0 +1,107 @@
+from pathlib import Path
+from typing import Any, Dict, List
+from unittest.mock import Mock, patch
+
+import numpy as np
+import pytest
+
+from src.external_API import CurrencyRateProvider
+from src.rate_history import RateHistory
+from src.table import TransactionTable, parse_date
+from src.utils import sum_amount, sum_amounts
+
+
+@pytest.fixture
+def history() -> RateHistory:
+    # База RUB: API отдает количество валюты за рубль
+    return RateHistory.from_timeseries(
+        {
+            "base": "RUB",
+            "rates": {
+                "2020-01-01": {"USD": 0.02, "EUR": 0.0125},
+                "2020-01-02": {"USD": 0.0125},
+                "2020-01-04": {"USD": 0.01, "EUR": 0.01},
+            },
+        }
+    )
+
+
+def test_rate_lookup(history: RateHistory) -> None:
+    assert len(history) == 4
+    assert history.rate("2020-01-01T10:00:00", "USD") == 50.0
+    # пропущенный день берет последний известный курс
+    assert history.rate("2020-01-03", "USD") == 80.0
+    assert history.rate("2020-01-03", "EUR") == 80.0
+    assert history.rate("2021-06-01", "USD") == 100.0
+    assert history.rate("2019-12-31", "USD") is None
+    assert history.rate("2020-01-01", "CNY") is None
+    assert history.rate("2020-01-01", "RUB") == 1.0
+
+
+def test_from_timeseries_non_rub_base() -> None:
+    history = RateHistory.from_timeseries(
+        {"base": "USD", "rates": {"2020-01-01": {"RUB": 90, "EUR": 0.9}, "2020-01-02": {"EUR": 0.8}}}
+    )
+    assert history.rate("2020-01-01", "EUR") == pytest.approx(100.0)
+    assert history.rate("2020-01-01", "USD") == 90.0
+    assert history.rate("2020-01-01", "RUB") == 1.0
+    # день без курса рубля пропускается, курс берется с предыдущего дня
+    assert history.rate("2020-01-02", "EUR") == pytest.approx(100.0)
+
+
+def test_empty_history() -> None:
+    assert len(RateHistory.from_records([])) == 0
+    history = RateHistory.from_timeseries({"base": "USD", "rates": {"2020-01-01": {"EUR": 0.9}}})
+    assert len(history) == 0
+    assert history.rate("2020-01-01", "EUR") is None
+    assert history.rate("2020-01-01", "RUB") == 1.0
+    dates = np.array([parse_date("2020-01-01")] * 2)
+    np.testing.assert_array_equal(history.lookup(dates, np.array(["EUR", "RUB"])), [np.nan, 1.0])
+
+
+def test_lookup_vectorized(history: RateHistory) -> None:
+    dates = np.array(
+        [parse_date(day) for day in ("2020-01-01", "2020-01-03", "2019-01-01", "2020-01-02", "2020-01-04")]
+    )
+    codes = np.array(["USD", "EUR", "USD", "RUB", "CNY"], dtype=object)
+    np.testing.assert_array_equal(history.lookup(dates, codes), [50.0, 80.0, np.nan, 1.0, np.nan])
+
+
+def test_save_and_load(history: RateHistory, tmp_path: Path) -> None:
+    history.save(tmp_path / "rates.npz")
+    loaded = RateHistory.from_file(tmp_path / "rates.npz")
+    assert loaded.codes == history.codes and loaded.start_day == history.start_day
+    np.testing.assert_array_equal(loaded.rates, history.rates)
+
+
+@patch("requests.get")
+def test_fetch_single_request(mock_get: Mock) -> None:
+    mock_get.return_value.json.return_value = {"base": "RUB", "rates": {"2020-01-01": {"USD": 0.02}}}
+    history = RateHistory.fetch("2020-01-01", "2020-01-31", ["USD", "RUB", "USD"])
+    assert history.rate("2020-01-01", "USD") == 50.0
+    mock_get.assert_called_once()
+    assert mock_get.call_args.kwargs["params"]["symbols"] == "USD"
+
+
+@patch("requests.get")
+def test_sum_amounts_uses_rate_on_operation_date(mock_get: Mock, history: RateHistory) -> None:
+    mock_get.return_value.json.return_value = {"rates": {"USD": 0.005, "EUR": 0.005}}
+    transactions: List[Dict[str, Any]] = [
+        {"date": "2020-01-01T12:00:00", "operationAmount": {"amount": "2", "currency": {"code": "USD"}}},
+        {"date": "2020-01-04T12:00:00", "operationAmount": {"amount": "2", "currency": {"code": "USD"}}},
+        {"date": "2020-01-03T12:00:00", "operationAmount": {"amount": "1", "currency": {"code": "EUR"}}},
+        {"date": "2020-01-03T12:00:00", "operationAmount": {"amount": "10", "currency": {"code": "RUB"}}},
+        # до начала истории - текущий курс provider
+        {"date": "2019-01-01T12:00:00", "operationAmount": {"amount": "1", "currency": {"code": "EUR"}}},
+    ]
+    provider = CurrencyRateProvider()
+    summary = sum_amounts(transactions, provider, history)
+    assert summary.rub_amounts.tolist() == [100.0, 200.0, 80.0, 10.0, 200.0]
+    assert summary.by_currency == {"EUR": 280.0, "RUB": 10.0, "USD": 300.0}
+    assert provider.requests_made == 1
+
+    table_summary = sum_amounts(
+        TransactionTable.from_records([{"id": i, **t} for i, t in enumerate(transactions)]), provider, history
+    )
+    assert table_summary.rub_amounts.tolist() == summary.rub_amounts.tolist()
+    assert sum_amount(transactions[0], provider, history) == 100.0
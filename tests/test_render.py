@@ -0,0 +1,71 @@
+import io
+from typing import Iterator
+from unittest.mock import Mock, patch
+
+import numpy as np
+import pytest
+
+from src.external_API import CurrencyRateProvider
+from src.render import format_days, format_rows, page_bounds, render_transactions
+from src.table import MISSING_DATE, TransactionTable, parse_date
+
+RECORDS = [
+    {
+        "id": 1,
+        "state": "EXECUTED",
+        "date": "2019-08-26T10:50:58.294041",
+        "operationAmount": {"amount": "31957.58", "currency": {"name": "руб.", "code": "RUB"}},
+        "description": "Перевод организации",
+        "from": "Maestro 1596837868705199",
+        "to": "Счет 64686473678894779589",
+    },
+    {
+        "id": 2,
+        "state": "EXECUTED",
+        "date": "2018-06-30T02:08:58.425572",
+        "operationAmount": {"amount": "10", "currency": {"name": "USD", "code": "USD"}},
+        "description": "Открытие вклада",
+        "to": "Счет 75106830613657916952",
+    },
+]
+
+
+@pytest.fixture
+def provider() -> Iterator[CurrencyRateProvider]:
+    with patch("requests.get") as mock_get:
+        mock_get.return_value = Mock(**{"json.return_value": {"rates": {"USD": 0.0125}}})
+        yield CurrencyRateProvider()
+
+
+def test_format_days() -> None:
+    dates = np.array([parse_date("2019-08-26T10:50:58"), MISSING_DATE, parse_date("2019-08-26T23:59:59")])
+    assert format_days(dates).tolist() == ["26.08.2019", "", "26.08.2019"]
+
+
+def test_format_rows_uses_each_row_description(provider: CurrencyRateProvider) -> None:
+    table = TransactionTable.from_records(RECORDS)
+    text = format_rows(table, np.array([31957.58, 800.0]))
+    assert text == (
+        "26.08.2019 Перевод организации\n"
+        "Maestro 1596 83** **** 5199  ->  Счет **9589\n"
+        "30.06.2018 Открытие вклада\n"
+        "Счет **6952\n"
+        "Сумма: 800.00руб. \n\n"
+    )
+
+
+def test_render_transactions_writes_in_batches(provider: CurrencyRateProvider) -> None:
+    out = Mock(wraps=io.StringIO())
+    records = RECORDS * 5
+    assert render_transactions(records, out, provider, batch_size=4) == 10
+    assert out.write.call_count == 3
+    expected = format_rows(TransactionTable.from_records(records), np.array([31957.58, 800.0] * 5))
+    assert out.getvalue() == expected
+
+
+def test_page_bounds() -> None:
+    assert page_bounds(120, 1) == slice(0, 50)
+    assert page_bounds(120, 3) == slice(100, 120)
+    assert page_bounds(120, 4) == slice(120, 120)
+    with pytest.raises(ValueError):
+        page_bounds(120, 0)
@@ -0,0 +1,84 @@
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from src.dictionary_handler import search_transactions
+from src.generators import filter_by_currency
+from src.processing import filter_by_state, sort_by_date
+from src.query import TransactionQuery
+from src.sqlite_store import TransactionStore
+from src.table import TransactionTable, read_table
+
+DATA = Path(__file__).resolve().parent.parent / "data"
+
+
+@pytest.fixture
+def table() -> TransactionTable:
+    return TransactionTable.concat([read_table(DATA / "operations.json"), read_table(DATA / "transactions.csv")])
+
+
+@pytest.fixture
+def store(tmp_path: Path) -> Iterator[TransactionStore]:
+    with TransactionStore(tmp_path / "transactions.db") as opened:
+        opened.load_file(DATA / "operations.json", batch_size=30)
+        opened.load_file(DATA / "transactions.csv", batch_size=300)
+        yield opened
+
+
+def test_load_keeps_rows_and_skips_duplicates(store: TransactionStore, table: TransactionTable) -> None:
+    assert len(store) == len(table)
+    assert store.load(read_table(DATA / "operations.json")) == 0
+    assert store.select().to_records() == table.to_records()
+
+
+@pytest.mark.parametrize("state", ["EXECUTED", "CANCELED", "PENDING", "UNKNOWN"])
+def test_filter_by_state(store: TransactionStore, table: TransactionTable, state: str) -> None:
+    assert store.filter_by_state(state).to_records() == filter_by_state(table, state).to_records()
+
+
+@pytest.mark.parametrize("currency", ["RUB", "USD", "PEN"])
+def test_filter_by_currency(store: TransactionStore, table: TransactionTable, currency: str) -> None:
+    assert store.filter_by_currency(currency).id.tolist() == filter_by_currency(table, currency).id.tolist()
+
+
+@pytest.mark.parametrize("order", ["descending", "ascending"])
+def test_sort_by_date_is_stable(store: TransactionStore, table: TransactionTable, order: str) -> None:
+    assert store.sort_by_date(order).id.tolist() == sort_by_date(table, order).id.tolist()
+
+
+@pytest.mark.parametrize(
+    "search_string, ignore_case, regex",
+    [
+        ("Перевод", False, True),
+        ("перевод", False, True),
+        ("перевод", True, True),
+        ("ОТКРЫТИЕ", True, False),
+        ("на", False, False),
+        ("^Перевод с", False, True),
+        ("(", False, True),
+        ('"', False, False),
+    ],
+)
+def test_search_transactions(
+    store: TransactionStore, table: TransactionTable, search_string: str, ignore_case: bool, regex: bool
+) -> None:
+    expected = search_transactions(table, search_string, ignore_case, regex).id.tolist()
+    assert store.search_transactions(search_string, ignore_case, regex).id.tolist() == expected
+
+
+def test_run_query(store: TransactionStore, table: TransactionTable) -> None:
+    query = TransactionQuery(state="EXECUTED", keyword="карты", order="ascending", limit=5)
+    assert store.run(query).to_records() == query.run(table).to_records()
+    assert len(store.run(TransactionQuery(state="NONE"))) == 0
+
+
+def test_corrupt_json_is_not_loaded(tmp_path: Path) -> None:
+    broken = tmp_path / "truncated.json"
+    broken.write_text(
+        '[{"id": 1, "state": "EXECUTED", "date": "2019-08-26T10:50:58"}, {"id": 2, "sta', encoding="utf-8"
+    )
+    with TransactionStore(tmp_path / "transactions.db") as store:
+        with pytest.raises(ValueError):
+            store.load_file(broken, batch_size=1)
+        assert len(store) == 0
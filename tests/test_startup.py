@@ -0,0 +1,60 @@
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+HEAVY_MODULES = ("pandas", "openpyxl", "requests", "dotenv")
+# Модули режимов --file <каталог или шаблон>, --db и --incremental
+MODE_MODULES = ("src.ingest", "src.sqlite_store", "src.incremental")
+SRC_MODULES = [f"src.{path.stem}" for path in sorted((ROOT / "src").glob("*.py")) if path.stem != "__init__"]
+# Время запуска CLI для JSON-файла с запасом для медленных машин (на рабочей машине ~0.1 с)
+STARTUP_BUDGET = 0.5
+
+
+def run_python(code: str, cwd: Path) -> subprocess.CompletedProcess:
+    env = {**os.environ, "PYTHONPATH": str(ROOT)}
+    return subprocess.run([sys.executable, "-c", code], cwd=cwd, env=env, capture_output=True, text=True, check=True)
+
+
+def test_imports_have_no_side_effects(tmp_path: Path) -> None:
+    result = run_python(f"import importlib; [importlib.import_module(name) for name in {SRC_MODULES!r}]", tmp_path)
+    assert result.stdout == ""
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_json_path_skips_heavy_dependencies() -> None:
+    code = (
+        "import sys, main; "
+        "main.main(['--file', 'data/operations.json', '--currency', 'RUB', '--limit', '3']); "
+        f"print([name for name in {HEAVY_MODULES!r} if name in sys.modules])"
+    )
+    assert run_python(code, ROOT).stdout.splitlines()[-1] == "[]"
+
+
+def test_json_path_skips_mode_modules() -> None:
+    code = (
+        "import sys, main; "
+        "main.main(['--file', 'data/operations.json', '--limit', '3']); "
+        f"print([name for name in {MODE_MODULES!r} if name in sys.modules])"
+    )
+    assert run_python(code, ROOT).stdout.splitlines()[-1] == "[]"
+
+
+def test_main_constants_match_modules() -> None:
+    code = (
+        "import main; from src.incremental import WATERMARK_MODES; from src.ingest import GLOB_CHARS; "
+        "print(main.WATERMARK_MODES == WATERMARK_MODES and main.GLOB_CHARS == GLOB_CHARS)"
+    )
+    assert run_python(code, ROOT).stdout.strip() == "True"
+
+
+def test_json_startup_budget() -> None:
+    command = [sys.executable, "main.py", "--currency", "RUB", "--limit", "5"]
+    timings = []
+    for _ in range(3):
+        started = time.perf_counter()
+        subprocess.run(command, cwd=ROOT, capture_output=True, check=True)
+        timings.append(time.perf_counter() - started)
+    assert min(timings) < STARTUP_BUDGET
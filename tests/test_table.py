@@ -0,0 +1,146 @@
+from typing import List
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from src.csv_xlsx import read_transactions_csv
+from src.dictionary_handler import search_transactions
+from src.generators import filter_by_currency
+from src.processing import filter_by_state, sort_by_date
+from src.table import (
+    Record,
+    Transaction,
+    TransactionTable,
+    format_date,
+    parse_date,
+    read_table,
+    read_transactions,
+    record_dates,
+)
+from src.utils import sum_amounts
+
+
+@pytest.fixture
+def table() -> TransactionTable:
+    return TransactionTable.from_records(
+        [
+            {
+                "id": 441945886,
+                "state": "EXECUTED",
+                "date": "2019-08-26T10:50:58.294041",
+                "operationAmount": {"amount": "31957.58", "currency": {"name": "руб.", "code": "RUB"}},
+                "description": "Перевод организации",
+                "from": "Maestro 1596837868705199",
+                "to": "Счет 64686473678894779589",
+            },
+            {},
+            {
+                "id": 650703.0,
+                "state": "CANCELED",
+                "date": "2023-09-05T11:30:32Z",
+                "amount": 16210.0,
+                "currency_name": "Sol",
+                "currency_code": "PEN",
+                "from": float("nan"),
+                "to": "Счет 39745660563456619397",
+                "description": "Открытие вклада",
+            },
+        ]
+    )
+
+
+def test_from_records_normalizes_both_shapes(table: TransactionTable) -> None:
+    assert len(table) == 2
+    assert table.id.dtype == np.int64 and table.id.tolist() == [441945886, 650703]
+    assert table.date.dtype == np.int64
+    assert table.amount.tolist() == [31957.58, 16210.0]
+    assert table.currency_code.values().tolist() == ["RUB", "PEN"]
+    assert table.state.categories == ("EXECUTED", "CANCELED")
+
+
+def test_record_has_operations_json_shape(table: TransactionTable) -> None:
+    first, second = table.to_records()
+    assert first["operationAmount"] == {"amount": 31957.58, "currency": {"name": "руб.", "code": "RUB"}}
+    assert first["from"] == "Maestro 1596837868705199"
+    assert second["date"] == "2023-09-05T11:30:32.000000"
+    assert "from" not in second
+
+
+def test_dates_round_trip() -> None:
+    assert format_date(parse_date("2019-08-26T10:50:58.294041")) == "2019-08-26T10:50:58.294041"
+    assert parse_date("2023-09-05T11:30:32Z") == parse_date("2023-09-05T11:30:32")
+
+
+def test_filters_accept_table(table: TransactionTable) -> None:
+    assert filter_by_state(table, "CANCELED").id.tolist() == [650703]
+    assert filter_by_state(table, "PENDING").id.tolist() == []
+    assert filter_by_currency(table, "PEN").id.tolist() == [650703]
+    assert search_transactions(table, "организации").id.tolist() == [441945886]
+
+
+def test_sum_amounts_accepts_table(table: TransactionTable) -> None:
+    summary = sum_amounts(filter_by_currency(table, "RUB"))
+    assert summary.total == 31957.58
+
+
+def test_read_table_json() -> None:
+    table = read_table("data/operations.json")
+    assert len(table) == 100
+    assert set(table.state.categories) == {"EXECUTED", "CANCELED"}
+
+
+def test_read_table_csv_matches_records() -> None:
+    table = read_table("data/transactions.csv")
+    expected = TransactionTable.from_records(read_transactions_csv("data/transactions.csv"))
+    assert table.to_records() == expected.to_records()
+
+
+def test_read_table_unknown_format() -> None:
+    with pytest.raises(ValueError):
+        read_table("data/operations.txt")
+
+
+def test_transactions_read_like_records(table: TransactionTable) -> None:
+    transactions = table.transactions()
+    assert [dict(transaction) for transaction in transactions] == table.to_records()
+    first, second = transactions
+    assert first["operationAmount"]["currency"]["code"] == "RUB"
+    assert first.get("from") == "Maestro 1596837868705199"
+    assert "from" not in second and second.get("from") is None
+    assert second["amount"] == 16210.0 and second["currency_code"] == "PEN"
+    with pytest.raises(KeyError):
+        second["from"]
+
+
+def test_transaction_from_record_interns_strings(table: TransactionTable) -> None:
+    record = {"id": 1, "state": "".join(["EXEC", "UTED"]), "operationAmount": {"amount": "1.5", "currency": {}}}
+    transaction = Transaction.from_record(record)
+    assert transaction.state is table.state.categories[0]
+    assert transaction.amount == 1.5 and transaction.currency_code == ""
+    assert not hasattr(transaction, "__dict__")
+
+
+def test_functions_accept_transactions(table: TransactionTable) -> None:
+    transactions = table.transactions()
+    assert [t.id for t in filter_by_state(transactions, "CANCELED")] == [650703]
+    assert [t.id for t in filter_by_currency(transactions, "PEN")] == [650703]
+    assert [t.id for t in search_transactions(transactions, "организации")] == [441945886]
+    assert sum_amounts(filter_by_currency(transactions, "RUB")).total == 31957.58
+
+
+def test_record_dates_reads_transaction_dates(table: TransactionTable) -> None:
+    transactions = table.transactions()
+    with patch("src.table.parse_dates") as parse_dates:
+        np.testing.assert_array_equal(record_dates(transactions), table.date)
+        assert [t.id for t in sort_by_date(transactions, "ascending")] == table.sort_by_date(False).id.tolist()
+    parse_dates.assert_not_called()
+    mixed: List[Record] = [transactions[0].to_record(), transactions[1]]
+    np.testing.assert_array_equal(record_dates(mixed), table.date[:2])
+
+
+def test_read_transactions_all_formats() -> None:
+    transactions = read_transactions("data/operations.json")
+    assert len(transactions) == 100 and isinstance(transactions[0], Transaction)
+    csv_ids = [transaction.id for transaction in read_transactions("data/transactions.csv")]
+    assert csv_ids == read_table("data/transactions.csv").id.tolist()
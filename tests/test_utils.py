@@ -1,6 +1,7 @@
 import json
 import os
 from pathlib import Path
+from typing import Any, Dict, List
 from unittest.mock import MagicMock, Mock, mock_open, patch
 
 """# Импортируем Mock и patch для создания заглушек"""
@@ -8,8 +9,9 @@ from unittest.mock import MagicMock, Mock, mock_open, patch
 import requests
 from dotenv import load_dotenv
 
-from src.external_API import get_currency_rate
-from src.utils import read_json_file, sum_amount
+from src.external_API import CurrencyRateProvider, get_currency_rate
+from src.generators import filter_by_currency, transaction_descriptions
+from src.utils import converted_amounts, iter_json_file, read_json_file, sum_amount, sum_amounts
 
 load_dotenv()
 API_KEY = os.getenv("api_key")
@@ -86,3 +88,127 @@ def test_sum_amount() -> None:
         )
         == 31957.58
     )
+
+
+def _rates_response(rates: dict) -> Mock:
+    response = Mock()
+    response.json.return_value = {"rates": rates}
+    return response
+
+
+@patch("requests.get")
+def test_rate_provider_single_request_for_all_currencies(mock_get: Mock) -> None:
+    mock_get.return_value = _rates_response({"USD": 0.0125, "EUR": 0.01})
+    provider = CurrencyRateProvider(ttl=60)
+
+    rates = provider.get_rates(["USD", "EUR", "USD", "RUB"])
+    assert rates == {"RUB": 1.0, "USD": 80.0, "EUR": 100.0}
+    assert provider.get_rate("USD") == 80.0
+    assert mock_get.call_count == 1
+    assert mock_get.call_args.kwargs["params"] == {"base": "RUB", "symbols": "EUR,USD"}
+
+
+@patch("src.external_API.time.time")
+@patch("requests.get")
+def test_rate_provider_ttl_expiry(mock_get: Mock, mock_time: Mock) -> None:
+    mock_get.return_value = _rates_response({"USD": 0.0125})
+    provider = CurrencyRateProvider(ttl=60)
+
+    mock_time.return_value = 1000.0
+    provider.get_rate("USD")
+    mock_time.return_value = 1059.0
+    provider.get_rate("USD")
+    assert mock_get.call_count == 1
+
+    mock_time.return_value = 1061.0
+    provider.get_rate("USD")
+    assert mock_get.call_count == 2
+
+
+@patch("requests.get")
+def test_rate_provider_api_error_fallback(mock_get: Mock) -> None:
+    mock_get.side_effect = requests.exceptions.RequestException
+    provider = CurrencyRateProvider()
+    # Без устаревшего курса валюта пропускается, а не получает курс 1.0
+    assert provider.get_rates(["USD"]) == {"RUB": 1.0}
+    assert provider.get_rate("USD") is None
+    assert mock_get.call_count == 1
+
+
+@patch("requests.get")
+def test_rate_provider_persists_cache(mock_get: Mock, tmp_path: Path) -> None:
+    mock_get.return_value = _rates_response({"EUR": 0.01})
+    cache_file = tmp_path / "rates.json"
+    CurrencyRateProvider(cache_file=cache_file).get_rate("EUR")
+
+    restarted = CurrencyRateProvider(cache_file=cache_file)
+    assert restarted.get_rate("EUR") == 100.0
+    assert mock_get.call_count == 1
+
+
+@patch("requests.get")
+def test_sum_amount_uses_provider(mock_get: Mock) -> None:
+    mock_get.return_value = _rates_response({"USD": 0.0125})
+    provider = CurrencyRateProvider()
+    transaction = {"operationAmount": {"amount": "10", "currency": {"name": "USD", "code": "USD"}}}
+    assert sum_amount(transaction, provider) == 800.0
+    assert sum_amount(transaction, provider) == 800.0
+    assert mock_get.call_count == 1
+
+
+@patch("requests.get")
+def test_sum_amounts_groups_by_currency(mock_get: Mock) -> None:
+    mock_get.return_value = _rates_response({"USD": 0.0125, "PEN": 0.04})
+    provider = CurrencyRateProvider()
+    transactions: List[Dict[str, Any]] = [
+        {"operationAmount": {"amount": "100.5", "currency": {"name": "руб.", "code": "RUB"}}},
+        {"operationAmount": {"amount": "10", "currency": {"name": "USD", "code": "USD"}}},
+        {"amount": 2, "currency_name": "Sol", "currency_code": "PEN"},
+        {"amount": 3.0, "currency_name": "Peso", "currency_code": "XXX"},
+        {},
+    ]
+
+    summary = sum_amounts(transactions, provider)
+    assert mock_get.call_count == 1
+    assert summary.rub_amounts.tolist() == [100.5, 800.0, 50.0, 0.0, 0.0]
+    assert summary.by_currency == {"RUB": 100.5, "USD": 800.0, "PEN": 50.0, "XXX": 0.0}
+    assert summary.total == 950.5
+    assert converted_amounts(transactions, provider).tolist() == summary.rub_amounts.tolist()
+
+
+def test_iter_json_file_streams_items(tmp_path: Path) -> None:
+    items = [{"id": i, "description": f"Перевод {i}", "amount": 10**i} for i in range(50)] + [{}, 7, "x"]
+    path = tmp_path / "operations.json"
+    path.write_text(json.dumps(items, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    stream = iter_json_file(path, chunk_size=7)
+    assert next(stream) == items[0]
+    assert list(stream) == items[1:]
+    assert read_json_file(path) == items
+
+
+def test_iter_json_file_matches_operations_json() -> None:
+    with open("data/operations.json", encoding="utf-8") as f:
+        expected = json.load(f)
+    assert list(iter_json_file("data/operations.json", chunk_size=100)) == expected
+
+
+def test_iter_json_file_not_a_list(tmp_path: Path) -> None:
+    path = tmp_path / "operations.json"
+    path.write_text('{"id": 1}', encoding="utf-8")
+    assert list(iter_json_file(path)) == []
+    assert read_json_file(path) == []
+
+
+def test_iter_json_file_corrupt_stops(tmp_path: Path) -> None:
+    path = tmp_path / "operations.json"
+    path.write_text('[{"id": 1}, {"id": 2}, {"id": ', encoding="utf-8")
+    assert list(iter_json_file(path, chunk_size=4)) == [{"id": 1}, {"id": 2}]
+    assert read_json_file(path) == []
+    assert list(iter_json_file(tmp_path / "missing.json")) == []
+
+
+def test_generators_chain_on_stream() -> None:
+    usd = filter_by_currency(iter_json_file("data/operations.json"), "USD")
+    descriptions = transaction_descriptions(usd)
+    assert next(descriptions) == "Перевод организации"
@@ -1,6 +1,8 @@
+import numpy as np
 import pytest
 
-from src.widget import convert_date_format, mask_number
+from src.table import parse_date
+from src.widget import convert_date_format, mask_many, mask_number
 
 """
 # Проверка функции mask_number()
@@ -31,3 +33,24 @@ def test_mask_number(input_number: str, expected_output: str) -> None:
 def test_convert_date_format() -> None:
     assert convert_date_format("2018-07-11T02:26:18.671407") == "11.07.2018"
     assert convert_date_format("2023-12-31T23:59:59.999999") == "31.12.2023"
+
+
+def test_convert_date_format_variants() -> None:
+    assert convert_date_format("2023-09-05T11:30:32Z") == "05.09.2023"
+    assert convert_date_format(parse_date("2018-07-11T02:26:18.671407")) == "11.07.2018"
+    assert convert_date_format(np.int64(0)) == "01.01.1970"
+    with pytest.raises(ValueError):
+        convert_date_format("11.07.2018")
+
+
+def test_mask_number_is_cached() -> None:
+    mask_number.cache_clear()
+    assert mask_number("Счет 64686473678894779589") == "Счет **9589"
+    assert mask_number("Счет 64686473678894779589") == "Счет **9589"
+    assert mask_number.cache_info().hits == 1
+    assert mask_number("") == ""
+
+
+def test_mask_many() -> None:
+    values = ["Visa Classic 6831982476737658", None, "Счет 35383033474447895560", float("nan")]
+    assert mask_many(values) == ["Visa Classic 6831 98** **** 7658", "", "Счет **5560", ""]